@@ -0,0 +1,61 @@
+"""
+블록 변환 캐시 벤치마크.
+
+루프 본문(MOV/ADD/PUSH 직선 구간)을 반복 실행하면서
+블록 모드(run(blocks=True))와 단일 스텝 인터프리터(run(blocks=False))의 초당 명령어 수를 비교합니다.
+루프의 되돌아가는 분기는 매 반복마다 pc를 본문 시작으로 되돌리는 것으로 대신합니다.
+
+    python benchmarks/bench_blocks.py [body_len] [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulator import ARMv7Simulator, CODE_BASE
+from registers import PC
+
+
+def make_body(length):
+    body = []
+    for i in range(length):
+        kind = i % 4
+        if kind == 0:
+            body.append(f"mov r{i % 13}, #{i}")
+        elif kind == 3:
+            body.append("push {r0, r1}")
+        else:
+            body.append(f"add r{i % 13}, r{(i + 1) % 13}, #{i % 256}")
+    return body
+
+
+def measure(body, iterations, blocks):
+    sim = ARMv7Simulator()
+    sim.load_code(body)
+    regs = sim.registers
+    regs["sp"] = 0x00F00000
+    start = time.perf_counter()
+    steps = 0
+    for _ in range(iterations):
+        regs.write(PC, CODE_BASE)
+        steps += sim.run(blocks=blocks)
+        regs["sp"] = 0x00F00000
+    elapsed = time.perf_counter() - start
+    return steps / elapsed
+
+
+def main():
+    body_len = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    body = make_body(body_len)
+    single = measure(body, iterations, blocks=False)
+    block = measure(body, iterations, blocks=True)
+    print(f"loop body: {body_len} instructions x {iterations} iterations")
+    print(f"single-step : {single:12,.0f} instr/s")
+    print(f"block mode  : {block:12,.0f} instr/s")
+    print(f"speedup     : {block / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
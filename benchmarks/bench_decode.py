@@ -0,0 +1,112 @@
+"""
+디코드 캐시 벤치마크.
+
+긴 직선형 MOV/ADD/PUSH 프로그램을 여러 번 실행하면서 세 경로의 초당 명령어 수를 비교합니다.
+    baseline: 캐시 도입 전 커밋(BASELINE_REV)의 parse_and_execute (실행할 때마다 토큰화 + 디스패치)
+    decode  : 지금의 decode_instruction을 매번 호출 (캐시 미스만 계속 나는 경우)
+    cached  : 캐시된 DecodedInstruction을 쓰는 경로
+baseline은 git archive로 그 커밋의 src를 임시 디렉터리에 풀어 별도 프로세스에서 잽니다.
+git 저장소가 아니면 baseline은 건너뜁니다.
+
+    python benchmarks/bench_decode.py [lines] [passes]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from simulator import ARMv7Simulator
+from decoder import decode_instruction
+
+BASELINE_REV = "ab428e2"  # DecodedInstruction 캐시 이전
+
+# 임시 디렉터리의 baseline src로 실행하는 측정 스크립트 (argv: src passes, stdin: 프로그램)
+BASELINE_SCRIPT = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from simulator import ARMv7Simulator
+program = sys.stdin.read().splitlines()
+passes = int(sys.argv[2])
+sim = ARMv7Simulator()
+start = time.perf_counter()
+for _ in range(passes):
+    for line in program:
+        sim.parse_and_execute(line)
+print(len(program) * passes / (time.perf_counter() - start))
+"""
+
+def make_program(lines):
+    program = ["mov sp, #0x100000"]
+    for i in range(lines):
+        kind = i % 3
+        if kind == 0:
+            program.append(f"mov r{i % 13}, #{i}")
+        elif kind == 1:
+            program.append(f"add r{i % 13}, r{(i + 1) % 13}, #{i % 256}")
+        else:
+            program.append(f"push {{r{i % 13}, lr}}")
+    return program
+
+
+def measure_baseline(program, passes):
+    """BASELINE_REV의 parse_and_execute로 잰 초당 명령어 수 (커밋을 꺼낼 수 없으면 None)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            archive = subprocess.run(["git", "-C", ROOT, "archive", BASELINE_REV, "src"],
+                                     capture_output=True, check=True).stdout
+            subprocess.run(["tar", "-x", "-C", tmp], input=archive, check=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        out = subprocess.run([sys.executable, "-c", BASELINE_SCRIPT, os.path.join(tmp, "src"), str(passes)],
+                             input="\n".join(program), capture_output=True, text=True, check=True).stdout
+    return float(out)
+
+
+def run_uncached(sim, program):
+    # 지금의 디코더를 매번 호출: 캐시를 거치지 않는다
+    for line in program:
+        decoded = decode_instruction(sim, line)
+        decoded.handler(sim, *decoded.args)
+
+
+def run_cached(sim, program):
+    decode = sim.decode
+    for line in program:
+        decoded = decode(line)
+        decoded.handler(sim, *decoded.args)
+
+
+def measure(runner, program, passes):
+    sim = ARMv7Simulator()
+    start = time.perf_counter()
+    for _ in range(passes):
+        runner(sim, program)
+    elapsed = time.perf_counter() - start
+    return len(program) * passes / elapsed
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    passes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    program = make_program(lines)
+    baseline = measure_baseline(program, passes)
+    uncached = measure(run_uncached, program, passes)
+    cached = measure(run_cached, program, passes)
+    print(f"program: {len(program)} lines x {passes} passes")
+    if baseline is None:
+        print(f"baseline ({BASELINE_REV}): not available (needs the git history)")
+    else:
+        print(f"baseline ({BASELINE_REV}): {baseline:12,.0f} instr/s")
+    print(f"decode every time : {uncached:12,.0f} instr/s")
+    print(f"cached            : {cached:12,.0f} instr/s")
+    if baseline is not None:
+        print(f"speedup vs baseline: {cached / baseline:.2f}x")
+    print(f"speedup vs decode  : {cached / uncached:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
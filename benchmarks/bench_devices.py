@@ -0,0 +1,75 @@
+"""
+MMIO 장치 벤치마크.
+
+1) RAM만 읽고 쓰는 루프를 장치 없이/기본 장치(attach_defaults)를 붙이고 실행해 초당 명령어 수를 비교합니다.
+   장치 페이지가 아닌 RAM 접근은 비용이 같아야 합니다.
+2) UART DR에 바이트를 계속 쓰는 루프로 초당 출력 바이트 수와 실제 write 호출 수를 잽니다.
+
+    python benchmarks/bench_devices.py [steps]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from devices import UART_BASE
+from simulator import ARMv7Simulator
+
+RAM_LOOP = [
+    "    mov r5, #0x10000",
+    "loop:",
+    "    ldr r0, [r5]",
+    "    add r0, r0, #1",
+    "    str r0, [r5]",
+    "    b loop",
+]
+
+UART_LOOP = [
+    f"    ldr r5, =0x{UART_BASE:08X}",
+    "    mov r0, #65",
+    "loop:",
+    "    str r0, [r5]",
+    "    b loop",
+]
+
+
+class CountingSink:
+    """write 호출 수만 세는 출력"""
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+    def flush(self):
+        pass
+
+
+def measure(program, steps, devices):
+    sim = ARMv7Simulator()
+    sink = CountingSink()
+    if devices:
+        sim.bus.attach_defaults(sink)
+    sim.load_code(program)
+    start = time.perf_counter()
+    executed = sim.run(steps)
+    sim.bus.flush()
+    return executed / (time.perf_counter() - start), sink
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 400000
+    print(f"{steps} instructions per run")
+    for devices in (False, True):
+        ips, _ = measure(RAM_LOOP, steps, devices)
+        print(f"RAM loop, {'with' if devices else 'no':>4} devices: {ips:12,.0f} instr/s")
+    ips, sink = measure(UART_LOOP, steps, True)
+    print(f"UART loop: {ips:12,.0f} instr/s, {sink.bytes:,} bytes in {sink.writes} writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+지연 플래그 벤치마크.
+
+S 접미사 명령어가 많고 플래그는 루프 끝의 BNE에서만 읽는 루프를 실행하면서
+NZCV를 매번 계산하는 경우(eager, lazy_flags=False)와
+마지막 결과만 남겨 두고 읽을 때 계산하는 경우(lazy)의 초당 명령어 수를 비교합니다.
+두 번째 표는 플래그 설정 자체(set_arith_flags + 조건 검사)만 잰 값입니다.
+
+    python benchmarks/bench_flags.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulator import ARMv7Simulator
+from registers import RegisterFile
+
+PROGRAM = [
+    "_start:",
+    "    mov r1, #0",
+    "    mov r2, #1",
+    "loop:",
+    "    adds r1, r1, r2",
+    "    adcs r3, r3, #0",
+    "    eors r4, r1, r3",
+    "    ands r5, r4, #0xFF",
+    "    orrs r6, r5, r1, lsl #3",
+    "    rsbs r7, r6, #0",
+    "    subs r0, r0, #1",
+    "    bne loop",
+]
+
+
+def measure_program(iterations, lazy):
+    sim = ARMv7Simulator()
+    sim.registers.lazy_flags = lazy
+    sim.load_code(PROGRAM)
+    sim.registers["r0"] = iterations
+    start = time.perf_counter()
+    steps = sim.run()
+    elapsed = time.perf_counter() - start
+    return steps / elapsed
+
+
+def measure_flags(count, lazy):
+    regs = RegisterFile()
+    regs.lazy_flags = lazy
+    set_flags = regs.set_arith_flags
+    passed = regs.condition_passed
+    start = time.perf_counter()
+    for i in range(count):
+        set_flags(i, 0xFFFFFFFE, i + 0xFFFFFFFF)
+        if i & 7 == 0:
+            passed(1)  # NE
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    eager = measure_program(iterations, lazy=False)
+    lazy = measure_program(iterations, lazy=True)
+    print(f"loop: {len(PROGRAM) - PROGRAM.index('loop:') - 1} instructions x {iterations} iterations")
+    print(f"eager flags : {eager:12,.0f} instr/s")
+    print(f"lazy flags  : {lazy:12,.0f} instr/s")
+    print(f"speedup     : {lazy / eager:.2f}x")
+    count = iterations * 20
+    eager = measure_flags(count, lazy=False)
+    lazy = measure_flags(count, lazy=True)
+    print(f"flag updates: {count}")
+    print(f"eager flags : {eager:12,.0f} updates/s")
+    print(f"lazy flags  : {lazy:12,.0f} updates/s")
+    print(f"speedup     : {lazy / eager:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
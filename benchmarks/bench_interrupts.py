@@ -0,0 +1,70 @@
+"""
+인터럽트 처리량 벤치마크.
+
+벡터 테이블과 IRQ 핸들러(레지스터 저장/복원 후 'subs pc, lr, #4')가 있는 프로그램을 주기 타이머와 함께 실행하면서
+타이머 주기별 초당 인터럽트 수와 초당 명령어 수를 잽니다.
+첫 줄(타이머 없음)과 비교하면 이벤트 확인 비용과 블록 분할 비용을 알 수 있습니다.
+
+    python benchmarks/bench_interrupts.py [steps]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simulator import ARMv7Simulator
+
+PROGRAM = [
+    "vectors:",
+    "    b _start",
+    "    b .",
+    "    b .",
+    "    b .",
+    "    b .",
+    "    nop",
+    "    b irq_handler",
+    "    b .",
+    "_start:",
+    "    cps #0x12",
+    "    mov sp, #0x4000",
+    "    cps #0x1F",
+    "    mov sp, #0x8000",
+    "loop:",
+    "    add r0, r0, #1",
+    "    eor r1, r1, r0",
+    "    add r2, r2, r1",
+    "    sub r3, r3, #1",
+    "    b loop",
+    "irq_handler:",
+    "    push {r0-r3, lr}",
+    "    add r4, r4, #1",
+    "    pop {r0-r3, lr}",
+    "    subs pc, lr, #4",
+]
+
+PERIODS = [None, 10000, 1000, 100, 20]
+
+
+def measure(steps, period):
+    sim = ARMv7Simulator()
+    sim.load_code(PROGRAM, base=0)
+    if period is not None:
+        sim.interrupts.add_timer(period)
+    start = time.perf_counter()
+    executed = sim.run(steps)
+    elapsed = time.perf_counter() - start
+    return executed / elapsed, sim.interrupts.taken.get("irq", 0) / elapsed
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"{steps} instructions per run")
+    for period in PERIODS:
+        ips, irqs = measure(steps, period)
+        name = "no timer" if period is None else f"every {period}"
+        print(f"{name:>12}: {ips:12,.0f} instr/s {irqs:12,.0f} irq/s")
+
+
+if __name__ == "__main__":
+    main()
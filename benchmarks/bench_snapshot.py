@@ -0,0 +1,56 @@
+"""
+스냅샷 저장/불러오기 벤치마크.
+
+size MiB(기본 64)를 채운 메모리 이미지를 압축 방식별로 save_state()/load_state()하고
+걸린 시간과 파일 크기를 잽니다. 압축하지 않은 파일은 mmap으로 불러오므로 크기와 거의 무관해야 합니다.
+마지막 열은 불러온 뒤 모든 페이지에 한 번씩 쓰는 시간 (copy-on-write 비용)입니다.
+
+    python benchmarks/bench_snapshot.py [size_mib]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from memory import PAGE_SIZE
+from simulator import ARMv7Simulator
+
+
+def build(size):
+    sim = ARMv7Simulator()
+    sim.load_code(["mov r0, #1"])
+    pattern = bytes(range(256)) * (PAGE_SIZE // 256)
+    for addr in range(0x100000, 0x100000 + size, PAGE_SIZE):
+        sim.memory.load(addr, pattern)
+    return sim
+
+
+def main():
+    size = (int(sys.argv[1]) if len(sys.argv) > 1 else 64) << 20
+    sim = build(size)
+    print(f"{size >> 20} MiB image, {len(sim.memory.pages)} pages")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.bin")
+        for compression in (None, "zlib", "lzma"):
+            start = time.perf_counter()
+            sim.save_state(path, compression)
+            saved = time.perf_counter() - start
+            target = ARMv7Simulator()
+            target.load_code(["mov r0, #1"])
+            start = time.perf_counter()
+            target.load_state(path)
+            loaded = time.perf_counter() - start
+            start = time.perf_counter()
+            for pn in target.memory.pages:
+                target.memory.write_word(pn * PAGE_SIZE, 0)
+            touched = time.perf_counter() - start
+            name = compression or "none"
+            print(f"{name:>5}: save {saved * 1000:9.1f} ms  load {loaded * 1000:9.1f} ms  "
+                  f"touch {touched * 1000:7.1f} ms  {os.path.getsize(path) >> 10:8} KiB")
+            del target
+
+
+if __name__ == "__main__":
+    main()
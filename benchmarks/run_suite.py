@@ -0,0 +1,138 @@
+"""
+벤치마크 모음 실행기.
+
+benchmarks/workloads/*.s 의 게스트 프로그램마다 새 프로세스를 띄워 다음을 잽니다.
+  - ips: sim.run()의 초당 명령어 수, runs번 중 최고값 (높을수록 좋음)
+  - rss_kb: 프로세스 최대 RSS (낮을수록 좋음)
+  - startup_ms: ARMv7Simulator() 생성 + 어셈블 + load_program 시간, 여러 번 중 최저값 (낮을수록 좋음)
+  - steps: 실행한 명령어 수 (기준값과 다르면 동작이 바뀐 것)
+결과를 baseline.json과 비교해 threshold(기본 20%)보다 나빠진 지표가 있으면 종료 코드 1을 반환합니다.
+기준값은 측정한 기계에 따라 다르므로 새 기계에서는 --update로 다시 만듭니다.
+
+    python benchmarks/run_suite.py [--only NAME ...] [--threshold 0.2] [--update] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORKLOADS = os.path.join(HERE, "workloads")
+BASELINE = os.path.join(HERE, "baseline.json")
+MAX_STEPS = 20_000_000  # 무한 루프 방지
+
+# 지표 -> 높을수록 좋은지
+METRICS = {"ips": True, "rss_kb": False, "startup_ms": False}
+# 이보다 작은 차이는 비율과 상관없이 잡음으로 본다 (1ms 미만 시작 시간 등)
+MIN_DELTA = {"rss_kb": 1024, "startup_ms": 1.0}
+
+
+def workload_names():
+    return sorted(name[:-2] for name in os.listdir(WORKLOADS) if name.endswith(".s"))
+
+
+def measure(name, runs=3, repeats=20):
+    """(자식 프로세스에서) 워크로드 하나를 재서 dict로 반환. 시간은 잡음을 줄이려고 최솟값을 쓴다."""
+    sys.path.insert(0, os.path.join(HERE, "..", "src"))
+    from assembler import assemble_file
+    from simulator import ARMv7Simulator
+
+    path = os.path.join(WORKLOADS, name + ".s")
+    startups = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sim = ARMv7Simulator()
+        sim.load_program(assemble_file(path))
+        startups.append(time.perf_counter() - start)
+    best = None
+    for _ in range(runs):
+        sim = ARMv7Simulator()
+        sim.load_program(assemble_file(path))
+        start = time.perf_counter()
+        steps = sim.run(MAX_STEPS)
+        elapsed = time.perf_counter() - start
+        if sim.registers.read(15) in sim.code:
+            raise Exception(f"{name}: did not finish within {MAX_STEPS} instructions")
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "ips": steps / best,
+        "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "startup_ms": min(startups) * 1000,
+        "steps": steps,
+    }
+
+
+def run_child(name):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name],
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise Exception(f"{name} failed:\n{out.stderr}")
+    return json.loads(out.stdout)
+
+
+def compare(name, result, base, threshold):
+    """기준값보다 threshold 넘게 나빠진 항목 메시지 리스트"""
+    problems = []
+    if base.get("steps") is not None and base["steps"] != result["steps"]:
+        problems.append(f"{name}: steps {base['steps']} -> {result['steps']} (behavior changed)")
+    for metric, higher_is_better in METRICS.items():
+        old, new = base.get(metric), result[metric]
+        if not old:
+            continue
+        if abs(new - old) < MIN_DELTA.get(metric, 0):
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > threshold:
+            problems.append(f"{name}: {metric} {old:,.2f} -> {new:,.2f} ({change:+.1%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run the benchmark suite and compare with a baseline")
+    parser.add_argument("--only", nargs="*", help="workload names (default: all)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression ratio (default 0.2)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return 0
+
+    names = args.only or workload_names()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    problems = []
+    print(f"{'workload':16} {'instr/s':>12} {'rss KiB':>10} {'startup ms':>11} {'steps':>10}")
+    for name in names:
+        result = results[name] = run_child(name)
+        print(f"{name:16} {result['ips']:12,.0f} {result['rss_kb']:10,} {result['startup_ms']:11.2f} {result['steps']:10,}")
+        if name in baseline:
+            problems += compare(name, result, baseline[name], args.threshold)
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if problems:
+        print("regressions:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("no regressions" if baseline else "no baseline (run with --update to create one)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,16 @@
+@ 산술/논리 명령어만 도는 빡빡한 루프 (플래그는 루프 끝 BNE에서만 읽는다)
+_start:
+    ldr r0, =100000
+    mov r1, #1
+    mov r2, #0
+loop:
+    add r2, r2, r1
+    eor r3, r2, r1, lsl #3
+    orr r4, r3, #0xF0
+    and r5, r4, r2
+    sub r6, r5, r1
+    adds r1, r1, #3
+    subs r0, r0, #1
+    bne loop
+done:
+    nop
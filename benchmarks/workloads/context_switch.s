@@ -0,0 +1,88 @@
+@ ex01.s를 본뜬 문맥 교환 루프: 두 사용자 모드 태스크가 SVC를 호출할 때마다
+@ 핸들러가 레지스터를 curr_pcb에 저장하고 다른 태스크의 PCB에서 복원한다.
+.org 0
+vectors:
+    b _start
+    b .
+    b svc_handler
+    b .
+    b .
+    nop
+    b .
+    b .
+
+_start:
+    cps #0x13
+    mov sp, #0x10000
+    @ 태스크 B의 PCB: pc, spsr(사용자 모드), sp
+    ldr r0, =pcb_b
+    ldr r1, =task_b
+    str r1, [r0, #60]
+    mov r1, #0x10
+    str r1, [r0, #64]
+    mov r1, #0x30000
+    str r1, [r0, #52]
+    ldr r0, =curr_pcb
+    ldr r1, =pcb_a
+    str r1, [r0]
+    ldr r0, =next_pcb
+    ldr r1, =pcb_b
+    str r1, [r0]
+    cps #0x10
+    mov sp, #0x20000
+    ldr r5, =20000
+
+task_a:
+    add r6, r6, #1
+    subs r5, r5, #1
+    beq done
+    svc #0
+    b task_a
+
+task_b:
+    add r7, r7, #1
+    svc #0
+    b task_b
+
+svc_handler:
+    push {r0-r12, lr}
+    ldr r0, =curr_pcb
+    ldr r0, [r0]
+    ldmia sp!, {r1-r12}     // r0~r11
+    stmia r0!, {r1-r12}     // curr_pcb->regs[0] ~ regs[11]
+    ldm sp!, {r1}           // r12
+    str r1, [r0], #4        // curr_pcb->regs[12]
+    stm r0, {sp, lr}^       // curr_pcb->regs[13] ~ regs[14] : 사용자 모드 sp, lr
+    add r0, r0, #8
+    ldm sp!, {r2}           // lr (복귀 주소)
+    str r2, [r0], #4        // curr_pcb->regs[15]
+    mrs r1, spsr
+    str r1, [r0], #4        // curr_pcb->regs[16]
+
+    ldr r0, =curr_pcb
+    ldr r1, =next_pcb
+    ldr r2, [r0]
+    ldr r3, [r1]
+    str r3, [r0]
+    str r2, [r1]
+
+    ldr r1, [r3, #64]
+    msr spsr_fsxc, r1
+    ldr lr, [r3, #60]
+    add r1, r3, #52
+    ldm r1, {sp, lr}^
+    ldm r3, {r0-r12}
+    movs pc, lr
+
+done:
+    nop
+
+.org 0x40000
+curr_pcb:
+    .word 0
+next_pcb:
+    .word 0
+pcb_a:
+    .space 68
+pcb_b:
+    .space 68
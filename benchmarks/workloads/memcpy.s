@@ -0,0 +1,29 @@
+@ LDM/STM으로 32바이트씩 64 KiB를 복사하는 memcpy를 반복
+_start:
+    ldr r12, =8
+    ldr r0, =src
+    mov r1, #0
+fill:
+    str r1, [r0], #4
+    add r1, r1, #1
+    cmp r1, #0x4000
+    bne fill
+again:
+    ldr r0, =dst
+    ldr r1, =src
+    ldr r2, =0x10000
+copy:
+    ldmia r1!, {r3-r10}
+    stmia r0!, {r3-r10}
+    subs r2, r2, #32
+    bne copy
+    subs r12, r12, #1
+    bne again
+done:
+    nop
+
+.org 0x100000
+src:
+    .space 0x10000
+dst:
+    .space 0x10000
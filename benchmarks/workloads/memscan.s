@@ -0,0 +1,25 @@
+@ 1 MiB 영역을 STM으로 채운 뒤 워드 단위로 읽으며 합계를 낸다 (페이지 256개)
+_start:
+    ldr r0, =buf
+    ldr r1, =0x100000
+    mov r2, #1
+    mov r3, #2
+    mov r4, #3
+    mov r5, #4
+fill:
+    stmia r0!, {r2-r5}
+    subs r1, r1, #16
+    bne fill
+    ldr r0, =buf
+    ldr r1, =0x40000
+    mov r6, #0
+scan:
+    ldr r7, [r0], #4
+    add r6, r6, r7
+    subs r1, r1, #1
+    bne scan
+done:
+    nop
+
+.org 0x200000
+buf:
@@ -0,0 +1,20 @@
+@ 스택을 많이 쓰는 재귀 호출: fib(20)을 PUSH/POP과 BL로 계산
+_start:
+    mov sp, #0x80000
+    mov r0, #20
+    bl fib
+    b done
+fib:
+    cmp r0, #2
+    movlt pc, lr
+    push {r4, r5, lr}
+    mov r4, r0
+    sub r0, r4, #1
+    bl fib
+    mov r5, r0
+    sub r0, r4, #2
+    bl fib
+    add r0, r0, r5
+    pop {r4, r5, pc}
+done:
+    nop
@@ -0,0 +1,416 @@
+"""
+32비트 ARM 기계어 디코더 (ELF/바이너리 이미지 실행용).
+
+명령어 워드의 bits 27-20과 bits 7-4를 이어 붙인 12비트 값으로 미리 만들어 둔 4096칸 표(TABLE)에서
+인코딩 종류별 디코드 함수를 찾는다. 디코드 함수는 필드를 뽑아 텍스트 디코더와 같은 핸들러(src/instructions/)의
+(handler, args)를 만들므로 실행 코어(단일 스텝, 블록 캐시, 프로파일러 ...)는 텍스트 모드와 똑같다.
+DecodedInstruction.text에는 소스 줄 대신 디스어셈블한 문자열이 들어간다.
+
+지원: 데이터 처리(즉시값/레지스터/shift), MOVW/MOVT, MUL/MLA, UMULL/UMLAL/SMULL/SMLAL, LDR/STR(B),
+LDRH/STRH/LDRSB/LDRSH, LDRD/STRD, LDM/STM(PUSH/POP), B/BL/BX, MRS/MSR/CPS, SVC, NOP 힌트.
+코프로세서, 미디어 명령어 등은 실행할 때 fault 나는 INVALID가 된다.
+
+이 시뮬레이터는 pc를 오퍼랜드로 읽으면 (텍스트 모드와 같이) 다음 명령어 주소를 돌려주므로,
+pc 기준 리터럴 로드('ldr r0, [pc, #n]')와 ADR('add r0, pc, #n')은 ARM 규칙(명령어 주소 + 8)대로 디코드할 때 맞춰 두고,
+그 밖에 pc를 레지스터 오퍼랜드로 읽는 명령어('mov lr, pc', 'add pc, pc, r0, lsl #2', 'ldr r0, [pc, r1]')는
+실행하는 동안만 pc를 4 앞으로 옮기는 exec_pc_ahead로 감싼다.
+"""
+from decoder import DecodedInstruction, Op, exec_cond, invalid_instruction
+from instructions.branch import exec_b, exec_bl, exec_bx
+from instructions.dataproc import COMPARE_OPS, LSL, ROR, RRX, UNARY_OPS, dataproc_handler, exec_nop
+from instructions.ldm import ldm_handler
+from instructions.ldr import address_handler, exec_load_double, load_handler
+from instructions.mov import exec_mov, exec_movt
+from instructions.multiply import exec_mul, exec_mull
+from instructions.push import exec_pop, exec_push
+from instructions.str import STORE_WIDTHS, exec_store, exec_store_double, exec_store_indexed
+from instructions.system import exec_cps, exec_mrs, exec_msr, exec_svc
+from interrupts import CPSR_F, CPSR_I
+from registers import COND_AL, COND_CODES, CPSR, PC, SP, SPSR
+
+MASK = 0xFFFFFFFF
+
+REG_NAMES = [f"r{i}" for i in range(13)] + ["sp", "lr", "pc"]
+DP_NAMES = ["AND", "EOR", "SUB", "RSB", "ADD", "ADC", "SBC", "RSC", "TST", "TEQ", "CMP", "CMN", "ORR", "MOV", "BIC", "MVN"]
+SHIFT_NAMES = ["lsl", "lsr", "asr", "ror"]
+PSR_FIELDS = "cxsf"  # MSR mask 비트 16~19
+
+
+def _imm_text(value, sign=""):
+    return f"#{sign}{value}" if value < 10 else f"#{sign}0x{value:X}"
+
+
+def _reglist_text(regs):
+    return "{" + ", ".join(REG_NAMES[r] for r in regs) + "}"
+
+
+def _unsupported(name):
+    def decode(word, addr):
+        raise Exception(f"Unsupported instruction ({name}): 0x{word:08X}")
+    return decode
+
+
+def exec_pc_ahead(sim, handler, args, writes_pc):
+    """pc를 레지스터 오퍼랜드로 읽는 명령어: 실행하는 동안 pc가 명령어 주소 + 8이 되도록 한다"""
+    regs = sim.registers
+    pc = regs.read(PC)
+    regs.write(PC, pc + 4)
+    try:
+        handler(sim, *args)
+    except Exception:
+        regs.write(PC, pc)  # pc를 쓰기 전에 실패했어도 fault는 이 명령어 위치로 보고한다
+        raise
+    if not writes_pc:
+        regs.write(PC, pc)
+
+
+def _pc_ahead(handler, args, reads, writes_pc):
+    """reads(읽는 레지스터 번호들)에 pc가 있으면 exec_pc_ahead로 감싼 (handler, args)"""
+    if PC in reads:
+        return exec_pc_ahead, (handler, args, writes_pc)
+    return handler, args
+
+
+def _rotated_imm(word):
+    """bits 11-0 회전 즉시값 -> (값, shifter carry). 회전하지 않으면 carry는 그대로(None)"""
+    imm = word & 0xFF
+    rot = (word >> 7) & 0x1E
+    if not rot:
+        return imm, None
+    value = ((imm >> rot) | (imm << (32 - rot))) & MASK
+    return value, value >> 31
+
+
+def _shifted_register(word):
+    """bits 11-0 레지스터 operand2 -> (parse_operand2 형식, 텍스트). 즉시 shift 0은 LSL 없음/32/RRX"""
+    rm = word & 0xF
+    kind = (word >> 5) & 3
+    if word & 0x10:
+        rs = (word >> 8) & 0xF
+        return ("shift", rm, kind, 0, rs), f"{REG_NAMES[rm]}, {SHIFT_NAMES[kind]} {REG_NAMES[rs]}"
+    amount = (word >> 7) & 0x1F
+    if amount == 0:
+        if kind == LSL:
+            return ("reg", rm), REG_NAMES[rm]
+        if kind == ROR:
+            return ("shift", rm, RRX, 1, None), f"{REG_NAMES[rm]}, rrx"
+        amount = 32
+    return ("shift", rm, kind, amount, None), f"{REG_NAMES[rm]}, {SHIFT_NAMES[kind]} #{amount}"
+
+
+# --- 인코딩 종류별 디코드: (word, addr) -> (op, handler, args, 니모닉, 오퍼랜드 텍스트, writes_pc) ---
+def _dataproc(word, addr):
+    base = DP_NAMES[(word >> 21) & 0xF]
+    setflags = bool(word & (1 << 20))
+    rn = (word >> 16) & 0xF
+    rd = (word >> 12) & 0xF
+    if word & (1 << 25):
+        value, carry = _rotated_imm(word)
+        op2, op2_text = ("imm", value, carry), _imm_text(value)
+    else:
+        op2, op2_text = _shifted_register(word)
+    mnemonic = base.lower()
+    if base in COMPARE_OPS:
+        rd, setflags = None, True
+        operands = f"{REG_NAMES[rn]}, {op2_text}"
+    else:
+        if setflags:
+            mnemonic += "s"
+        if base in UNARY_OPS:
+            rn = rd
+            operands = f"{REG_NAMES[rd]}, {op2_text}"
+        else:
+            operands = f"{REG_NAMES[rd]}, {REG_NAMES[rn]}, {op2_text}"
+    writes_pc = rd == PC
+    if rn == PC and base in ("ADD", "SUB") and op2[0] == "imm" and not setflags:
+        # ADR: pc + 8 기준 주소는 디코드할 때 정해진다
+        target = (addr + 8 + (op2[1] if base == "ADD" else -op2[1])) & MASK
+        return Op[base], exec_mov, (rd, target), mnemonic, operands, writes_pc
+    handler, args = dataproc_handler(base, setflags, rd, rn, op2)
+    reads = () if op2[0] == "imm" else (op2[1],) if op2[0] == "reg" else (op2[1], op2[4])
+    if base not in UNARY_OPS:
+        reads += (rn,)
+    handler, args = _pc_ahead(handler, args, reads, writes_pc)
+    return Op[base], handler, args, mnemonic, operands, writes_pc
+
+
+def _movw(word, addr):
+    rd = (word >> 12) & 0xF
+    imm = ((word >> 4) & 0xF000) | (word & 0xFFF)
+    if word & (1 << 22):
+        return Op.MOV, exec_movt, (rd, imm), "movt", f"{REG_NAMES[rd]}, {_imm_text(imm)}", rd == PC
+    return Op.MOV, exec_mov, (rd, imm), "movw", f"{REG_NAMES[rd]}, {_imm_text(imm)}", rd == PC
+
+
+def _psr(word):
+    """(CPSR | SPSR, 이름)"""
+    return (SPSR, "spsr") if word & (1 << 22) else (CPSR, "cpsr")
+
+
+def _msr_fields(word):
+    """bits 19-16 -> (쓰기 마스크, 'cpsr_fc'의 'fc' 부분)"""
+    mask = 0
+    fields = ""
+    for i in range(3, -1, -1):
+        if word >> (16 + i) & 1:
+            mask |= 0xFF << (8 * i)
+            fields += PSR_FIELDS[i]
+    return mask, fields
+
+
+def _mrs(word, addr):
+    rd = (word >> 12) & 0xF
+    psr, name = _psr(word)
+    return Op.MRS, exec_mrs, (rd, psr), "mrs", f"{REG_NAMES[rd]}, {name}", False
+
+
+def _msr_reg(word, addr):
+    psr, name = _psr(word)
+    mask, fields = _msr_fields(word)
+    rm = word & 0xF
+    return Op.MSR, exec_msr, (psr, mask, rm, 0), "msr", f"{name}_{fields}, {REG_NAMES[rm]}", True
+
+
+def _msr_imm(word, addr):
+    psr, name = _psr(word)
+    mask, fields = _msr_fields(word)
+    if not mask and psr == CPSR:
+        # 힌트 (nop, yield, wfe, wfi, sev): 모두 아무 일도 하지 않는다
+        return Op.NOP, exec_nop, (), "nop", "", False
+    value, _ = _rotated_imm(word)
+    return Op.MSR, exec_msr, (psr, mask, None, value), "msr", f"{name}_{fields}, {_imm_text(value)}", True
+
+
+def _bx(word, addr):
+    rm = word & 0xF
+    return Op.BX, exec_bx, (rm,), "bx", REG_NAMES[rm], True
+
+
+def _address(word, rn, offset_text, pre, writeback):
+    if pre:
+        text = f"[{REG_NAMES[rn]}, {offset_text}]" if offset_text else f"[{REG_NAMES[rn]}]"
+        return text + ("!" if writeback else "")
+    return f"[{REG_NAMES[rn]}], {offset_text}"
+
+
+def _address_reads(address):
+    """address를 계산할 때 읽는 레지스터. 리터럴([pc, #imm])은 디코드할 때 맞춰 두었으므로 빠진다"""
+    rn, imm, rm = address[:3]
+    if rm is None:
+        return () if rn == PC and address[6] and not address[7] else (rn,)
+    return rn, rm
+
+
+def _transfer(word, base, rd, address, text):
+    """LDR/STR 계열 공통: parse_address 형식의 address로 (handler, args)를 고른다"""
+    reads = _address_reads(address)
+    if base in ("LDRD", "STRD"):
+        rn, imm, rm, negative, _, _, pre, writeback = address
+        args = (rd, rn, imm, rm, negative, pre, writeback)
+        operands = f"{REG_NAMES[rd]}, {REG_NAMES[rd + 1]}, {text}"
+        if base == "LDRD":
+            handler, args = _pc_ahead(exec_load_double, args, reads, False)
+            return Op.LDR, handler, args, "ldrd", operands, False
+        handler, args = _pc_ahead(exec_store_double, args, reads, False)
+        return Op.STR, handler, args, "strd", operands, False
+    if base.startswith("LDR"):
+        handler, args = load_handler(base, rd, address)
+        handler, args = _pc_ahead(handler, args, reads, rd == PC)
+        return Op.LDR, handler, args, base.lower(), f"{REG_NAMES[rd]}, {text}", rd == PC
+    handler, args = address_handler(exec_store, exec_store_indexed, STORE_WIDTHS[base], rd, address)
+    handler, args = _pc_ahead(handler, args, reads + (rd,), False)
+    return Op.STR, handler, args, base.lower(), f"{REG_NAMES[rd]}, {text}", False
+
+
+def _immediate_address(word, rn, imm, pre, writeback):
+    """즉시값 오프셋 주소. pc 기준 리터럴은 실행 시점의 pc(다음 명령어)에 맞춰 +4"""
+    text = "" if pre and imm == 0 else _imm_text(imm, "" if word & (1 << 23) else "-")
+    if not word & (1 << 23):
+        imm = -imm
+    if rn == PC and pre and not writeback:
+        return (PC, imm + 4, None, False, None, 0, True, False), text
+    return (rn, imm, None, False, None, 0, pre, writeback), text
+
+
+def _load_store(word, addr):
+    pre = bool(word & (1 << 24))
+    if not pre and word & (1 << 21):
+        raise Exception(f"Unsupported instruction (LDRT/STRT): 0x{word:08X}")
+    writeback = not pre or bool(word & (1 << 21))
+    rn = (word >> 16) & 0xF
+    rd = (word >> 12) & 0xF
+    base = ("LDR" if word & (1 << 20) else "STR") + ("B" if word & (1 << 22) else "")
+    if word & (1 << 25):
+        rm = word & 0xF
+        kind = (word >> 5) & 3
+        amount = (word >> 7) & 0x1F
+        negative = not word & (1 << 23)
+        offset = f"{'-' if negative else ''}{REG_NAMES[rm]}"
+        if amount == 0 and kind == LSL:
+            kind = None
+        elif amount == 0 and kind == ROR:
+            kind, amount = RRX, 1
+            offset += ", rrx"
+        else:
+            amount = amount or 32
+            offset += f", {SHIFT_NAMES[kind]} #{amount}"
+        address = (rn, 0, rm, negative, kind, amount, pre, writeback)
+    else:
+        address, offset = _immediate_address(word, rn, word & 0xFFF, pre, writeback)
+    return _transfer(word, base, rd, address, _address(word, rn, offset, pre, writeback))
+
+
+# (L, SH) -> 니모닉 (L=0의 SH=2, 3이 LDRD/STRD)
+_EXTRA_NAMES = {(1, 1): "LDRH", (1, 2): "LDRSB", (1, 3): "LDRSH", (0, 1): "STRH", (0, 2): "LDRD", (0, 3): "STRD"}
+
+
+def _load_store_extra(word, addr):
+    base = _EXTRA_NAMES.get(((word >> 20) & 1, (word >> 5) & 3))
+    pre = bool(word & (1 << 24))
+    if base is None or not pre and word & (1 << 21):
+        raise Exception(f"Unsupported instruction (unprivileged load/store): 0x{word:08X}")
+    writeback = not pre or bool(word & (1 << 21))
+    rn = (word >> 16) & 0xF
+    rd = (word >> 12) & 0xF
+    if base in ("LDRD", "STRD") and (rd & 1 or rd == 14):
+        raise Exception(f"Unsupported instruction ({base} with odd register): 0x{word:08X}")
+    if word & (1 << 22):
+        address, offset = _immediate_address(word, rn, ((word >> 4) & 0xF0) | (word & 0xF), pre, writeback)
+    else:
+        rm = word & 0xF
+        negative = not word & (1 << 23)
+        address = (rn, 0, rm, negative, None, 0, pre, writeback)
+        offset = f"{'-' if negative else ''}{REG_NAMES[rm]}"
+    return _transfer(word, base, rd, address, _address(word, rn, offset, pre, writeback))
+
+
+def _multiply(word, addr):
+    """MUL/MLA (op1 0000 00AS), UMULL/UMLAL/SMULL/SMLAL (op1 0000 1UAS)"""
+    setflags = bool(word & (1 << 20))
+    accumulate = bool(word & (1 << 21))
+    rs = (word >> 8) & 0xF
+    rm = word & 0xF
+    suffix = "s" if setflags else ""
+    if word & (1 << 23):
+        signed = bool(word & (1 << 22))
+        rdhi = (word >> 16) & 0xF
+        rdlo = (word >> 12) & 0xF
+        mnemonic = ("s" if signed else "u") + ("mlal" if accumulate else "mull") + suffix
+        operands = f"{REG_NAMES[rdlo]}, {REG_NAMES[rdhi]}, {REG_NAMES[rm]}, {REG_NAMES[rs]}"
+        return Op.MUL, exec_mull, (signed, rdlo, rdhi, rm, rs, accumulate, setflags), mnemonic, operands, PC in (rdlo, rdhi)
+    rd = (word >> 16) & 0xF
+    ra = (word >> 12) & 0xF if accumulate else None
+    operands = f"{REG_NAMES[rd]}, {REG_NAMES[rm]}, {REG_NAMES[rs]}"
+    if accumulate:
+        operands += f", {REG_NAMES[ra]}"
+    return Op.MUL, exec_mul, (rd, rm, rs, ra, setflags), ("mla" if accumulate else "mul") + suffix, operands, rd == PC
+
+
+def _block_transfer(word, addr):
+    regs = tuple(i for i in range(16) if word >> i & 1)
+    if not regs:
+        raise Exception(f"Empty register list: 0x{word:08X}")
+    load = bool(word & (1 << 20))
+    writeback = bool(word & (1 << 21))
+    user = bool(word & (1 << 22))
+    mode = ("DA", "IA", "DB", "IB")[(word >> 23) & 3]
+    rn = (word >> 16) & 0xF
+    if rn == SP and writeback and not user:
+        if not load and mode == "DB":
+            return Op.PUSH, exec_push, (regs,), "push", _reglist_text(regs), False
+        if load and mode == "IA":
+            return Op.POP, exec_pop, (regs,), "pop", _reglist_text(regs), PC in regs
+    handler, args = ldm_handler(load, mode, rn, regs, writeback, user)
+    operands = f"{REG_NAMES[rn]}{'!' if writeback else ''}, {_reglist_text(regs)}{'^' if user else ''}"
+    op = Op.LDM if load else Op.STM
+    return op, handler, args, ("ldm" if load else "stm") + mode.lower(), operands, load and PC in regs
+
+
+def _branch(word, addr):
+    offset = word & 0xFFFFFF
+    if offset & 0x800000:
+        offset -= 1 << 24
+    target = (addr + 8 + 4 * offset) & MASK
+    if word & (1 << 24):
+        return Op.BL, exec_bl, (target,), "bl", f"0x{target:X}", True
+    return Op.B, exec_b, (target,), "b", f"0x{target:X}", True
+
+
+def _svc(word, addr):
+    imm = word & 0xFFFFFF
+    return Op.SVC, exec_svc, (imm,), "svc", _imm_text(imm), True
+
+
+def _unconditional(word, addr):
+    """cond = 1111 영역: CPS만 지원"""
+    if word & 0x0FF10020 != 0x01000000:
+        raise Exception(f"Unsupported instruction (unconditional): 0x{word:08X}")
+    imod = (word >> 18) & 3
+    mode = word & 0x1F if word & (1 << 17) else None
+    bits = (word >> 8 & 1) << 8 | (CPSR_I if word & (1 << 7) else 0) | (CPSR_F if word & (1 << 6) else 0)
+    flags = "".join(name for name, bit in (("a", 1 << 8), ("i", CPSR_I), ("f", CPSR_F)) if bits & bit)
+    mode_text = f"#0x{mode:X}" if mode is not None else ""
+    if imod == 2:
+        return Op.CPS, exec_cps, (0, bits, mode), "cpsie", ", ".join(filter(None, (flags, mode_text))), True
+    if imod == 3:
+        return Op.CPS, exec_cps, (bits, 0, mode), "cpsid", ", ".join(filter(None, (flags, mode_text))), True
+    if mode is None:
+        raise Exception(f"Unsupported instruction (CPS): 0x{word:08X}")
+    return Op.CPS, exec_cps, (0, 0, mode), "cps", mode_text, True
+
+
+def _classify(op1, op2):
+    """bits 27-20 (op1), bits 7-4 (op2) -> 디코드 함수"""
+    kind = op1 >> 5
+    if kind == 0:
+        if op2 & 0x9 == 0x9:
+            if op2 & 0x6:
+                return _load_store_extra
+            if op1 < 0x04 or op1 & 0x18 == 0x08:
+                return _multiply
+            return _unsupported("multiply/swap")
+        if op1 & 0x19 == 0x10:
+            # TST/TEQ/CMP/CMN 자리에 S가 없으면 기타 명령어
+            if op2 == 0:
+                return _msr_reg if op1 & 0x2 else _mrs
+            if op2 == 1 and op1 == 0x12:
+                return _bx
+            return _unsupported("miscellaneous")
+        return _dataproc
+    if kind == 1:
+        if op1 & 0x1B == 0x10:
+            return _movw
+        if op1 & 0x1B == 0x12:
+            return _msr_imm
+        return _dataproc
+    if kind == 2:
+        return _load_store
+    if kind == 3:
+        return _unsupported("media") if op2 & 1 else _load_store
+    if kind == 4:
+        return _block_transfer
+    if kind == 5:
+        return _branch
+    if kind == 6 or not op1 & 0x10:
+        return _unsupported("coprocessor")
+    return _svc
+
+
+TABLE = [_classify(i >> 4, i & 0xF) for i in range(4096)]
+
+
+def decode_word(word, addr):
+    """addr에 있는 명령어 워드 하나를 DecodedInstruction으로 (지원하지 않으면 실행할 때 fault 나는 INVALID)"""
+    cond = word >> 28
+    try:
+        if cond == 0xF:
+            op, handler, args, mnemonic, operands, writes_pc = _unconditional(word, addr)
+        else:
+            decode = TABLE[((word >> 16) & 0xFF0) | ((word >> 4) & 0xF)]
+            op, handler, args, mnemonic, operands, writes_pc = decode(word, addr)
+    except Exception as e:
+        return invalid_instruction(f".word 0x{word:08X}", f"0x{addr:08X}: {e}")
+    if cond < COND_AL:
+        handler, args = exec_cond, (cond, handler, args)
+        mnemonic += COND_CODES[cond]
+    return DecodedInstruction(op, handler, args, f"{mnemonic} {operands}" if operands else mnemonic, writes_pc)
@@ -0,0 +1,211 @@
+"""
+2-pass 어셈블러.
+
+pass 1: 주소를 배정하며 심볼 테이블을 만든다
+        (라벨 'name:', 숫자 로컬 라벨 '1:' + '1b'/'1f' 참조, '.extern name @@ 0xADDR', '.equ',
+         '.word'/'.hword'/'.byte'/'.space'/'.align'/'.org', '@@ break')
+pass 2: 심볼('=label', 분기 대상)을 치환해 명령어를 DecodedInstruction으로 만들고 주소 -> 명령어 이미지를 만든다.
+
+결과 Program은 시뮬레이터와 독립적이므로 한 번 어셈블해서 여러 시뮬레이터에 load_program()할 수 있다.
+"""
+import re
+from decoder import decode_instruction, invalid_instruction
+
+CODE_BASE = 0x8000  # 코드 기본 배치 주소
+
+_LABEL = re.compile(r"^\s*([A-Za-z_.$][\w.$]*|\d+):")
+_LOCAL_REF = re.compile(r"^(\d+)([bf])$")
+_SYMBOL_OPERAND = re.compile(r"=([A-Za-z_.$][\w.$]*|\d+[bf])\b")
+_BRANCH = re.compile(r"^(b|bl)(eq|ne|cs|hs|cc|lo|mi|pl|vs|vc|hi|ls|ge|lt|gt|le|al)?\s+([A-Za-z_.$][\w.$]*|\d+[bf])$", re.I)
+
+# 무시하는 지시어
+_IGNORED = {".global", ".globl", ".text", ".data", ".bss", ".section", ".type", ".size",
+            ".end", ".arm", ".syntax", ".code", ".fpu", ".cpu", ".func", ".endfunc", ".ltorg"}
+
+
+class Program:
+    """
+    어셈블 결과 이미지.
+    code: 주소 -> DecodedInstruction, data: [(주소, bytes)], symbols: 이름 -> 주소,
+    breakpoints: '@@ break' 다음 명령어 주소들, lines: 주소 -> 소스 줄 번호
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.entry = base
+        self.code = {}
+        self.data = []
+        self.symbols = {}
+        self.breakpoints = []
+        self.lines = {}
+
+
+def strip_comment(line):
+    """'//', '@'(단 '@@' 지시어는 남김) 주석과 줄 맨 앞 '#' 주석 제거"""
+    if line.lstrip().startswith("#"):
+        return ""
+    line = line.split("//", 1)[0]
+    line = re.sub(r"(?<!@)@(?!@).*$", "", line)
+    return line.strip()
+
+
+def _parse_values(text):
+    return [v.strip() for v in text.split(",") if v.strip()]
+
+
+class _Assembler:
+    def __init__(self, base):
+        self.program = Program(base)
+        self.local_labels = {}  # 숫자 -> [주소]
+        self.items = []  # pass 2 대상 (kind, addr, payload, lineno)
+        self.loc = base
+
+    def error(self, lineno, message):
+        raise Exception(f"line {lineno}: {message}")
+
+    # --- 심볼 ---
+    def resolve(self, name, addr):
+        """심볼 이름(로컬 참조 1b/1f 포함)을 주소로. 모르면 None"""
+        m = _LOCAL_REF.match(name)
+        if m:
+            candidates = self.local_labels.get(m.group(1), [])
+            if m.group(2) == "b":
+                before = [a for a in candidates if a <= addr]
+                return before[-1] if before else None
+            after = [a for a in candidates if a > addr]
+            return after[0] if after else None
+        return self.program.symbols.get(name)
+
+    def value(self, text, addr, lineno):
+        try:
+            return int(text.replace("#", ""), 0)
+        except ValueError:
+            value = self.resolve(text, addr)
+            if value is None:
+                self.error(lineno, f"Undefined symbol '{text}'")
+            return value
+
+    def fixed_address(self, tokens, lineno):
+        """'@@ 0xADDR'의 주소 (tokens는 '@@' 다음 토큰들)"""
+        if not tokens:
+            self.error(lineno, "Missing address after '@@'")
+        try:
+            return int(tokens[0], 16)
+        except ValueError:
+            self.error(lineno, f"Invalid address '{tokens[0]}'")
+
+    # --- pass 1 ---
+    def pass1(self, lines):
+        program = self.program
+        pending_break = False
+        for lineno, raw in enumerate(lines, start=1):
+            line = strip_comment(raw)
+            while True:
+                m = _LABEL.match(line)
+                if not m:
+                    break
+                name = m.group(1)
+                line = line[m.end():].strip()
+                if name.isdigit():
+                    self.local_labels.setdefault(name, []).append(self.loc)
+                elif line.startswith("@@"):
+                    # name: @@ 0xADDR -> 고정 주소 라벨
+                    program.symbols[name] = self.fixed_address(line.split()[1:], lineno)
+                    line = ""
+                else:
+                    program.symbols[name] = self.loc
+            if not line:
+                continue
+            if line.startswith("@@"):
+                if line.split()[1:2] == ["break"]:
+                    pending_break = True
+                continue
+            tokens = line.replace(",", " ").split()
+            if tokens[0].startswith("."):
+                self.directive(tokens, line, lineno)
+                continue
+            if pending_break:
+                program.breakpoints.append(self.loc)
+                pending_break = False
+            self.items.append(("instr", self.loc, line, lineno))
+            program.lines[self.loc] = lineno
+            self.loc += 4
+
+    def directive(self, tokens, line, lineno):
+        program = self.program
+        name = tokens[0].lower()
+        args = line.split(None, 1)[1] if len(tokens) > 1 else ""
+        if name == ".extern":
+            # .extern label @@ 0xADDR
+            if "@@" in tokens:
+                i = tokens.index("@@")
+                if i < 2:
+                    self.error(lineno, "Missing label name in .extern")
+                program.symbols[tokens[1]] = self.fixed_address(tokens[i + 1:], lineno)
+        elif name in (".equ", ".set"):
+            program.symbols[tokens[1]] = self.value(tokens[2], self.loc, lineno)
+        elif name in (".word", ".long", ".hword", ".short", ".byte"):
+            size = {".word": 4, ".long": 4, ".hword": 2, ".short": 2, ".byte": 1}[name]
+            for v in _parse_values(args):
+                self.items.append(("data", self.loc, (v, size), lineno))
+                self.loc += size
+        elif name in (".space", ".skip"):
+            values = _parse_values(args)
+            size = self.value(values[0], self.loc, lineno)
+            fill = self.value(values[1], self.loc, lineno) if len(values) > 1 else 0
+            if fill:
+                program.data.append((self.loc, bytes([fill & 0xFF]) * size))
+            self.loc += size
+        elif name in (".align", ".balign"):
+            n = self.value(tokens[1], self.loc, lineno) if len(tokens) > 1 else 2
+            align = n if name == ".balign" else 1 << n
+            self.loc = (self.loc + align - 1) & ~(align - 1)
+        elif name == ".org":
+            self.loc = self.value(tokens[1], self.loc, lineno)
+        elif name not in _IGNORED:
+            self.error(lineno, f"Unknown directive {tokens[0]}")
+
+    # --- pass 2 ---
+    def pass2(self):
+        program = self.program
+        for kind, addr, payload, lineno in self.items:
+            if kind == "data":
+                text, size = payload
+                value = self.value(text, addr, lineno) & ((1 << (size * 8)) - 1)
+                program.data.append((addr, value.to_bytes(size, "little")))
+                continue
+            source = payload
+            resolved = _SYMBOL_OPERAND.sub(lambda m: self._literal(m, addr), source)
+            m = _BRANCH.match(resolved)
+            if m:
+                # b/bl label -> b/bl 0xADDR (모르는 라벨은 실행 시점에 찾는다)
+                target = self.resolve(m.group(3), addr)
+                if target is not None:
+                    resolved = f"{resolved[:m.start(3)]}0x{target:X}"
+            try:
+                decoded = decode_instruction(None, resolved)
+            except Exception as e:
+                decoded = invalid_instruction(source, f"line {lineno}: {e}")
+            decoded.text = source
+            program.code[addr] = decoded
+        for name in ("_start", "main"):
+            if name in program.symbols:
+                program.entry = program.symbols[name]
+                break
+        return program
+
+    def _literal(self, m, addr):
+        value = self.resolve(m.group(1), addr)
+        return m.group(0) if value is None else f"=0x{value:X}"
+
+
+def assemble(lines, base=CODE_BASE):
+    """소스 줄 리스트(또는 iterable)를 Program으로 어셈블합니다."""
+    assembler = _Assembler(base)
+    assembler.pass1(lines)
+    return assembler.pass2()
+
+
+def assemble_file(path, base=CODE_BASE):
+    with open(path, "r") as f:
+        return assemble(f, base)
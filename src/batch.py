@@ -0,0 +1,120 @@
+import json
+import sys
+import time
+from assembler import CODE_BASE, assemble_file
+from debugger import Breakpoint, Watchpoint
+from loader import is_image
+from registers import PC
+
+
+def dump_state(sim):
+    """레지스터/메모리/라벨을 JSON으로 직렬화 가능한 dict로 반환"""
+    return {
+        "registers": sim.registers.grouped(),
+        "memory": {f"0x{addr:08X}": value for addr, value in sim.memory.items()},
+        "labels": dict(sim.labels),
+    }
+
+
+def run_batch(sim, max_steps=None, verbose=0, log=sys.stderr, blocks=True):
+    """
+    올려 둔 프로그램을 curses 없이 코드 끝/breakpoint/max_steps까지 실행합니다.
+    history에는 기록하지 않습니다. -vv(verbose > 1)이면 한 명령어씩 실행하며 로그를 남깁니다.
+    반환값: {"status": "completed" | "breakpoint" | "watchpoint" | "budget" | "fault", "steps": n, "pc": pc, ...}
+    """
+    start_steps = sim.steps
+    try:
+        if verbose > 1:
+            sim.halt = None
+            while sim.registers.read(PC) in sim.code and sim.halt is None:
+                if max_steps is not None and sim.steps - start_steps >= max_steps:
+                    break
+                pc = sim.registers.read(PC)
+                if pc in sim.breakpoints and sim.steps != start_steps and sim.debugger.check(pc):
+                    break
+                cmd = sim.code[pc].text
+                sim.step()
+                log.write(f"Executed: {cmd}\n")
+        else:
+            sim.run(max_steps, blocks)
+    except Exception as e:
+        pc = sim.registers.read(PC) - 4
+        cmd = sim.code[pc].text if pc in sim.code else None
+        if verbose:
+            log.write(f"Error: {e} (cmd: {cmd})\n")
+        return {"status": "fault", "steps": sim.steps - start_steps, "pc": pc, "error": str(e), "instruction": cmd}
+    pc = sim.registers.read(PC)
+    result = {"status": "budget", "steps": sim.steps - start_steps, "pc": pc}
+    if isinstance(sim.halt, Breakpoint):
+        result["status"] = "breakpoint"
+    elif isinstance(sim.halt, Watchpoint):
+        result["status"] = "watchpoint"
+    elif pc not in sim.code:
+        result["status"] = "completed"
+    if sim.halt is not None:
+        result["stop"] = str(sim.halt)
+    return result
+
+
+def batch_main(sim, path, max_steps=None, stop_at_break=True, verbose=1, output=None, blocks=True, profile=None,
+               stats=False, base=CODE_BASE):
+    """
+    --batch 진입점. 결과 JSON을 output(없으면 stdout)에 쓰고 종료 코드를 반환합니다.
+    profile이 있으면 프로파일러를 켜고 collapsed stack을 그 파일에 쓰며, 보고서는 stderr에 남깁니다.
+    stats이면 호스트 계측(MIPS, 구간별 샘플, 타이머)을 결과 JSON의 "stats"와 stderr 보고서로 남깁니다.
+    path가 ELF/raw 바이너리 이미지면 어셈블 대신 load_image()로 올립니다 (raw 이미지는 base에).
+    종료 코드: 0 = 정상 종료/breakpoint/watchpoint/명령어 한도 도달, 1 = 실행 중 fault, 2 = 읽기/어셈블 실패
+    """
+    if stats:
+        sim.hoststats.enable()
+    start = time.perf_counter_ns()
+    try:
+        if is_image(path):
+            sim.load_image(path, base)
+            phase = "load"
+        else:
+            sim.load_program(assemble_file(path))
+            phase = "assemble"
+    except Exception as e:
+        # 파일이 없거나 어셈블에 실패하면 실행하지 않고 같은 형식의 결과를 남긴다
+        if verbose:
+            sys.stderr.write(f"Error: {e}\n")
+        write_result({"status": "error", "steps": 0, "error": str(e)}, verbose, output)
+        return 2
+    if stats:
+        sim.hoststats.add(phase, time.perf_counter_ns() - start)
+    if not stop_at_break:
+        sim.debugger.clear_breakpoints()
+    if profile:
+        sim.profiler.enable()
+    result = run_batch(sim, max_steps, verbose, blocks=blocks)
+    sim.bus.flush()  # UART 출력을 결과 JSON보다 먼저
+    result["state"] = dump_state(sim)
+    if stats:
+        sim.hoststats.disable()
+        result["stats"] = sim.hoststats.summary()
+        if verbose:
+            sys.stderr.write("\n".join(sim.hoststats.report()) + "\n")
+    if profile:
+        sim.profiler.disable()
+        sim.profiler.save_collapsed(profile)
+        result["profile"] = {
+            "functions": {name: list(counts) for name, counts in sim.profiler.functions().items()},
+            "opcodes": dict(sim.profiler.op_counts()),
+        }
+        if verbose:
+            sys.stderr.write("\n".join(sim.profiler.report()) + "\n")
+    if verbose:
+        sys.stderr.write(f"{result['status']}: {result['steps']} instructions\n")
+    write_result(result, verbose, output)
+    return 1 if result["status"] == "fault" else 0
+
+
+def write_result(result, verbose, output):
+    """결과 JSON을 output 파일(없으면 stdout)에 쓴다"""
+    text = json.dumps(result, indent=2 if verbose else None)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
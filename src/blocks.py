@@ -0,0 +1,125 @@
+"""
+기본 블록 변환 캐시.
+
+분기나 라벨(또는 breakpoint)을 만나기 전까지의 직선 구간을 파이썬 함수 하나로 만들어 두고(compile),
+시작 주소로 캐시한다. 블록 함수는 각 명령어 전에 pc를 단일 스텝과 똑같이 갱신하므로
+중간에 예외가 나도 pc는 문제의 명령어 다음을 가리킨다. 블록 함수는 실행한 명령어 수를 반환하며,
+watchpoint가 걸리면 그 명령어까지만 실행하고 돌아온다.
+이미지처럼 코드를 메모리에서 가져올 때는 블록이 덮는 워드에 쓰기가 일어나면 그 블록을 버린다.
+"""
+from decoder import Op
+from loader import ImageCode
+from memory import PAGE_SHIFT, PAGE_SIZE
+from registers import PC
+
+MAX_BLOCK_LEN = 64
+
+# 메모리에 접근하는 명령어: 실행 뒤 watchpoint가 sim.halt를 세웠는지 확인한다
+MEMORY_OPS = {Op.LDR, Op.STR, Op.LDM, Op.STM, Op.PUSH, Op.POP}
+
+
+class Block:
+    __slots__ = ("start", "end", "count", "run")
+
+    def __init__(self, start, end, count, run):
+        self.start = start
+        self.end = end  # 블록 다음 주소
+        self.count = count
+        self.run = run
+
+
+def translate_block(sim, start):
+    """start부터 직선 구간을 모아 Block으로 변환 (start에 명령어가 없으면 None)"""
+    code = sim.code
+    label_addrs = set(sim.labels.values()) | sim.breakpoints
+    instrs = []
+    addr = start
+    while addr in code and len(instrs) < MAX_BLOCK_LEN:
+        if addr != start and addr in label_addrs:
+            break
+        decoded = code[addr]
+        instrs.append(decoded)
+        addr += 4
+        if decoded.writes_pc:
+            break
+    if not instrs:
+        return None
+
+    namespace = {}
+    lines = ["def _block(sim):", "    slots = sim.registers.slots"]
+    for i, decoded in enumerate(instrs):
+        namespace[f"h{i}"] = decoded.handler
+        arg_names = []
+        for j, arg in enumerate(decoded.args):
+            namespace[f"a{i}_{j}"] = arg
+            arg_names.append(f"a{i}_{j}")
+        lines.append(f"    slots[{PC}] = {start + (i + 1) * 4}")
+        lines.append(f"    h{i}(sim{''.join(', ' + a for a in arg_names)})")
+        if decoded.op in MEMORY_OPS:
+            lines.append(f"    if sim.halt is not None: return {i + 1}")
+    lines.append(f"    return {len(instrs)}")
+    source = "\n".join(lines) + "\n"
+    exec(compile(source, f"<block 0x{start:08X}>", "exec"), namespace)
+    return Block(start, addr, len(instrs), namespace["_block"])
+
+
+class BlockCache:
+    def __init__(self, sim):
+        self.sim = sim
+        self.blocks = {}  # 시작 주소 -> Block
+        self.page_blocks = {}  # 페이지 번호 -> {시작 주소}
+        self.watches = {}  # 페이지 번호 -> 쓰기 감시 Region
+
+    def get(self, addr):
+        block = self.blocks.get(addr)
+        if block is None:
+            block = translate_block(self.sim, addr)
+            if block is None:
+                return None
+            self.blocks[addr] = block
+            # 이미지만 코드를 메모리에서 가져온다. 어셈블한 프로그램의 데이터 쓰기는 블록과 무관하다
+            watch = isinstance(self.sim.code, ImageCode)
+            for pn in range(block.start >> PAGE_SHIFT, ((block.end - 1) >> PAGE_SHIFT) + 1):
+                self.page_blocks.setdefault(pn, set()).add(addr)
+                if watch and pn not in self.watches:
+                    self.watches[pn] = self.sim.memory.watch_writes(pn << PAGE_SHIFT, PAGE_SIZE, self._on_write)
+        return block
+
+    def _on_write(self, addr, size, value):
+        self.invalidate_range(addr, size)
+
+    def invalidate_addr(self, addr):
+        """addr를 중간에 지나가는 블록을 버린다 (breakpoint 추가 시)"""
+        for start in list(self.page_blocks.get(addr >> PAGE_SHIFT, ())):
+            block = self.blocks.get(start)
+            if block is not None and block.start < addr < block.end:
+                self.invalidate_block(block)
+
+    def invalidate_range(self, addr, size):
+        """[addr, addr+size)와 겹치는 블록을 버린다 (코드 쓰기, 되돌리기)"""
+        end = addr + size
+        for pn in range(addr >> PAGE_SHIFT, ((end - 1) >> PAGE_SHIFT) + 1):
+            for start in list(self.page_blocks.get(pn, ())):
+                block = self.blocks.get(start)
+                if block is not None and block.start < end and addr < block.end:
+                    self.invalidate_block(block)
+
+    def invalidate_block(self, block):
+        self.blocks.pop(block.start, None)
+        for pn in range(block.start >> PAGE_SHIFT, ((block.end - 1) >> PAGE_SHIFT) + 1):
+            starts = self.page_blocks.get(pn)
+            if starts is None:
+                continue
+            starts.discard(block.start)
+            if not starts:
+                del self.page_blocks[pn]
+                region = self.watches.pop(pn, None)
+                if region is not None:
+                    self.sim.memory.unwatch(region)
+
+    def clear(self):
+        for region in self.watches.values():
+            self.sim.memory.unwatch(region)
+        self.watches.clear()
+        self.blocks.clear()
+        self.page_blocks.clear()
@@ -0,0 +1,73 @@
+from registers import CPSR
+
+
+class ChangeSet:
+    """
+    명령어 하나가 바꾼 상태를 쓰기 훅으로 모은 것.
+    전체 상태를 복사하지 않고, 처음 바뀌기 직전의 값만 기록한다.
+
+    registers: 물리 슬롯 -> 이전 값
+    memory:    [(주소, 이전 bytes)]  (쓰기 순서대로)
+    stack:     mode -> [base, removed]
+               base 아래 엔트리는 그대로이고, removed는 원래 stack[base:] 였던 엔트리들
+    labels:    이름 -> 이전 주소 (없던 라벨이면 None)
+    devices:   장치 이름 -> 이전 상태 (Device.dump())
+    """
+    __slots__ = ("registers", "memory", "stack", "labels", "devices")
+
+    def __init__(self):
+        self.registers = {}
+        self.memory = []
+        self.stack = {}
+        self.labels = {}
+        self.devices = {}
+
+    def stack_push(self, mode, stack):
+        """stack에 엔트리를 추가하기 직전에 호출"""
+        if mode not in self.stack:
+            self.stack[mode] = [len(stack), []]
+
+    def stack_pop(self, mode, stack, count):
+        """stack 끝에서 count개를 꺼내기 직전에 호출"""
+        record = self.stack.get(mode)
+        if record is None:
+            record = self.stack[mode] = [len(stack), []]
+        new_len = len(stack) - count
+        if new_len < record[0]:
+            record[1][0:0] = stack[new_len:record[0]]
+            record[0] = new_len
+
+    def memory_words(self):
+        """쓰기가 일어난 워드 주소 집합 (4바이트 정렬)"""
+        words = set()
+        for addr, old in self.memory:
+            for word in range(addr & ~3, addr + len(old), 4):
+                words.add(word)
+        return words
+
+    def is_empty(self):
+        return not (self.registers or self.memory or self.stack or self.labels or self.devices)
+
+    def revert(self, sim):
+        """기록된 이전 값으로 되돌린다 (기록 중이 아닐 때 호출해야 함)."""
+        registers = sim.registers
+        slots = registers.slots
+        for slot, old in self.registers.items():
+            slots[slot] = old
+        if CPSR in self.registers:
+            registers.flag_kind = None  # 되돌린 CPSR이 최신 플래그
+        registers.switch_mode(registers.read(CPSR) & 0x1F)
+        for addr, old in reversed(self.memory):
+            sim.memory.load(addr, old)
+            sim.invalidate_code(addr, len(old))  # load는 쓰기 훅을 거치지 않는다
+        for mode, (base, removed) in self.stack.items():
+            stack = sim.stack[mode]
+            del stack[base:]
+            stack.extend(removed)
+        for name, old in self.labels.items():
+            if old is None:
+                sim.labels.pop(name, None)
+            else:
+                sim.labels[name] = old
+        for name, old in self.devices.items():
+            sim.bus.devices[name].load(old)
@@ -0,0 +1,235 @@
+"""
+breakpoint / watchpoint 엔진.
+
+- breakpoint: pc 주소 집합(sim.breakpoints)으로 확인하므로 run() 루프에서는 set 조회 한 번이면 된다.
+  조건식(예: "r0 == 0x1000")은 그 주소에 닿았을 때만 평가한다.
+- watchpoint: 감시 구간이 걸친 페이지에만 메모리 훅을 걸므로 나머지 페이지 접근은 비용이 없다.
+  훅이 걸린 페이지에서는 시작 주소로 정렬한 구간 목록(+ 누적 최대 끝 주소)을 이분 탐색해 겹치는 구간을 찾는다.
+
+멈출 일이 생기면 sim.halt 에 Breakpoint/Watchpoint를 넣고, run()은 그 명령어를 끝낸 뒤 멈춘다.
+"""
+import ast
+import bisect
+from memory import PAGE_SHIFT, PAGE_SIZE
+from registers import REG_INDEX
+
+# 조건식에 쓸 수 있는 문법 요소
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load,
+    ast.Constant, ast.Call, ast.And, ast.Or, ast.Not, ast.Invert, ast.USub, ast.UAdd,
+    ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod, ast.BitAnd, ast.BitOr, ast.BitXor,
+    ast.LShift, ast.RShift, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+class Breakpoint:
+    __slots__ = ("id", "addr", "condition", "code", "hits")
+
+    def __init__(self, id, addr, condition=None, code=None):
+        self.id = id
+        self.addr = addr
+        self.condition = condition  # 조건식 소스 (없으면 무조건)
+        self.code = code
+        self.hits = 0
+
+    def __str__(self):
+        cond = f" if {self.condition}" if self.condition else ""
+        return f"Breakpoint {self.id} at 0x{self.addr:08X}{cond}"
+
+
+class Watchpoint:
+    __slots__ = ("id", "start", "end", "access", "hits", "last")
+
+    def __init__(self, id, start, size, access):
+        self.id = id
+        self.start = start
+        self.end = start + size
+        self.access = access  # "r", "w", "rw"
+        self.hits = 0
+        self.last = None  # 마지막 접근 (종류, 주소, 크기, 쓴 값)
+
+    def __str__(self):
+        text = f"Watchpoint {self.id} ({self.access}) on 0x{self.start:08X}-0x{self.end:08X}"
+        if self.last is not None:
+            kind, addr, size, value = self.last
+            text += f": {kind} 0x{addr:08X}" + (f" = 0x{value:X}" if value is not None else "")
+        return text
+
+
+class _Scope:
+    """조건식 평가용 이름 공간: 레지스터, label, mem(addr)"""
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def __getitem__(self, name):
+        sim = self.sim
+        index = REG_INDEX.get(name)
+        if index is not None:
+            return sim.registers.read(index)
+        if name == "mem":
+            return self.mem
+        if name in sim.labels:
+            return sim.labels[name]
+        raise KeyError(name)
+
+    def mem(self, addr):
+        # 훅(watchpoint)을 거치지 않고 읽는다
+        return int.from_bytes(self.sim.memory.read_block(addr, 4), "little")
+
+
+def compile_condition(text):
+    """조건식 소스를 검사하고 compile한 코드 객체를 반환"""
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError:
+        raise Exception(f"Invalid condition: {text}")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise Exception(f"Unsupported syntax in condition: {text}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id == "mem"):
+            raise Exception(f"Only mem(addr) can be called in condition: {text}")
+    return compile(tree, f"<condition {text}>", "eval")
+
+
+class Debugger:
+    def __init__(self, sim):
+        self.sim = sim
+        self.by_addr = {}  # 주소 -> [Breakpoint]
+        self.watches = []  # 시작 주소 순으로 정렬한 Watchpoint
+        self.starts = []  # watches의 시작 주소
+        self.max_ends = []  # watches[:i+1] 중 가장 큰 끝 주소
+        self.hooks = {}  # (페이지 번호, "r" | "w") -> Region
+        self.scope = _Scope(sim)
+        self.next_id = 1
+
+    def resolve(self, where):
+        """숫자 문자열/정수/label 이름을 주소로 변환"""
+        if isinstance(where, int):
+            return where
+        try:
+            return int(where, 0)
+        except ValueError:
+            addr = self.sim.get_label(where)
+            if addr is None:
+                raise Exception(f"Unknown label: {where}")
+            return addr
+
+    # --- breakpoint ---
+    def add_breakpoint(self, where, condition=None):
+        addr = self.resolve(where)
+        code = compile_condition(condition) if condition else None
+        bp = Breakpoint(self.next_id, addr, condition, code)
+        self.next_id += 1
+        self.by_addr.setdefault(addr, []).append(bp)
+        if addr not in self.sim.breakpoints:
+            self.sim.breakpoints.add(addr)
+            # 이미 변환된 블록이 이 주소를 지나가면 여기서 끊기도록 다시 만든다
+            self.sim.blocks.invalidate_addr(addr)
+        return bp
+
+    def check(self, pc):
+        """pc의 breakpoint 중 조건을 만족하는 것이 있으면 sim.halt에 넣고 True"""
+        for bp in self.by_addr.get(pc, ()):
+            if bp.code is not None:
+                try:
+                    if not eval(bp.code, {"__builtins__": {}}, self.scope):
+                        continue
+                except Exception as e:
+                    raise Exception(f"{bp}: {e}")
+            bp.hits += 1
+            self.sim.halt = bp
+            return True
+        return False
+
+    def clear_breakpoints(self):
+        self.by_addr.clear()
+        self.sim.breakpoints.clear()
+
+    # --- watchpoint ---
+    def add_watchpoint(self, where, size=4, access="w"):
+        if access not in ("r", "w", "rw"):
+            raise Exception(f"Invalid watch access: {access}")
+        if size <= 0:
+            raise Exception(f"Invalid watch size: {size}")
+        wp = Watchpoint(self.next_id, self.resolve(where), size, access)
+        self.next_id += 1
+        self.watches.append(wp)
+        self._rebuild_watches()
+        return wp
+
+    def _rebuild_watches(self):
+        """구간 색인과 페이지 훅을 현재 watchpoint 목록에 맞게 다시 만든다 (추가/삭제 때만)"""
+        memory = self.sim.memory
+        self.watches.sort(key=lambda wp: wp.start)
+        self.starts = [wp.start for wp in self.watches]
+        self.max_ends = []
+        max_end = 0
+        for wp in self.watches:
+            max_end = max(max_end, wp.end)
+            self.max_ends.append(max_end)
+        needed = set()
+        for wp in self.watches:
+            for pn in range(wp.start >> PAGE_SHIFT, ((wp.end - 1) >> PAGE_SHIFT) + 1):
+                for kind in wp.access:
+                    needed.add((pn, kind))
+        for key in list(self.hooks):
+            if key not in needed:
+                memory.unwatch(self.hooks.pop(key))
+        for pn, kind in needed - set(self.hooks):
+            if kind == "r":
+                self.hooks[(pn, kind)] = memory.watch_reads(pn << PAGE_SHIFT, PAGE_SIZE, self._on_read)
+            else:
+                self.hooks[(pn, kind)] = memory.watch_writes(pn << PAGE_SHIFT, PAGE_SIZE, self._on_write)
+
+    def find_watch(self, addr, size, kind):
+        """[addr, addr+size)와 겹치고 kind 접근을 감시하는 watchpoint (없으면 None)"""
+        i = bisect.bisect_left(self.starts, addr + size)  # watches[:i]만 시작 주소가 구간 끝보다 앞
+        while i > 0 and self.max_ends[i - 1] > addr:
+            i -= 1
+            wp = self.watches[i]
+            if wp.end > addr and kind in wp.access:
+                return wp
+        return None
+
+    def _on_read(self, addr, size):
+        self._hit(addr, size, "r", None)
+
+    def _on_write(self, addr, size, value):
+        self._hit(addr, size, "w", value)
+
+    def _hit(self, addr, size, kind, value):
+        wp = self.find_watch(addr, size, kind)
+        if wp is None:
+            return
+        wp.hits += 1
+        wp.last = ("read" if kind == "r" else "write", addr, size, value)
+        if self.sim.halt is None:
+            self.sim.halt = wp
+
+    # --- 공통 ---
+    def remove(self, id):
+        for addr, bps in list(self.by_addr.items()):
+            for bp in bps:
+                if bp.id == id:
+                    bps.remove(bp)
+                    if not bps:
+                        del self.by_addr[addr]
+                        self.sim.breakpoints.discard(addr)
+                    return bp
+        for wp in self.watches:
+            if wp.id == id:
+                self.watches.remove(wp)
+                self._rebuild_watches()
+                return wp
+        raise Exception(f"No breakpoint or watchpoint {id}")
+
+    def clear(self):
+        self.clear_breakpoints()
+        self.watches.clear()
+        self._rebuild_watches()
+
+    def items(self):
+        """모든 breakpoint/watchpoint를 번호 순서로 반환"""
+        out = [bp for bps in self.by_addr.values() for bp in bps] + self.watches
+        return sorted(out, key=lambda item: item.id)
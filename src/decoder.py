@@ -0,0 +1,179 @@
+from enum import IntEnum
+from instructions.ldr import LOAD_WIDTHS, decode_ldr
+from instructions.str import STORE_WIDTHS, decode_str
+from instructions.push import decode_push, exec_pop, exec_push
+from instructions.ldm import LDM_OPS, decode_ldm
+from instructions.dataproc import DP_OPS, SHIFT_OPS, decode_dataproc, exec_nop
+from instructions.branch import decode_branch
+from instructions.system import SYSTEM_OPS, decode_system
+from registers import COND_AL, COND_INDEX, PC
+
+
+class Op(IntEnum):
+    EXTERN = 0
+    MOV = 1
+    ADD = 2
+    LDR = 3
+    PUSH = 4
+    SUB = 5
+    ADC = 6
+    SBC = 7
+    RSB = 8
+    RSC = 9
+    AND = 10
+    ORR = 11
+    EOR = 12
+    BIC = 13
+    MVN = 14
+    CMP = 15
+    CMN = 16
+    TST = 17
+    TEQ = 18
+    B = 19
+    BL = 20
+    BX = 21
+    NOP = 22
+    STR = 23
+    LDM = 24
+    STM = 25
+    POP = 26
+    MRS = 27
+    MSR = 28
+    CPS = 29
+    SVC = 30
+    MUL = 31
+    INVALID = 0xFF
+
+
+# S 접미사를 붙일 수 있는 니모닉과 전체 기본 니모닉
+_S_BASES = DP_OPS
+_BASES = DP_OPS | set(LOAD_WIDTHS) | set(STORE_WIDTHS) | LDM_OPS | SYSTEM_OPS | {"PUSH", "POP", "B", "BL", "BX", "NOP"}
+
+
+class DecodedInstruction:
+    """
+    한 줄의 소스를 미리 해석해 둔 결과.
+    실행 시에는 handler(sim, *args)만 호출하면 되므로 토큰화/파싱 비용이 없다.
+    """
+    __slots__ = ("op", "handler", "args", "text", "writes_pc")
+
+    def __init__(self, op, handler, args, text, writes_pc=False):
+        self.op = op
+        self.handler = handler
+        self.args = args
+        self.text = text
+        self.writes_pc = writes_pc  # pc를 바꿀 수 있는 명령어 (블록을 여기서 끝낸다)
+
+    def execute(self, sim):
+        self.handler(sim, *self.args)
+
+    def __repr__(self):
+        return f"<{self.op.name} {self.text!r}>"
+
+
+def exec_invalid(sim, message):
+    raise Exception(message)
+
+
+def exec_cond(sim, cond, handler, args):
+    """조건부 실행: 조건 코드를 통과할 때만 실제 핸들러 호출"""
+    if sim.registers.condition_passed(cond):
+        handler(sim, *args)
+
+
+def split_mnemonic(mnemonic):
+    """
+    'ADDSEQ', 'ADDEQS', 'BNE', 'BLLT' 같은 니모닉을 (기본 니모닉, S 여부, 조건 코드)로 나눈다.
+    알 수 없으면 None.
+    """
+    for n in (5, 4, 3, 2, 1):
+        base = mnemonic[:n]
+        if base not in _BASES:
+            continue
+        rest = mnemonic[n:].lower()
+        setflags = False
+        if base in _S_BASES:
+            if rest.startswith("s"):
+                setflags, rest = True, rest[1:]
+            elif rest.endswith("s") and rest[:-1] in COND_INDEX:
+                setflags, rest = True, rest[:-1]
+        if not rest:
+            return base, setflags, COND_AL
+        if rest in COND_INDEX:
+            return base, setflags, COND_INDEX[rest]
+    return None
+
+
+def invalid_instruction(instruction, error):
+    """해석에 실패한 줄: 실행될 때 원래 에러를 낸다 (load 시점이 아니라 실행 시점에 fault)"""
+    return DecodedInstruction(Op.INVALID, exec_invalid, (str(error),), instruction)
+
+
+def exec_extern(sim, name, addr):
+    sim.add_label(name, addr)
+
+
+def decode_extern(tokens):
+    # extern 라벨 선언 처리 (.extern label @@ 0xADDR)
+    name = tokens[1]
+    addr = 0
+    for i, t in enumerate(tokens):
+        if t == "@@":
+            # 다음 토큰이 주소임
+            if i + 1 < len(tokens) and tokens[i + 1].startswith("0x"):
+                addr = int(tokens[i + 1], 16)
+    return (name, addr)
+
+
+def decode_instruction(sim, instruction):
+    """
+    소스 한 줄을 DecodedInstruction으로 변환합니다.
+    빈 줄이면 None을 반환합니다.
+    """
+    tokens = instruction.strip().replace(',', '').split()
+    if not tokens:
+        return None
+
+    if tokens[0].lower() == ".extern":
+        return DecodedInstruction(Op.EXTERN, exec_extern, decode_extern(tokens), instruction)
+
+    split = split_mnemonic(tokens[0].upper())
+    if split is None:
+        raise Exception(f"Unsupported instruction: {instruction}")
+    base, setflags, cond = split
+    writes_pc = False
+    if base in DP_OPS:
+        handler, args = decode_dataproc(sim, base, setflags, tokens)
+        op = Op.MOV if base in SHIFT_OPS else Op[base]
+        writes_pc = base not in ("CMP", "CMN", "TST", "TEQ") and tokens[1].lower() == "pc"
+    elif base in ("B", "BL", "BX"):
+        handler, args = decode_branch(sim, base, tokens)
+        op = Op[base]
+        writes_pc = True
+    elif base == "NOP" and len(tokens) == 1:
+        handler, args, op = exec_nop, (), Op.NOP
+    elif base in LOAD_WIDTHS and len(tokens) >= 3:
+        handler, args = decode_ldr(sim, tokens, base)
+        op = Op.LDR
+        writes_pc = tokens[1].lower() == "pc"
+    elif base in STORE_WIDTHS and len(tokens) >= 3:
+        handler, args = decode_str(sim, tokens, base)
+        op = Op.STR
+    elif base in LDM_OPS:
+        handler, args = decode_ldm(sim, base, tokens)
+        op = Op.LDM if base.startswith("LDM") else Op.STM
+        writes_pc = op == Op.LDM and PC in args[1]
+    elif base in ("PUSH", "POP"):
+        args = decode_push(sim, tokens)
+        handler, op = (exec_push, Op.PUSH) if base == "PUSH" else (exec_pop, Op.POP)
+        writes_pc = base == "POP" and PC in args[0]
+    elif base in SYSTEM_OPS:
+        handler, args = decode_system(sim, base, tokens)
+        op = Op.SVC if base == "SWI" else Op[base[:3]]
+        # CPSR을 바꾸면 대기 중이던 인터럽트가 바로 들어올 수 있으므로 MSR/CPS도 블록을 끝낸다
+        writes_pc = op != Op.MRS
+    else:
+        raise Exception(f"Unsupported instruction: {instruction}")
+    if cond != COND_AL:
+        handler, args = exec_cond, (cond, handler, args)
+    return DecodedInstruction(op, handler, args, instruction, writes_pc)
@@ -0,0 +1,391 @@
+"""
+메모리 맵 주변장치 (MMIO).
+
+Bus.attach()가 장치의 주소 구간을 Memory.map_region(MMIO)으로 걸기 때문에 그 페이지의 접근만
+read_hooks/write_hooks 조회를 거치고, 나머지 RAM 접근은 페이지 번호 dict 조회 한 번 외에 추가 비용이 없다.
+장치 시간은 실행한 명령어 수(sim.steps) 단위이며, 타이머 만료는 Interrupts의 이벤트(next_event)로 예약된다.
+
+기본 장치 (attach_defaults, versatilepb 주소. 레지스터는 각 장치의 일부만):
+    0x10140000  InterruptController (PL190 VIC) -> CPU irq/fiq 라인
+    0x101E2000  Timer (SP804 타이머 하나, 1 명령어에 1씩 감소)  VIC 라인 4
+    0x101F1000  Uart (PL011)                                    VIC 라인 12
+
+블록 안에서 장치에 접근하면 Bus.now()로 정확한 명령어 번호를 쓰지만, 그때 예약한 만료가 같은 블록 안에 떨어지면
+(카운터가 남은 블록 길이보다 작으면) 블록이 끝난 뒤에 처리된다.
+장치 레지스터 상태는 ChangeSet/체크포인트/스냅샷에 포함되어 step back과 save/load로 되돌아간다.
+UART로 이미 내보낸 출력은 되돌리지 않는다.
+"""
+import sys
+from interrupts import NO_EVENT
+from memory import MMIO
+from registers import PC
+
+VIC_BASE = 0x10140000
+TIMER_BASE = 0x101E2000
+UART_BASE = 0x101F1000
+TIMER_IRQ = 4
+UART_IRQ = 12
+DEVICE_SIZE = 0x1000
+UART_FLUSH = 4096  # TX 버퍼가 이만큼 차면 출력에 쓴다
+
+
+class Device:
+    """MMIO 장치. read/write는 장치 시작 주소로부터의 offset을 받는다."""
+    name = "device"
+
+    def __init__(self, base, size=DEVICE_SIZE):
+        self.base = base
+        self.size = size
+        self.bus = None
+        self.next_fire = NO_EVENT  # 이 명령어 수에 expire()가 불린다 (타이머류)
+
+    def read(self, offset, size):
+        return 0
+
+    def write(self, offset, size, value):
+        pass
+
+    def expire(self, steps):
+        pass
+
+    def reset(self):
+        pass
+
+    def dump(self):
+        """step back / 스냅샷용 상태 (JSON으로 저장할 수 있는 형태)"""
+        return {}
+
+    def load(self, state):
+        pass
+
+    def touch(self):
+        """상태를 바꾸기 직전에 호출: 기록 중인 ChangeSet에 이전 상태를 남긴다"""
+        changes = self.bus.sim.changes
+        if changes is not None and self.name not in changes.devices:
+            changes.devices[self.name] = self.dump()
+
+    def __str__(self):
+        return f"{self.name} @ 0x{self.base:08X}"
+
+
+class InterruptController(Device):
+    """
+    PL190 VIC 일부. 32개 입력 라인 중 IntEnable된 것을 IntSelect에 따라 irq/fiq로 모아 CPU 라인을 level로 유지한다.
+      0x00 IRQStatus  0x04 FIQStatus  0x08 RawIntr  0x0C IntSelect  0x10 IntEnable (쓰기: 켤 비트)
+      0x14 IntEnClear  0x18 SoftInt  0x1C SoftIntClear
+    """
+    name = "vic"
+
+    def __init__(self, base=VIC_BASE):
+        super().__init__(base)
+        self.lines = 0  # 장치가 올린 라인
+        self.soft = 0
+        self.enable = 0
+        self.select = 0  # 1 = fiq
+
+    def set_line(self, line, level):
+        """장치가 line번 입력을 올리거나(level=True) 내린다"""
+        bit = 1 << line
+        if bool(self.lines & bit) != bool(level):
+            self.touch()
+            self.lines ^= bit
+            self.update()
+
+    def status(self):
+        return (self.lines | self.soft) & self.enable
+
+    def update(self):
+        """CPU의 irq/fiq 라인을 지금 상태에 맞춘다"""
+        status = self.status()
+        interrupts = self.bus.sim.interrupts
+        interrupts.set_level("irq", bool(status & ~self.select))
+        interrupts.set_level("fiq", bool(status & self.select))
+
+    def read(self, offset, size):
+        offset &= ~3
+        if offset == 0x00:
+            return self.status() & ~self.select
+        if offset == 0x04:
+            return self.status() & self.select
+        if offset == 0x08:
+            return self.lines | self.soft
+        if offset == 0x0C:
+            return self.select
+        if offset == 0x10:
+            return self.enable
+        if offset == 0x18:
+            return self.soft
+        return 0
+
+    def write(self, offset, size, value):
+        offset &= ~3
+        self.touch()
+        if offset == 0x0C:
+            self.select = value
+        elif offset == 0x10:
+            self.enable |= value
+        elif offset == 0x14:
+            self.enable &= ~value
+        elif offset == 0x18:
+            self.soft |= value
+        elif offset == 0x1C:
+            self.soft &= ~value
+        else:
+            return
+        self.update()
+
+    def reset(self):
+        self.lines = self.soft = self.enable = self.select = 0
+
+    def dump(self):
+        return {"lines": self.lines, "soft": self.soft, "enable": self.enable, "select": self.select}
+
+    def load(self, state):
+        self.lines = state["lines"]
+        self.soft = state["soft"]
+        self.enable = state["enable"]
+        self.select = state["select"]
+        self.update()
+
+
+class Timer(Device):
+    """
+    SP804 타이머 하나. 카운터는 명령어 하나에 1씩 줄고 0이 되면 인터럽트를 올린다.
+      0x00 Load (쓰면 카운터도 다시 시작)  0x04 Value  0x08 Control  0x0C IntClr  0x10 RIS  0x14 MIS  0x18 BGLoad
+    Control: bit7 enable, bit6 periodic (Load부터 다시), bit5 interrupt enable, bit0 one-shot.
+    periodic도 one-shot도 아니면 0xFFFFFFFF부터 다시 센다 (free-running).
+    """
+    name = "timer"
+
+    def __init__(self, base=TIMER_BASE, line=TIMER_IRQ):
+        super().__init__(base)
+        self.line = line
+        self.reset()
+
+    def reset(self):
+        self.load_value = 0
+        self.value = 0xFFFFFFFF  # 멈춰 있을 때의 카운터
+        self.control = 0x20
+        self.ris = 0
+        self.next_fire = NO_EVENT
+
+    def counter(self):
+        if self.next_fire == NO_EVENT:
+            return self.value
+        return max(self.next_fire - self.bus.now(), 0)
+
+    def _start(self, count):
+        """지금부터 count 명령어 뒤에 만료되도록 예약 (enable일 때)"""
+        if self.control & 0x80:
+            self.next_fire = self.bus.now() + max(count, 1)
+        else:
+            self.value = count
+            self.next_fire = NO_EVENT
+        self.bus.sim.interrupts.schedule()
+
+    def _update_line(self):
+        self.bus.set_line(self.line, self.ris and self.control & 0x20)
+
+    def expire(self, steps):
+        self.touch()
+        self.ris = 1
+        if self.control & 0x01:
+            self.control &= ~0x80  # one-shot: 멈춘다
+            self.value = 0
+            self.next_fire = NO_EVENT
+        else:
+            reload = self.load_value if self.control & 0x40 else 0xFFFFFFFF
+            self.next_fire = steps + max(reload, 1)
+        self._update_line()
+
+    def read(self, offset, size):
+        offset &= ~3
+        if offset == 0x00 or offset == 0x18:
+            return self.load_value
+        if offset == 0x04:
+            return self.counter()
+        if offset == 0x08:
+            return self.control
+        if offset == 0x10:
+            return self.ris
+        if offset == 0x14:
+            return self.ris if self.control & 0x20 else 0
+        return 0
+
+    def write(self, offset, size, value):
+        offset &= ~3
+        self.touch()
+        if offset == 0x00:
+            self.load_value = value
+            self._start(value)
+        elif offset == 0x18:
+            self.load_value = value
+        elif offset == 0x08:
+            count = self.counter()
+            self.control = value & 0xFF
+            self._start(count)
+            self._update_line()
+        elif offset == 0x0C:
+            self.ris = 0
+            self._update_line()
+
+    def dump(self):
+        return {"load": self.load_value, "value": self.value, "control": self.control, "ris": self.ris,
+                "next_fire": self.next_fire}
+
+    def load(self, state):
+        self.load_value = state["load"]
+        self.value = state["value"]
+        self.control = state["control"]
+        self.ris = state["ris"]
+        self.next_fire = state["next_fire"]
+        self._update_line()
+        self.bus.sim.interrupts.schedule()
+
+
+class Uart(Device):
+    """
+    PL011 일부. DR에 쓴 바이트는 TX 버퍼에 모았다가 UART_FLUSH 바이트가 차거나 flush()될 때 한 번에 출력한다.
+    sent(보낸 바이트 수)는 되돌리기/스냅샷 상태에 들어가고, emitted(출력으로 넘긴 바이트 수)는 들어가지 않는다.
+    되돌린 뒤 다시 실행하며 보내는 바이트는 sent가 emitted를 넘을 때까지 출력하지 않는다 (이미 나간 출력은 못 되돌린다).
+      0x00 DR  0x18 FR (bit4 RXFE, bit7 TXFE)  0x38 IMSC  0x3C RIS  0x40 MIS  0x44 ICR
+    인터럽트: bit4 RX (받은 바이트가 있음), bit5 TX (항상 보낼 수 있음).
+    output: 바이너리 파일 객체 (None이면 sys.stdout.buffer)
+    """
+    name = "uart"
+
+    def __init__(self, base=UART_BASE, line=UART_IRQ, output=None):
+        super().__init__(base)
+        self.line = line
+        self.output = output
+        self.tx = bytearray()
+        self.rx = bytearray()
+        self.imsc = 0
+        self.sent = 0
+        self.emitted = 0
+
+    def send(self, data):
+        """받은 데이터로 data(bytes)를 넣는다 (게스트가 DR에서 읽는다)"""
+        self.touch()
+        self.rx += data
+        self._update_line()
+
+    def flush(self):
+        if self.tx:
+            output = self.output if self.output is not None else sys.stdout.buffer
+            output.write(self.tx)
+            output.flush()
+            self.tx.clear()
+
+    def ris(self):
+        return (0x10 if self.rx else 0) | 0x20
+
+    def _update_line(self):
+        self.bus.set_line(self.line, self.ris() & self.imsc)
+
+    def read(self, offset, size):
+        offset &= ~3
+        if offset == 0x00:
+            if not self.rx:
+                return 0
+            self.touch()
+            value = self.rx.pop(0)
+            self._update_line()
+            return value
+        if offset == 0x18:
+            return (0x00 if self.rx else 0x10) | 0x80
+        if offset == 0x38:
+            return self.imsc
+        if offset == 0x3C:
+            return self.ris()
+        if offset == 0x40:
+            return self.ris() & self.imsc
+        return 0
+
+    def write(self, offset, size, value):
+        offset &= ~3
+        if offset == 0x00:
+            self.touch()
+            self.sent += 1
+            if self.sent <= self.emitted:
+                return  # 되돌린 뒤 다시 보내는 바이트
+            self.emitted = self.sent
+            self.tx.append(value & 0xFF)
+            if len(self.tx) >= UART_FLUSH:
+                self.flush()
+        elif offset == 0x38:
+            self.touch()
+            self.imsc = value & 0x7FF
+            self._update_line()
+
+    def reset(self):
+        self.rx.clear()
+        self.imsc = 0
+
+    def dump(self):
+        return {"rx": self.rx.hex(), "imsc": self.imsc, "sent": self.sent}
+
+    def load(self, state):
+        self.rx = bytearray.fromhex(state["rx"])
+        self.imsc = state["imsc"]
+        self.sent = state.get("sent", self.emitted)  # sent가 없는 예전 스냅샷은 지금까지 나간 출력에 이어 붙인다
+        self._update_line()
+
+
+class Bus:
+    """장치 목록. sim.bus"""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.devices = {}  # 이름 -> Device
+        self.vic = None
+
+    def attach(self, device):
+        """device의 주소 구간을 MMIO로 매핑하고 (타이머류는) 이벤트 소스로 등록"""
+        if device.name in self.devices:
+            raise Exception(f"Device already attached: {device.name}")
+        base = device.base
+        device.bus = self
+        self.sim.memory.map_region(base, device.size, MMIO, device.name,
+                                   read=lambda addr, size: device.read(addr - base, size),
+                                   write=lambda addr, size, value: device.write(addr - base, size, value))
+        self.devices[device.name] = device
+        if isinstance(device, InterruptController):
+            self.vic = device
+        self.sim.interrupts.sources.append(device)
+        return device
+
+    def attach_defaults(self, uart_output=None):
+        """인터럽트 컨트롤러, 타이머, UART를 기본 주소에 붙인다"""
+        self.attach(InterruptController())
+        self.attach(Timer())
+        self.attach(Uart(output=uart_output))
+
+    def now(self):
+        """지금 실행 중인 명령어의 번호 (블록 실행 중이면 블록 시작의 steps + 블록 안 위치)"""
+        sim = self.sim
+        if sim.block_start is None:
+            return sim.steps
+        return sim.steps + (sim.registers.slots[PC] - sim.block_start) // 4 - 1
+
+    def set_line(self, line, level):
+        """인터럽트 컨트롤러의 line번 입력 (컨트롤러가 없으면 무시)"""
+        if self.vic is not None:
+            self.vic.set_line(line, level)
+
+    def flush(self):
+        for device in self.devices.values():
+            if isinstance(device, Uart):
+                device.flush()
+
+    def reset(self):
+        for device in self.devices.values():
+            device.reset()
+
+    def dump(self):
+        return {name: device.dump() for name, device in self.devices.items()}
+
+    def load(self, state):
+        for name, device_state in state.items():
+            if name in self.devices:
+                self.devices[name].load(device_state)
@@ -0,0 +1,155 @@
+"""
+회귀 테스트 팜: 여러 (프로그램, 초기 상태, 기대 상태) 케이스를 프로세스 풀에서 나눠 실행합니다.
+
+매니페스트는 JSON lines 파일이며 한 줄이 케이스 하나입니다:
+
+    {"name": "ctx_switch_1", "program": "examples/ex01.s",
+     "init": {"r0": 1, "sp": "0xE0", "memory": {"0x1000": "0x2000"}},
+     "expect": {"r1": 1, "memory": {"0xDC": 14}},
+     "max_steps": 100000, "stop_at_break": false}
+
+결과는 케이스마다 JSON 한 줄로 흘려보냅니다 (입력 순서 유지).
+각 워커 프로세스는 프로그램을 한 번만 어셈블하고 ARMv7Simulator 하나를 reset()으로 재사용합니다.
+
+    python src/farm.py manifest.jsonl [-j 8] [-o results.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from assembler import assemble_file
+from batch import run_batch
+from registers import register_index
+from simulator import ARMv7Simulator
+
+# 워커 프로세스별 캐시
+_programs = {}
+_sim = None
+
+
+def _int(value):
+    return int(value, 0) if isinstance(value, str) else value
+
+
+def _program(path):
+    program = _programs.get(path)
+    if program is None:
+        program = _programs[path] = assemble_file(path)
+    return program
+
+
+def apply_state(sim, state):
+    """{"r0": 1, "sp": "0x100", "memory": {"0x1000": 5}} 형태의 상태를 시뮬레이터에 반영"""
+    for name, value in state.items():
+        if name == "memory":
+            for addr, word in value.items():
+                sim.memory.write_word(_int(addr), _int(word))
+        else:
+            sim.registers.write(register_index(name), _int(value))
+
+
+def compare_state(sim, expect):
+    """기대 상태와 다른 항목들을 {이름: {"expected": x, "actual": y}}로 반환"""
+    mismatches = {}
+    for name, value in expect.items():
+        if name == "memory":
+            for addr, word in value.items():
+                actual = sim.memory.read_word(_int(addr))
+                if actual != _int(word) & 0xFFFFFFFF:
+                    mismatches[f"mem[{addr}]"] = {"expected": _int(word), "actual": actual}
+        elif name == "status":
+            continue
+        else:
+            actual = sim.registers.read(register_index(name))
+            if actual != _int(value) & 0xFFFFFFFF:
+                mismatches[name] = {"expected": _int(value), "actual": actual}
+    return mismatches
+
+
+def run_case(case):
+    """케이스 하나를 현재 프로세스에서 실행하고 결과 dict를 반환"""
+    global _sim
+    started = time.perf_counter()
+    result = {"name": case.get("name", case["program"])}
+    try:
+        if _sim is None:
+            _sim = ARMv7Simulator()
+        sim = _sim
+        sim.reset()
+        sim.load_program(_program(case["program"]))
+        if not case.get("stop_at_break", True):
+            sim.debugger.clear_breakpoints()
+        apply_state(sim, case.get("init", {}))
+        run = run_batch(sim, case.get("max_steps"))
+        expect = case.get("expect", {})
+        mismatches = compare_state(sim, expect)
+        expected_status = expect.get("status")
+        if expected_status is None and run["status"] == "fault":
+            mismatches["status"] = {"expected": "no fault", "actual": run.get("error")}
+        elif expected_status is not None and run["status"] != expected_status:
+            mismatches["status"] = {"expected": expected_status, "actual": run["status"]}
+        result.update(status="fail" if mismatches else "pass", steps=run["steps"], run_status=run["status"])
+        if mismatches:
+            result["mismatches"] = mismatches
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    result["elapsed"] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def load_manifest(path):
+    """매니페스트를 읽고 program 경로를 매니페스트 파일 기준 절대 경로로 바꿉니다."""
+    base = os.path.dirname(os.path.abspath(path))
+    cases = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            case = json.loads(line)
+            case["program"] = os.path.join(base, case["program"])
+            cases.append(case)
+    return cases
+
+
+def run_cases(cases, workers=None, chunksize=16):
+    """케이스들을 프로세스 풀에 나눠 실행하고 결과를 입력 순서대로 하나씩 돌려줍니다."""
+    if workers == 1:
+        for case in cases:
+            yield run_case(case)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(run_case, cases, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run many simulator cases in parallel")
+    parser.add_argument("manifest", help="JSON lines file of cases")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", help="write JSON lines results here instead of stdout")
+    parser.add_argument("--chunksize", type=int, default=16, help="cases sent to a worker at a time")
+    args = parser.parse_args()
+
+    cases = load_manifest(args.manifest)
+    out = open(args.output, "w") if args.output else sys.stdout
+    counts = {"pass": 0, "fail": 0, "error": 0}
+    started = time.perf_counter()
+    try:
+        for result in run_cases(cases, args.jobs, args.chunksize):
+            counts[result["status"]] += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    sys.stderr.write(f"{len(cases)} cases in {elapsed:.2f}s: {counts['pass']} passed, "
+                     f"{counts['fail']} failed, {counts['error']} errors\n")
+    return 0 if counts["pass"] == len(cases) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
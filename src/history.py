@@ -0,0 +1,125 @@
+"""
+명령어 히스토리 (TUI 입력창의 UP/DOWN, Ctrl-R).
+
+메모리에는 최근 size개만 링 버퍼로 두고, path를 주면 입력할 때마다 파일 끝에 한 줄씩 덧붙여
+다음 세션에서 다시 읽는다. 파일을 열 때 최근 size개만 읽으며, 파일이 size의 COMPACT_RATIO배를 넘으면
+최근 size줄만 남기도록 다시 쓴다.
+
+검색은 명령어의 (소문자) 1~3글자 조각 -> 일련번호 집합 색인으로 후보를 고른 뒤 확인하므로
+히스토리 길이가 아니라 후보 수에 비례한다. 대소문자는 구분하지 않는다.
+"""
+import os
+from collections import deque
+
+GRAM = 3  # 색인하는 조각의 최대 길이
+COMPACT_RATIO = 4
+
+
+def _grams(text):
+    """text의 길이 1~GRAM 부분 문자열 전부"""
+    return {text[i:i + n] for n in range(1, GRAM + 1) for i in range(len(text) - n + 1)}
+
+
+class History:
+    def __init__(self, size=1000, path=None):
+        self.size = size
+        self.commands = {}  # 일련번호 -> 명령어 (first부터 연속)
+        self.first = 0  # 가장 오래된 항목의 일련번호
+        self.next = 0  # 다음 항목의 일련번호
+        self.index = {}  # 조각 -> 일련번호 집합
+        self.file = None
+        if path:
+            self.open(path)
+
+    def open(self, path):
+        """path의 최근 size개를 읽어 들이고 이후 입력을 path 끝에 덧붙인다"""
+        self.close()
+        recent = deque(maxlen=self.size)
+        count = 0
+        if os.path.exists(path):
+            with open(path, "r", errors="replace") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    if line:
+                        recent.append(line)
+                        count += 1
+        if count > self.size * COMPACT_RATIO:
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                f.writelines(line + "\n" for line in recent)
+            os.replace(tmp, path)
+        for line in recent:
+            self._add(line)
+        self.file = open(path, "a")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def append(self, command):
+        """명령어 하나를 기록 (빈 줄과 바로 앞과 같은 명령어는 무시)"""
+        if not command or (self.next > self.first and self.commands[self.next - 1] == command):
+            return
+        self._add(command)
+        if self.file is not None:
+            self.file.write(command + "\n")
+            self.file.flush()
+
+    def _add(self, command):
+        seq = self.next
+        self.next += 1
+        self.commands[seq] = command
+        for gram in _grams(command.lower()):
+            self.index.setdefault(gram, set()).add(seq)
+        if len(self.commands) > self.size:
+            self._evict()
+
+    def _evict(self):
+        seq = self.first
+        self.first += 1
+        command = self.commands.pop(seq)
+        for gram in _grams(command.lower()):
+            entries = self.index[gram]
+            entries.discard(seq)
+            if not entries:
+                del self.index[gram]
+
+    def search(self, text, before=None, prefix=False):
+        """
+        before(인덱스, 기본은 끝)보다 앞에서 text를 포함하는(prefix면 text로 시작하는) 가장 최근 항목의 인덱스.
+        없으면 None
+        """
+        text = text.lower()
+        if not text:
+            return None
+        limit = self.next if before is None else self.first + before
+        keys = [text[i:i + GRAM] for i in range(len(text) - GRAM + 1)] if len(text) > GRAM else [text]
+        sets = sorted((self.index.get(key, ()) for key in keys), key=len)
+        candidates = set(sets[0]).intersection(*sets[1:])
+        for seq in sorted(candidates, reverse=True):
+            if seq >= limit:
+                continue
+            command = self.commands[seq].lower()
+            if command.startswith(text) if prefix else text in command:
+                return seq - self.first
+        return None
+
+    def clear(self):
+        """메모리의 히스토리만 비운다 (파일은 그대로)"""
+        self.commands.clear()
+        self.index.clear()
+        self.first = self.next
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.commands)
+        if not 0 <= i < len(self.commands):
+            raise IndexError(i)
+        return self.commands[self.first + i]
+
+    def __iter__(self):
+        return iter(self.commands.values())
@@ -0,0 +1,206 @@
+"""
+호스트(시뮬레이터 자체) 성능 계측.
+
+게스트 코드를 세는 profiler.py와 달리, 시뮬레이터가 호스트 CPU 시간을 어디에 쓰는지 본다.
+
+- 샘플링: 별도 스레드가 interval마다 실행 스레드의 파이썬 스택을 보고
+  가장 안쪽 프레임이 속한 구간(decode, dispatch, handler, memory, draw, log ...)과
+  src/instructions/의 어느 exec_* 핸들러 안인지를 센다. 실행 경로에는 아무것도 끼워 넣지 않는다.
+- 타이머: enable() 동안 sim.run/sim.decode와, TUI가 instrument()로 넘긴 메서드(draw_*, log_debug_info)를
+  perf_counter_ns로 재는 래퍼로 바꿔 끼운다 (호출 횟수, 총 시간, 최대 시간).
+  run의 실행 명령어 수와 시간으로 MIPS를 계산한다.
+
+disable()하면 래퍼를 걷어내고 샘플링 스레드를 멈춘다.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# 파일 이름 -> 구간 (함수 이름으로 더 나누는 파일은 _category에서 처리)
+_FILE_CATEGORIES = {
+    "memory.py": "memory",
+    "simulator.py": "dispatch",
+    "blocks.py": "dispatch",
+    "decoder.py": "decode",
+    "assembler.py": "decode",
+    "armdecode.py": "decode",
+    "loader.py": "decode",
+    "registers.py": "registers",
+    "changes.py": "timetravel",
+    "timetravel.py": "timetravel",
+    "tracefile.py": "log",
+    "interrupts.py": "interrupts",
+    "debugger.py": "debugger",
+    "profiler.py": "profiler",
+}
+
+_IDLE = {"_main", "get_user_input"}  # TUI가 키 입력을 기다리는 프레임
+
+
+def _category(path, func):
+    """프레임 하나의 구간 이름 (시뮬레이터 코드가 아니면 None)"""
+    if path.startswith("<block"):
+        return "dispatch"
+    name = os.path.basename(path)
+    if os.path.basename(os.path.dirname(path)) == "instructions":
+        return "decode" if func.startswith(("decode_", "parse_")) else "handler"
+    if name == "decoder.py" and func.startswith("exec_"):
+        return "handler"
+    if name == "blocks.py" and func == "translate_block":
+        return "translate"
+    if name == "tui.py":
+        if func.startswith("draw_") or func == "render":
+            return "draw"
+        if func == "log_debug_info":
+            return "log"
+        return "idle" if func in _IDLE else "tui"
+    return _FILE_CATEGORIES.get(name)
+
+
+class HostStats:
+    def __init__(self, sim, interval=0.001):
+        self.sim = sim
+        self.interval = interval  # 샘플링 간격 (초)
+        self.enabled = False
+        self.patched = []  # [(객체, 이름, 원래 인스턴스 속성 또는 None)]
+        self.thread = None
+        self.stop = threading.Event()
+        self.reset()
+
+    def reset(self):
+        self.timers = {}  # 이름 -> [호출 수, 총 ns, 최대 ns]
+        self.samples = Counter()  # 구간 -> 샘플 수
+        self.handlers = Counter()  # 'module.exec_*' -> 샘플 수
+        self.run_ns = 0
+        self.run_steps = 0
+
+    # --- 켜기/끄기 ---
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.instrument(self.sim, ["decode"])
+        self._instrument_run()
+        self.stop.clear()
+        target = threading.get_ident()
+        self.thread = threading.Thread(target=self._sample_loop, args=(target,), daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.stop.set()
+        self.thread.join()
+        self.thread = None
+        for obj, name, saved in reversed(self.patched):
+            if saved is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, saved)
+        self.patched.clear()
+        self.enabled = False
+
+    def instrument(self, obj, names):
+        """obj의 메서드들을 시간을 재는 래퍼로 바꿔 끼운다 (disable() 때 원래대로)"""
+        for name in names:
+            original = getattr(obj, name)
+            self.patched.append((obj, name, obj.__dict__.get(name)))
+            setattr(obj, name, self._timed(name, original))
+
+    def _timed(self, name, fn):
+        add = self.add
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(name, clock() - start)
+        return timed
+
+    def _instrument_run(self):
+        sim = self.sim
+        run = sim.run
+        clock = time.perf_counter_ns
+
+        def timed_run(*args, **kwargs):
+            before = sim.steps
+            start = clock()
+            try:
+                return run(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                self.add("run", elapsed)
+                self.run_ns += elapsed
+                self.run_steps += sim.steps - before
+        self.patched.append((sim, "run", sim.__dict__.get("run")))
+        sim.run = timed_run
+
+    def add(self, name, ns):
+        entry = self.timers.get(name)
+        if entry is None:
+            self.timers[name] = [1, ns, ns]
+            return
+        entry[0] += 1
+        entry[1] += ns
+        if ns > entry[2]:
+            entry[2] = ns
+
+    # --- 샘플링 ---
+    def _sample_loop(self, target):
+        while not self.stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                self._sample(frame)
+
+    def _sample(self, frame):
+        category = handler = None
+        while frame is not None:
+            code = frame.f_code
+            if category is None:
+                category = _category(code.co_filename, code.co_name)
+            if handler is None and code.co_name.startswith("exec_") \
+                    and os.path.basename(os.path.dirname(code.co_filename)) == "instructions":
+                handler = f"{os.path.basename(code.co_filename)[:-3]}.{code.co_name}"
+            frame = frame.f_back
+        self.samples[category or "other"] += 1
+        if handler is not None:
+            self.handlers[handler] += 1
+
+    # --- 결과 ---
+    def mips(self):
+        """run()으로 실행한 초당 백만 명령어 수"""
+        return self.run_steps * 1000 / self.run_ns if self.run_ns else 0.0
+
+    def summary(self):
+        """JSON 용 dict"""
+        return {
+            "mips": round(self.mips(), 3),
+            "run_seconds": self.run_ns / 1e9,
+            "instructions": self.run_steps,
+            "samples": dict(self.samples),
+            "handlers": dict(self.handlers),
+            "timers": {name: {"calls": c, "total_ms": t / 1e6, "max_ms": m / 1e6} for name, (c, t, m) in self.timers.items()},
+        }
+
+    def report(self, n=10):
+        """텍스트 보고서 줄 리스트 (idle 샘플은 비율에서 뺀다)"""
+        lines = [f"MIPS {self.mips():.3f} ({self.run_steps} instructions in {self.run_ns / 1e9:.3f}s)"]
+        busy = sum(c for name, c in self.samples.items() if name != "idle")
+        if busy:
+            lines.append(f"Host time ({busy} samples):")
+            for name, c in self.samples.most_common():
+                if name != "idle":
+                    lines.append(f"  {name:12} {100 * c / busy:5.1f}%")
+        if self.handlers:
+            lines.append("Handlers:")
+            for name, c in self.handlers.most_common(n):
+                lines.append(f"  {name:28} {100 * c / busy:5.1f}%")
+        if self.timers:
+            lines.append("Timers (calls / total ms / max ms):")
+            for name, (c, t, m) in sorted(self.timers.items(), key=lambda item: -item[1][1])[:n]:
+                lines.append(f"  {name:16} {c:8} {t / 1e6:10.2f} {m / 1e6:8.2f}")
+        return lines
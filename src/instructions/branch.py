@@ -0,0 +1,49 @@
+# 분기 명령어 (B/BL label, BX rm)
+# 어셈블러가 라벨을 주소로 바꿔 주므로 보통은 exec_b/exec_bl, 직접 입력한 라벨 이름은 실행 시점에 찾는다.
+from instructions.operands import register_index
+from registers import LR, PC
+
+
+def exec_b(sim, target):
+    sim.registers.write(PC, target)
+
+
+def exec_bl(sim, target):
+    regs = sim.registers
+    regs.write(LR, regs.read(PC))  # pc는 이미 다음 명령어 주소
+    regs.write(PC, target)
+
+
+def _label_target(sim, name):
+    addr = sim.get_label(name)
+    if addr is None:
+        raise Exception(f"Label '{name}' not found")
+    return addr
+
+
+def exec_b_label(sim, name):
+    exec_b(sim, _label_target(sim, name))
+
+
+def exec_bl_label(sim, name):
+    exec_bl(sim, _label_target(sim, name))
+
+
+def exec_bx(sim, rm):
+    regs = sim.registers
+    target = regs.read(rm)
+    if target & 1:
+        raise Exception(f"Thumb state is not supported (bx to 0x{target:08X})")
+    regs.write(PC, target & ~3)
+
+
+def decode_branch(sim, base, tokens):
+    if len(tokens) != 2:
+        raise Exception(f"Invalid branch: {' '.join(tokens)}")
+    if base == "BX":
+        return exec_bx, (register_index(tokens[1]),)
+    try:
+        target = int(tokens[1], 0)
+    except ValueError:
+        return (exec_bl_label if base == "BL" else exec_b_label), (tokens[1],)
+    return (exec_bl if base == "BL" else exec_b), (target,)
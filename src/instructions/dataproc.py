@@ -0,0 +1,272 @@
+# 데이터 처리 명령어 (ADD/ADC/SUB/SBC/RSB/RSC/AND/ORR/EOR/BIC/MOV/MVN/CMP/CMN/TST/TEQ, LSL/LSR/ASR/ROR/RRX)
+# S 접미사가 붙으면 RegisterFile의 지연 플래그(set_logic_flags/set_arith_flags)에 결과만 남긴다.
+from instructions.operands import parse_imm, register_index
+from instructions.mov import exec_mov
+from instructions.add import exec_add
+from registers import CPSR, PC, SPSR
+
+MASK = 0xFFFFFFFF
+
+LSL, LSR, ASR, ROR, RRX = range(5)
+SHIFTS = {"lsl": LSL, "asl": LSL, "lsr": LSR, "asr": ASR, "ror": ROR, "rrx": RRX}
+
+# 논리 연산: (a, b) -> 결과
+LOGIC_OPS = {
+    "AND": lambda a, b: a & b,
+    "EOR": lambda a, b: a ^ b,
+    "ORR": lambda a, b: a | b,
+    "BIC": lambda a, b: a & ~b & MASK,
+    "MOV": lambda a, b: b,
+    "MVN": lambda a, b: ~b & MASK,
+    "TST": lambda a, b: a & b,
+    "TEQ": lambda a, b: a ^ b,
+}
+
+# 산술 연산: (a, b, regs) -> (x, y, carry_in), 결과 = x + y + carry_in (뺄셈은 ~y + 1)
+ARITH_OPS = {
+    "ADD": lambda a, b, regs: (a, b, 0),
+    "ADC": lambda a, b, regs: (a, b, regs.carry()),
+    "SUB": lambda a, b, regs: (a, b ^ MASK, 1),
+    "SBC": lambda a, b, regs: (a, b ^ MASK, regs.carry()),
+    "RSB": lambda a, b, regs: (b, a ^ MASK, 1),
+    "RSC": lambda a, b, regs: (b, a ^ MASK, regs.carry()),
+    "CMP": lambda a, b, regs: (a, b ^ MASK, 1),
+    "CMN": lambda a, b, regs: (a, b, 0),
+}
+
+UNARY_OPS = {"MOV", "MVN"}  # rn 없음
+COMPARE_OPS = {"CMP", "CMN", "TST", "TEQ"}  # rd 없음, 항상 플래그 설정
+SHIFT_OPS = {"LSL": LSL, "LSR": LSR, "ASR": ASR, "ROR": ROR, "RRX": RRX}  # MOV rd, rm, <shift> 의 별칭
+
+DP_OPS = set(LOGIC_OPS) | set(ARITH_OPS) | set(SHIFT_OPS)
+
+
+def shift(value, kind, amount, carry):
+    """value를 kind로 amount만큼 shift한 (결과, carry out). amount가 0이면 carry는 그대로"""
+    if kind == RRX:
+        return (carry << 31) | (value >> 1), value & 1
+    if amount == 0:
+        return value, carry
+    if kind == LSL:
+        if amount > 32:
+            return 0, 0
+        return (value << amount) & MASK, (value >> (32 - amount)) & 1
+    if kind == LSR:
+        if amount > 32:
+            return 0, 0
+        return value >> amount, (value >> (amount - 1)) & 1
+    if kind == ASR:
+        if amount >= 32:
+            return (MASK, 1) if value >> 31 else (0, 0)
+        signed = value - (1 << 32) if value >> 31 else value
+        return (signed >> amount) & MASK, (value >> (amount - 1)) & 1
+    amount &= 31
+    if amount == 0:
+        return value, value >> 31
+    return ((value >> amount) | (value << (32 - amount))) & MASK, (value >> (amount - 1)) & 1
+
+
+def _shifted(regs, rm, kind, amount, rs, carry):
+    if rs is not None:
+        amount = regs.read(rs) & 0xFF
+    return shift(regs.read(rm), kind, amount, carry)
+
+
+# --- 논리 연산 ---
+def exec_logic_imm(sim, fn, rd, rn, imm):
+    regs = sim.registers
+    regs.write(rd, fn(regs.read(rn), imm))
+
+
+def exec_logic_reg(sim, fn, rd, rn, rm):
+    regs = sim.registers
+    regs.write(rd, fn(regs.read(rn), regs.read(rm)))
+
+
+def exec_logic_shift(sim, fn, rd, rn, rm, kind, amount, rs):
+    regs = sim.registers
+    carry = regs.carry() if kind == RRX else 0
+    regs.write(rd, fn(regs.read(rn), _shifted(regs, rm, kind, amount, rs, carry)[0]))
+
+
+def exec_logics_imm(sim, fn, rd, rn, imm, carry):
+    regs = sim.registers
+    res = fn(regs.read(rn), imm)
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_logic_flags(res, carry)
+
+
+def exec_logics_reg(sim, fn, rd, rn, rm):
+    regs = sim.registers
+    res = fn(regs.read(rn), regs.read(rm))
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_logic_flags(res, None)
+
+
+def exec_logics_shift(sim, fn, rd, rn, rm, kind, amount, rs):
+    regs = sim.registers
+    b, carry = _shifted(regs, rm, kind, amount, rs, regs.carry())
+    res = fn(regs.read(rn), b)
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_logic_flags(res, carry)
+
+
+# --- 산술 연산 ---
+def exec_arith_imm(sim, fn, rd, rn, imm):
+    regs = sim.registers
+    x, y, c = fn(regs.read(rn), imm, regs)
+    regs.write(rd, x + y + c)
+
+
+def exec_arith_reg(sim, fn, rd, rn, rm):
+    regs = sim.registers
+    x, y, c = fn(regs.read(rn), regs.read(rm), regs)
+    regs.write(rd, x + y + c)
+
+
+def exec_arith_shift(sim, fn, rd, rn, rm, kind, amount, rs):
+    regs = sim.registers
+    carry = regs.carry() if kind == RRX else 0
+    x, y, c = fn(regs.read(rn), _shifted(regs, rm, kind, amount, rs, carry)[0], regs)
+    regs.write(rd, x + y + c)
+
+
+def exec_ariths_imm(sim, fn, rd, rn, imm):
+    regs = sim.registers
+    x, y, c = fn(regs.read(rn), imm, regs)
+    res = x + y + c
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_arith_flags(x, y, res)
+
+
+def exec_ariths_reg(sim, fn, rd, rn, rm):
+    regs = sim.registers
+    x, y, c = fn(regs.read(rn), regs.read(rm), regs)
+    res = x + y + c
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_arith_flags(x, y, res)
+
+
+def exec_ariths_shift(sim, fn, rd, rn, rm, kind, amount, rs):
+    regs = sim.registers
+    carry = regs.carry() if kind == RRX else 0
+    x, y, c = fn(regs.read(rn), _shifted(regs, rm, kind, amount, rs, carry)[0], regs)
+    res = x + y + c
+    if rd is not None:
+        regs.write(rd, res)
+    regs.set_arith_flags(x, y, res)
+
+
+def exec_exception_return(sim, handler, args):
+    """'subs pc, lr, #4', 'movs pc, lr': 결과를 pc에 쓰고 플래그 대신 SPSR을 CPSR로 복원 (예외 복귀)"""
+    regs = sim.registers
+    spsr = regs.read(SPSR)
+    handler(sim, *args)
+    regs.write(CPSR, spsr)
+
+
+def exec_nop(sim):
+    pass
+
+
+def parse_operand2(tokens):
+    """
+    operand2 토큰들을 해석: ['#imm'] | ['rm'] | ['rm', 'lsl', '#n'] | ['rm', 'lsl', 'rs'] | ['rm', 'rrx']
+    반환값: ("imm", value, carry) | ("reg", rm) | ("shift", rm, kind, amount, rs)
+    """
+    if not tokens:
+        raise Exception("Missing operand")
+    if tokens[0].startswith("#") or tokens[0][0].isdigit() or tokens[0][0] == "-":
+        if len(tokens) != 1:
+            raise Exception(f"Invalid operand: {' '.join(tokens)}")
+        value = parse_imm(tokens[0]) & MASK
+        # 회전된 즉시값(0xFF 초과)이면 shifter carry는 결과의 bit 31
+        return ("imm", value, value >> 31 if value > 0xFF else None)
+    rm = register_index(tokens[0])
+    if len(tokens) == 1:
+        return ("reg", rm)
+    kind = SHIFTS.get(tokens[1].lower())
+    if kind is None:
+        raise Exception(f"Invalid shift: {tokens[1]}")
+    if kind == RRX:
+        if len(tokens) != 2:
+            raise Exception(f"Invalid operand: {' '.join(tokens)}")
+        return ("shift", rm, RRX, 1, None)
+    if len(tokens) != 3:
+        raise Exception(f"Invalid operand: {' '.join(tokens)}")
+    if tokens[2].startswith("#"):
+        amount = parse_imm(tokens[2])
+        if not 0 <= amount <= 32:
+            raise Exception(f"Invalid shift amount: {tokens[2]}")
+        return ("shift", rm, kind, amount, None)
+    return ("shift", rm, kind, 0, register_index(tokens[2]))
+
+
+def decode_dataproc(sim, base, setflags, tokens):
+    """
+    base(대문자 기본 니모닉)와 S 여부, 토큰으로 (handler, args)를 만든다.
+    'add r0, #1'처럼 rn을 생략하면 rd를 rn으로 쓴다.
+    rd가 pc인 S 명령어('subs pc, lr, #4')는 플래그 대신 SPSR을 CPSR로 되돌리는 예외 복귀다.
+    """
+    operands = tokens[1:]
+    if base in SHIFT_OPS:
+        # lsl rd, rm, #n / lsl rd, rm, rs / rrx rd, rm  ->  mov rd, rm, <shift> ...
+        if len(operands) == 2 and base != "RRX":
+            operands = [operands[0], operands[0], base.lower(), operands[1]]
+        else:
+            operands = operands[:2] + [base.lower()] + operands[2:]
+        base = "MOV"
+    if len(operands) < 2:
+        raise Exception(f"Missing operand: {' '.join(tokens)}")
+    if base in COMPARE_OPS:
+        rd = None
+        rn = register_index(operands[0])
+        op2 = parse_operand2(operands[1:])
+        setflags = True
+    elif base in UNARY_OPS:
+        rd = rn = register_index(operands[0])
+        op2 = parse_operand2(operands[1:])
+    else:
+        rd = register_index(operands[0])
+        if len(operands) == 2 or operands[2].lower() in SHIFTS:
+            rn = rd
+            op2 = parse_operand2(operands[1:])
+        else:
+            rn = register_index(operands[1])
+            op2 = parse_operand2(operands[2:])
+
+    return dataproc_handler(base, setflags, rd, rn, op2)
+
+
+def dataproc_handler(base, setflags, rd, rn, op2):
+    """
+    해석된 오퍼랜드로 (handler, args)를 고른다. 텍스트 디코더와 기계어 디코더(armdecode.py)가 함께 쓴다.
+    base는 MOV로 바꾼 shift 별칭을 뺀 기본 니모닉, op2는 parse_operand2의 반환 형식, 비교 명령어는 rd가 None.
+    """
+    if setflags and rd == PC and base not in COMPARE_OPS:
+        handler, args = dataproc_handler(base, False, rd, rn, op2)
+        return exec_exception_return, (handler, args)
+
+    kind = op2[0]
+    if not setflags and kind == "imm":
+        # 가장 흔한 형태는 기존 빠른 핸들러 사용
+        if base == "MOV":
+            return exec_mov, (rd, op2[1])
+        if base == "ADD":
+            return exec_add, (rd, rn, op2[1])
+    if base in LOGIC_OPS:
+        fn = LOGIC_OPS[base]
+        if kind == "imm":
+            return (exec_logics_imm, (fn, rd, rn, op2[1], op2[2])) if setflags else (exec_logic_imm, (fn, rd, rn, op2[1]))
+        handlers = {"reg": (exec_logic_reg, exec_logics_reg), "shift": (exec_logic_shift, exec_logics_shift)}[kind]
+    else:
+        fn = ARITH_OPS[base]
+        if kind == "imm":
+            return (exec_ariths_imm if setflags else exec_arith_imm), (fn, rd, rn, op2[1])
+        handlers = {"reg": (exec_arith_reg, exec_ariths_reg), "shift": (exec_arith_shift, exec_ariths_shift)}[kind]
+    return handlers[setflags], (fn, rd, rn) + op2[1:]
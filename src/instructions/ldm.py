@@ -0,0 +1,70 @@
+# LDM/STM (IA/IB/DA/DB 및 스택 별칭 FD/ED/FA/EA, writeback '!', 사용자 뱅크 '^')
+# 레지스터 여러 개를 Memory.read_words/write_words로 한 번에 전송한다.
+from instructions.operands import parse_reglist, register_index
+from instructions.push import stack_release, stack_store
+from registers import CPSR, PC, SP, SPSR
+
+MASK = 0xFFFFFFFF
+
+# 접미사 -> 주소 방식 (스택 별칭 FD/ED/FA/EA는 LDM과 STM에서 뜻이 다르다)
+LDM_MODES = {"IA": "IA", "IB": "IB", "DA": "DA", "DB": "DB", "FD": "IA", "ED": "IB", "FA": "DA", "EA": "DB"}
+STM_MODES = {"IA": "IA", "IB": "IB", "DA": "DA", "DB": "DB", "EA": "IA", "FA": "IB", "ED": "DA", "FD": "DB"}
+LDM_OPS = {"LDM" + mode for mode in LDM_MODES} | {"STM" + mode for mode in STM_MODES} | {"LDM", "STM"}
+
+
+def decode_ldm(sim, base, tokens):
+    """ldmia sp!, {r1-r12} / stm r0!, {sp, lr}^ -> (handler, args)"""
+    if len(tokens) < 3:
+        raise Exception(f"Invalid operands: {' '.join(tokens)}")
+    load = base.startswith("LDM")
+    mode = (LDM_MODES if load else STM_MODES)[base[3:] or "IA"]
+    writeback = tokens[1].endswith("!")
+    rn = register_index(tokens[1].rstrip("!"))
+    reglist = " ".join(tokens[2:])
+    user = reglist.endswith("^")
+    regs = tuple(sorted({register_index(reg) for reg in parse_reglist(reglist.rstrip("^"))}))
+    if not regs or regs[-1] > PC:
+        raise Exception(f"Invalid register list: {reglist}")
+    return ldm_handler(load, mode, rn, regs, writeback, user)
+
+
+def ldm_handler(load, mode, rn, regs, writeback, user):
+    """주소 방식(IA/IB/DA/DB)과 정렬된 레지스터 번호 튜플로 (handler, args) (기계어 디코더도 사용)"""
+    size = 4 * len(regs)
+    start = {"IA": 0, "IB": 4, "DA": 4 - size, "DB": -size}[mode]
+    delta = size if mode in ("IA", "IB") else -size
+    return (exec_ldm if load else exec_stm), (rn, regs, start, delta, writeback, user)
+
+
+def exec_ldm(sim, rn, regs, start, delta, writeback, user):
+    registers = sim.registers
+    base = registers.read(rn)
+    values = sim.memory.read_words((base + start) & MASK & ~3, len(regs))
+    if writeback:
+        new_base = (base + delta) & MASK
+        if rn == SP and delta > 0:
+            stack_release(sim, new_base)
+        registers.write(rn, new_base)
+    if user and PC not in regs:
+        # ^ (pc 없음): 사용자 모드 뱅크 레지스터에 읽기
+        for reg, value in zip(regs, values):
+            registers.write_user(reg, value)
+        return
+    for reg, value in zip(regs, values):
+        registers.write(reg, value)
+    if user:
+        # ^ (pc 포함): 예외 복귀, SPSR -> CPSR
+        registers.write(CPSR, registers.read(SPSR))
+
+
+def exec_stm(sim, rn, regs, start, delta, writeback, user):
+    registers = sim.registers
+    base = registers.read(rn)
+    read = registers.read_user if user else registers.read
+    values = [read(reg) for reg in regs]
+    addr = (base + start) & MASK & ~3
+    sim.memory.write_words(addr, values)
+    if writeback:
+        if rn == SP and delta < 0:
+            stack_store(sim, addr, values)
+        registers.write(rn, (base + delta) & MASK)
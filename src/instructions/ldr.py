@@ -1,34 +1,173 @@
-def handle_ldr(sim, tokens):
-    rd = tokens[1].lower()
-    # ldr r0, =label 형태
-    if tokens[2].startswith('='):
-        label = tokens[2][1:]  # '=' 제거
-        addr = sim.get_label(label)
-        if addr is None:
-            raise Exception(f"Label '{label}' not found")
-        value = addr
+import re
+from instructions.operands import parse_imm, register_index
+from instructions.dataproc import RRX, SHIFTS, shift
+from instructions.push import stack_release
+from memory import Memory
+from registers import SP
+
+MASK = 0xFFFFFFFF
+
+_ADDRESS = re.compile(r"^\[\s*(\w+)\s*(.*?)\s*\]\s*(!?)\s*(.*)$")
+
+
+def _read_signed_byte(memory, addr):
+    value = memory.read_byte(addr)
+    return value - 0x100 if value & 0x80 else value
+
+
+def _read_signed_half(memory, addr):
+    value = memory.read_half(addr)
+    return value - 0x10000 if value & 0x8000 else value
+
+
+# 니모닉 -> 메모리 읽기 함수 (memory, addr)
+LOAD_WIDTHS = {
+    "LDR": Memory.read_word,
+    "LDRB": Memory.read_byte,
+    "LDRH": Memory.read_half,
+    "LDRSB": _read_signed_byte,
+    "LDRSH": _read_signed_half,
+}
+
+
+def parse_address(text):
+    """
+    주소 지정 방식 해석 (쉼표는 이미 빠진 상태):
+      [rn]  [rn #imm]  [rn #imm]!  [rn] #imm
+      [rn {-}rm {shift #n}]{!}  [rn] {-}rm {shift #n}
+    반환값: (rn, imm, rm, negative, kind, amount, pre, writeback)  (rm이 None이면 즉시값 오프셋)
+    """
+    m = _ADDRESS.match(text)
+    if not m:
+        raise Exception(f"Invalid address: {text}")
+    rn = register_index(m.group(1))
+    inside, bang, post = m.group(2), m.group(3), m.group(4)
+    if inside and post or bang and post:
+        raise Exception(f"Invalid address: {text}")
+    pre = not post
+    writeback = bool(bang or post)
+    tokens = (inside or post).split()
+    if not tokens:
+        return rn, 0, None, False, None, 0, pre, writeback
+    if tokens[0].startswith("#"):
+        if len(tokens) != 1:
+            raise Exception(f"Invalid address: {text}")
+        return rn, parse_imm(tokens[0]), None, False, None, 0, pre, writeback
+    negative = tokens[0].startswith("-")
+    rm = register_index(tokens[0].lstrip("+-"))
+    kind, amount = None, 0
+    if len(tokens) > 1:
+        kind = SHIFTS.get(tokens[1].lower())
+        if kind is None or (kind == RRX) != (len(tokens) == 2) or len(tokens) > 3:
+            raise Exception(f"Invalid address: {text}")
+        amount = 1 if kind == RRX else parse_imm(tokens[2])
+    return rn, 0, rm, negative, kind, amount, pre, writeback
+
+
+def address_handler(simple, indexed, access, rd, address):
+    """
+    parse_address 결과로 (handler, args)를 고른다.
+    가장 흔한 [rn, #imm] (writeback 없음)은 simple, 나머지는 indexed 핸들러.
+    """
+    rn, imm, rm, negative, kind, amount, pre, writeback = address
+    if rm is None and pre and not writeback:
+        return simple, (access, rd, rn, imm)
+    return indexed, (access, rd, rn, imm, rm, negative, kind, amount, pre, writeback)
+
+
+def effective_address(regs, rn, imm, rm, negative, kind, amount, pre):
+    """(접근 주소, writeback 주소)"""
+    base = regs.read(rn)
+    offset = imm
+    if rm is not None:
+        offset = regs.read(rm)
+        if kind is not None:
+            offset = shift(offset, kind, amount, regs.carry() if kind == RRX else 0)[0]
+        if negative:
+            offset = -offset
+    addr = (base + offset) & MASK
+    return (addr if pre else base), addr
+
+
+def decode_ldr(sim, tokens, base="LDR"):
+    rd = register_index(tokens[1])
+    operand = " ".join(tokens[2:])
+    # ldr r0, =label / ldr r0, =0x10 형태
+    if operand.startswith('=') and base == "LDR":
+        target = operand[1:]  # '=' 제거
+        try:
+            return (exec_ldr_literal, (rd, int(target, 0)))
+        except ValueError:
+            return (exec_ldr_label, (rd, target))
     # ldr r0, [r0] 형태
-    elif tokens[2].startswith('[') and tokens[2].endswith(']'):
-        rn = tokens[2][1:-1].lower()
-        # rn이 어떤 모드에 있는지 찾기
-        value = None
-        for mode in sim.registers:
-            if rn in sim.registers[mode]:
-                addr = sim.registers[mode][rn]
-                # 메모리에서 4바이트 읽기 (word 단위)
-                if 0 <= addr // 4 < len(sim.memory):
-                    value = sim.memory[addr // 4]
-                else:
-                    raise Exception(f"Memory address out of range: {addr}")
-                break
-        if value is None:
-            raise Exception(f"Register {rn} not found")
-    else:
-        raise Exception("Unsupported LDR format")
-
-    # 결과를 rd에 저장
-    for mode in sim.registers:
-        if rd in sim.registers[mode]:
-            sim.registers[mode][rd] = value
-            return
-    raise Exception(f"Register {rd} not found")
\ No newline at end of file
+    if operand.startswith('['):
+        return load_handler(base, rd, parse_address(operand))
+    # ldr r0, label 형태 (label 주소의 값을 읽음)
+    if base == "LDR" and len(tokens) == 3:
+        return (exec_ldr_from_label, (rd, operand))
+    raise Exception("Unsupported LDR format")
+
+
+def load_handler(base, rd, address):
+    """parse_address 형식의 주소로 LDR 계열 (handler, args) (기계어 디코더도 사용)"""
+    if base == "LDR" and address[1:] == (0, None, False, None, 0, True, False):
+        return (exec_ldr_reg, (rd, address[0]))
+    return address_handler(exec_load, exec_load_indexed, LOAD_WIDTHS[base], rd, address)
+
+
+def exec_ldr_literal(sim, rd, value):
+    sim.registers.write(rd, value)
+
+
+def exec_ldr_label(sim, rd, label):
+    addr = sim.get_label(label)
+    if addr is None:
+        raise Exception(f"Label '{label}' not found")
+    sim.registers.write(rd, addr)
+
+
+def exec_ldr_from_label(sim, rd, label):
+    addr = sim.get_label(label)
+    if addr is None:
+        raise Exception(f"Label '{label}' not found")
+    sim.registers.write(rd, sim.memory.read_word(addr))
+
+
+def exec_ldr_reg(sim, rd, rn):
+    addr = sim.registers.read(rn)
+    # 메모리에서 4바이트 읽기 (word 단위)
+    sim.registers.write(rd, sim.memory.read_word(addr))
+
+
+def exec_load(sim, read, rd, rn, offset):
+    regs = sim.registers
+    regs.write(rd, read(sim.memory, (regs.read(rn) + offset) & MASK))
+
+
+def exec_load_indexed(sim, read, rd, rn, imm, rm, negative, kind, amount, pre, writeback):
+    regs = sim.registers
+    addr, new_base = effective_address(regs, rn, imm, rm, negative, kind, amount, pre)
+    value = read(sim.memory, addr)
+    if writeback:
+        regs.write(rn, new_base)
+        if rn == SP:
+            stack_release(sim, new_base)
+    regs.write(rd, value)
+
+
+def exec_load_double(sim, rd, rn, imm, rm, negative, pre, writeback):
+    """LDRD rd, rd+1, <address>: 연속한 두 워드를 읽는다 (기계어 디코더에서 사용)"""
+    regs = sim.registers
+    addr, new_base = effective_address(regs, rn, imm, rm, negative, None, 0, pre)
+    low, high = sim.memory.read_words(addr, 2)
+    if writeback:
+        regs.write(rn, new_base)
+        if rn == SP:
+            stack_release(sim, new_base)
+    regs.write(rd, low)
+    regs.write(rd + 1, high)
+
+
+def handle_ldr(sim, tokens):
+    handler, args = decode_ldr(sim, tokens)
+    handler(sim, *args)
@@ -1,14 +1,21 @@
+from instructions.operands import parse_imm, register_index
+
+
+def decode_mov(sim, tokens):
+    rd = register_index(tokens[1])
+    imm = parse_imm(tokens[2])
+    return (rd, imm)
+
+
+def exec_mov(sim, rd, imm):
+    sim.registers.write(rd, imm)
+
+
 def handle_mov(sim, tokens):
-    rd = tokens[1].lower()
-    imm = int(tokens[2].replace('#', ''), 0)
-    if rd in sim.registers["com"]:
-        sim.registers["com"][rd] = imm
-    else:
-        found = False
-        for mode in sim.registers:
-            if rd in sim.registers[mode]:
-                sim.registers[mode][rd] = imm
-                found = True
-                break
-        if not found:
-            raise Exception(f"Register {rd} not found")
\ No newline at end of file
+    exec_mov(sim, *decode_mov(sim, tokens))
+
+
+def exec_movt(sim, rd, imm):
+    """movt rd, #imm16: 상위 16비트만 바꾼다 (기계어 디코더에서 사용)"""
+    regs = sim.registers
+    regs.write(rd, (regs.read(rd) & 0xFFFF) | (imm << 16))
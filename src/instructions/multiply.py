@@ -0,0 +1,35 @@
+# 곱셈 명령어 (MUL/MLA, UMULL/UMLAL/SMULL/SMLAL). 기계어 디코더(armdecode.py)에서 사용
+# S 접미사는 N, Z만 바꾸고 C, V는 그대로 둔다 (set_logic_flags의 carry=None).
+MASK = 0xFFFFFFFF
+
+
+def exec_mul(sim, rd, rm, rs, ra, setflags):
+    """MUL rd, rm, rs / MLA rd, rm, rs, ra (ra가 None이면 MUL)"""
+    regs = sim.registers
+    res = regs.read(rm) * regs.read(rs)
+    if ra is not None:
+        res += regs.read(ra)
+    res &= MASK
+    regs.write(rd, res)
+    if setflags:
+        regs.set_logic_flags(res, None)
+
+
+def exec_mull(sim, signed, rdlo, rdhi, rm, rs, accumulate, setflags):
+    """UMULL/SMULL rdlo, rdhi, rm, rs (accumulate면 UMLAL/SMLAL: rdhi:rdlo에 더한다)"""
+    regs = sim.registers
+    a = regs.read(rm)
+    b = regs.read(rs)
+    if signed:
+        a -= (a & 0x80000000) << 1
+        b -= (b & 0x80000000) << 1
+    res = a * b
+    if accumulate:
+        res += (regs.read(rdhi) << 32) | regs.read(rdlo)
+    lo = res & MASK
+    hi = (res >> 32) & MASK
+    regs.write(rdlo, lo)
+    regs.write(rdhi, hi)
+    if setflags:
+        # N = bit 63, Z = 64비트 결과가 0
+        regs.set_logic_flags(hi | (1 if lo else 0), None)
@@ -0,0 +1,23 @@
+# 명령어 핸들러들이 공통으로 쓰는 오퍼랜드 파서 (decode 단계에서 한 번만 호출됨)
+from registers import register_index
+
+def parse_imm(token):
+    """'#0x10', '#4', '0x10' 형태의 즉시값을 정수로 변환"""
+    return int(token.replace('#', ''), 0)
+
+
+def parse_reglist(token):
+    """'{r0-r3,lr}' 형태의 레지스터 리스트를 이름 리스트로 펼친다."""
+    regs_token = token.strip("{}").lower()
+    reg_list = []
+    for part in regs_token.replace(',', ' ').split():
+        if '-' in part:
+            start, end = part.split('-')
+            start = start.strip()
+            end = end.strip()
+            if start.startswith('r') and end.startswith('r'):
+                for i in range(int(start[1:]), int(end[1:]) + 1):
+                    reg_list.append(f"r{i}")
+        else:
+            reg_list.append(part)
+    return reg_list
@@ -1,32 +1,64 @@
+from instructions.operands import parse_reglist, register_index
+from registers import SP
+
+MASK = 0xFFFFFFFF
+
+
+def decode_push(sim, tokens):
+    # 레지스터 번호 순서로 정렬 (낮은 번호가 낮은 주소)
+    return (tuple(sorted(register_index(reg) for reg in parse_reglist(" ".join(tokens[1:])))),)
+
+
+def stack_store(sim, addr, values):
+    """
+    TUI 스택 뷰 갱신: addr부터 쌓인 values를 현재 모드의 stack 리스트에 추가한다.
+    리스트는 높은 주소부터 쌓이므로 마지막 엔트리가 sp 위치다.
+    """
+    registers = sim.registers
+    stack = sim.stack[registers.mode]
+    if sim.changes is not None:
+        sim.changes.stack_push(registers.mode, stack)
+    stack.extend((addr + 4 * i, values[i]) for i in range(len(values) - 1, -1, -1))
+
+
+def stack_release(sim, new_sp):
+    """TUI 스택 뷰 갱신: sp가 new_sp로 올라가면서 벗어난 엔트리를 꺼낸다."""
+    registers = sim.registers
+    stack = sim.stack[registers.mode]
+    count = 0
+    while count < len(stack) and stack[-1 - count][0] < new_sp:
+        count += 1
+    if count:
+        if sim.changes is not None:
+            sim.changes.stack_pop(registers.mode, stack, count)
+        del stack[-count:]
+
+
+def exec_push(sim, regs):
+    """STMDB sp!, {regs}: 레지스터 값을 모아 메모리에 한 번에 쓴다."""
+    registers = sim.registers
+    sp = (registers.read(SP) - 4 * len(regs)) & MASK
+    values = [registers.read(reg) for reg in regs]
+    sim.memory.write_words(sp, values)
+    stack_store(sim, sp, values)
+    registers.write(SP, sp)
+
+
+def exec_pop(sim, regs):
+    """LDMIA sp!, {regs}: 메모리에서 한 번에 읽어 레지스터에 나눠 쓴다."""
+    registers = sim.registers
+    sp = registers.read(SP)
+    values = sim.memory.read_words(sp, len(regs))
+    new_sp = (sp + 4 * len(regs)) & MASK
+    stack_release(sim, new_sp)
+    registers.write(SP, new_sp)
+    for reg, value in zip(regs, values):
+        registers.write(reg, value)
+
+
 def handle_push(sim, tokens):
-    regs_token = tokens[1].strip("{}").lower()
-    sp_mode = "usr/sys"
-    sp = sim.registers[sp_mode]["sp"]
-
-    reg_list = []
-    for part in regs_token.split(','):
-        part = part.strip()
-        if '-' in part:
-            start, end = part.split('-')
-            start = start.strip()
-            end = end.strip()
-            if start.startswith('r') and end.startswith('r'):
-                for i in range(int(start[1:]), int(end[1:]) + 1):
-                    reg_list.append(f"r{i}")
-        else:
-            reg_list.append(part)
-
-    for reg in reg_list:
-        reg_val = None
-        for mode in sim.registers:
-            if reg in sim.registers[mode]:
-                reg_val = sim.registers[mode][reg]
-                break
-        if reg_val is not None:
-            sp -= 4
-            sim.registers[sp_mode]["sp"] = sp
-            sim.stack[sp_mode].append((sp, reg_val))
-            # 메모리에도 반영 (sp 주소에 reg_val 저장)
-            sim.memory[sp] = reg_val
-        else:
-            raise Exception(f"Register {reg} not found")
\ No newline at end of file
+    exec_push(sim, *decode_push(sim, tokens))
+
+
+def handle_pop(sim, tokens):
+    exec_pop(sim, *decode_push(sim, tokens))
@@ -0,0 +1,61 @@
+from instructions.operands import register_index
+from instructions.ldr import MASK, address_handler, effective_address, parse_address
+from instructions.push import stack_release, stack_store
+from memory import Memory
+from registers import SP
+
+# 니모닉 -> 메모리 쓰기 함수 (memory, addr, value)
+STORE_WIDTHS = {
+    "STR": Memory.write_word,
+    "STRB": Memory.write_byte,
+    "STRH": Memory.write_half,
+}
+
+
+def decode_str(sim, tokens, base="STR"):
+    rd = register_index(tokens[1])
+    operand = " ".join(tokens[2:])
+    if not operand.startswith('['):
+        raise Exception("Unsupported STR format")
+    return address_handler(exec_store, exec_store_indexed, STORE_WIDTHS[base], rd, parse_address(operand))
+
+
+def exec_store(sim, write, rd, rn, offset):
+    regs = sim.registers
+    write(sim.memory, (regs.read(rn) + offset) & MASK, regs.read(rd))
+
+
+def exec_store_indexed(sim, write, rd, rn, imm, rm, negative, kind, amount, pre, writeback):
+    regs = sim.registers
+    addr, new_base = effective_address(regs, rn, imm, rm, negative, kind, amount, pre)
+    value = regs.read(rd)
+    write(sim.memory, addr, value)
+    if writeback:
+        if rn == SP:
+            # str rX, [sp, #-4]! 는 push와 같다
+            if new_base < regs.read(SP) and write is Memory.write_word:
+                stack_store(sim, addr, (value,))
+            else:
+                stack_release(sim, new_base)
+        regs.write(rn, new_base)
+
+
+def exec_store_double(sim, rd, rn, imm, rm, negative, pre, writeback):
+    """STRD rd, rd+1, <address>: 두 레지스터를 연속한 두 워드에 쓴다 (기계어 디코더에서 사용)"""
+    regs = sim.registers
+    addr, new_base = effective_address(regs, rn, imm, rm, negative, None, 0, pre)
+    values = (regs.read(rd), regs.read(rd + 1))
+    sim.memory.write_words(addr, values)
+    if writeback:
+        if rn == SP:
+            # strd r4, r5, [sp, #-8]! 는 push와 같다
+            if new_base < regs.read(SP):
+                stack_store(sim, addr, values)
+            else:
+                stack_release(sim, new_base)
+        regs.write(rn, new_base)
+
+
+def handle_str(sim, tokens):
+    handler, args = decode_str(sim, tokens)
+    handler(sim, *args)
@@ -0,0 +1,98 @@
+# 상태 레지스터/예외 명령어 (MRS, MSR, CPS/CPSIE/CPSID, SVC/SWI)
+from instructions.operands import parse_imm, register_index
+from interrupts import CPSR_F, CPSR_I, enter_exception
+from registers import CPSR, SPSR
+
+MODE_USR = 0x10
+
+# MSR 필드 문자 -> CPSR 비트
+_FIELDS = {"c": 0x000000FF, "x": 0x0000FF00, "s": 0x00FF0000, "f": 0xFF000000}
+_CPS_FLAGS = {"i": CPSR_I, "f": CPSR_F, "a": 1 << 8}
+
+SYSTEM_OPS = {"MRS", "MSR", "CPS", "CPSIE", "CPSID", "SVC", "SWI"}
+
+
+def parse_psr(name):
+    """'cpsr', 'spsr_fsxc', 'apsr_nzcvq' 등 -> (CPSR | SPSR, 쓰기 마스크)"""
+    name = name.lower()
+    psr, _, fields = name.partition("_")
+    if psr == "apsr":
+        if fields not in ("", "nzcvq", "nzcvqg", "g"):
+            raise Exception(f"Invalid status register: {name}")
+        return CPSR, _FIELDS["f"]
+    if psr not in ("cpsr", "spsr"):
+        raise Exception(f"Invalid status register: {name}")
+    if not fields:
+        fields = "fc"  # 'msr cpsr, r0'은 cpsr_fc와 같다
+    mask = 0
+    for field in fields:
+        if field not in _FIELDS:
+            raise Exception(f"Invalid status register: {name}")
+        mask |= _FIELDS[field]
+    return (CPSR if psr == "cpsr" else SPSR), mask
+
+
+def exec_mrs(sim, rd, psr):
+    regs = sim.registers
+    regs.write(rd, regs.read(psr))
+
+
+def exec_msr(sim, psr, mask, rm, imm):
+    regs = sim.registers
+    value = imm if rm is None else regs.read(rm)
+    if psr == CPSR and regs.read(CPSR) & 0x1F == MODE_USR:
+        mask &= _FIELDS["f"]  # 사용자 모드는 플래그만 바꿀 수 있다
+    old = regs.read(psr)
+    regs.write(psr, (old & ~mask) | (value & mask))
+
+
+def exec_cps(sim, set_bits, clear_bits, mode):
+    regs = sim.registers
+    cpsr = regs.read(CPSR)
+    if cpsr & 0x1F == MODE_USR:
+        return  # 사용자 모드에서는 효과 없음
+    new = (cpsr | set_bits) & ~clear_bits
+    if mode is not None:
+        new = (new & ~0x1F) | mode
+    regs.write(CPSR, new)
+
+
+def exec_svc(sim, imm):
+    enter_exception(sim, "svc")
+
+
+def decode_system(sim, base, tokens):
+    operands = tokens[1:]
+    if base == "MRS":
+        if len(operands) != 2:
+            raise Exception(f"Invalid MRS: {' '.join(tokens)}")
+        psr, _ = parse_psr(operands[1])
+        return exec_mrs, (register_index(operands[0]), psr)
+    if base == "MSR":
+        if len(operands) != 2:
+            raise Exception(f"Invalid MSR: {' '.join(tokens)}")
+        psr, mask = parse_psr(operands[0])
+        if operands[1].startswith("#"):
+            return exec_msr, (psr, mask, None, parse_imm(operands[1]) & 0xFFFFFFFF)
+        return exec_msr, (psr, mask, register_index(operands[1]), 0)
+    if base in ("SVC", "SWI"):
+        if len(operands) > 1:
+            raise Exception(f"Invalid {base}: {' '.join(tokens)}")
+        return exec_svc, (parse_imm(operands[0]) if operands else 0,)
+    # cps #mode / cpsie iflags {#mode} / cpsid iflags {#mode}
+    mode = None
+    if operands and operands[-1].startswith("#"):
+        mode = parse_imm(operands.pop()) & 0x1F
+    bits = 0
+    if base != "CPS":
+        if len(operands) != 1:
+            raise Exception(f"Invalid {base}: {' '.join(tokens)}")
+        for flag in operands[0].lower():
+            if flag not in _CPS_FLAGS:
+                raise Exception(f"Invalid {base} flags: {operands[0]}")
+            bits |= _CPS_FLAGS[flag]
+    elif operands or mode is None:
+        raise Exception(f"Invalid CPS: {' '.join(tokens)}")
+    if base == "CPSID":
+        return exec_cps, (bits, 0, mode)
+    return exec_cps, (0, bits, mode)
@@ -0,0 +1,224 @@
+"""
+예외/인터럽트 엔진.
+
+- enter_exception(): 예외 진입. 현재 CPSR을 대상 모드의 SPSR에 저장하고, 모드 비트를 바꿔
+  뱅크를 교체한 뒤(RegisterFile.switch_mode, 리스트 교체 한 번) LR을 복귀 주소 + 보정값으로,
+  pc를 벡터 테이블 주소로 설정한다.
+  복귀는 'subs pc, lr, #4', 'movs pc, lr', 'ldm sp!, {..., pc}^' 처럼 SPSR을 CPSR로 되돌리는 명령어가 한다.
+- Interrupts: IRQ/FIQ 대기 라인과 주기 타이머, 장치(devices.py)가 level로 유지하는 라인과 장치 이벤트.
+  run() 루프는 sim.next_event(다음에 확인할 명령어 수)만 비교하고, 그 사이 블록은 이 값을 넘지 않게 잘라 실행하므로
+  타이머가 없을 때는 추가 비용이 없고, 있을 때도 정확히 그 명령어 경계에서 인터럽트가 들어간다.
+"""
+from registers import CPSR, LR, PC, SPSR
+
+NO_EVENT = 1 << 62  # 예정된 이벤트 없음
+
+CPSR_I = 1 << 7  # IRQ 마스크
+CPSR_F = 1 << 6  # FIQ 마스크
+CPSR_T = 1 << 5  # Thumb 상태
+
+# 예외 종류 -> (모드 비트, 벡터 오프셋, LR 보정값, FIQ도 마스크하는지)
+# LR = 복귀 주소(예외가 없었다면 다음에 실행했을 명령어) + 보정값.
+# 아키텍처의 LR 값(pabt: 실패한 명령어 + 4, dabt: + 8, irq/fiq: 다음 명령어 + 4)과 같다.
+EXCEPTIONS = {
+    "reset": (0x13, 0x00, 0, True),
+    "und": (0x1B, 0x04, 0, False),
+    "svc": (0x13, 0x08, 0, False),
+    "pabt": (0x17, 0x0C, 0, False),
+    "dabt": (0x17, 0x10, 4, False),
+    "irq": (0x12, 0x18, 4, False),
+    "fiq": (0x11, 0x1C, 4, True),
+}
+
+
+def enter_exception(sim, kind, return_addr=None):
+    """kind 예외로 진입합니다. return_addr의 기본값은 현재 pc (실행 중인 명령어의 다음 주소)."""
+    entry = EXCEPTIONS.get(kind)
+    if entry is None:
+        raise Exception(f"Unknown exception: {kind}")
+    mode, offset, lr_offset, mask_fiq = entry
+    regs = sim.registers
+    if return_addr is None:
+        return_addr = regs.read(PC)
+    cpsr = regs.read(CPSR)
+    new = (cpsr & ~(0x1F | CPSR_T) & 0xFFFFFFFF) | mode | CPSR_I
+    if mask_fiq:
+        new |= CPSR_F
+    regs.write(CPSR, new)  # 뱅크 교체
+    regs.write(SPSR, cpsr)
+    regs.write(LR, return_addr + lr_offset)
+    regs.write(PC, sim.interrupts.vector_base + offset)
+    sim.interrupts.taken[kind] = sim.interrupts.taken.get(kind, 0) + 1
+
+
+class PeriodicTimer:
+    """period 명령어마다 line("irq"/"fiq")을 올리는 타이머 (start 이후 start + k * period 번째 명령어에서)"""
+    __slots__ = ("id", "period", "line", "start", "next_fire", "fired", "enabled")
+
+    def __init__(self, id, period, line, start):
+        self.id = id
+        self.period = period
+        self.line = line
+        self.start = start
+        self.next_fire = start + period
+        self.fired = 0
+        self.enabled = True
+
+    def reschedule(self, steps):
+        """명령어 수가 steps일 때 다음 발생 시점을 다시 계산 (step back 이후)"""
+        elapsed = max(steps - self.start, 0)
+        self.next_fire = self.start + (elapsed // self.period + 1) * self.period
+
+    def __str__(self):
+        state = "" if self.enabled else " (disabled)"
+        return f"Timer {self.id}: {self.line} every {self.period} instructions, next at {self.next_fire}{state}"
+
+
+class Interrupts:
+    def __init__(self, sim):
+        self.sim = sim
+        self.pending = set()  # 대기 중인 라인 ("irq", "fiq")
+        self.timers = []
+        self.vector_base = 0  # 0 또는 0xFFFF0000 (high vectors)
+        self.taken = {}  # 예외 종류 -> 진입 횟수
+        self.next_id = 1
+        self.asserted = set()  # 장치(인터럽트 컨트롤러)가 올리고 있는 라인. 진입해도 장치가 내릴 때까지 유지
+        self.sources = []  # next_fire에 expire(steps)를 부를 장치 (devices.Bus.attach)
+        # CPSR이 바뀌면(cpsie, msr, 예외 복귀) 마스크가 풀렸을 수 있으므로 대기 라인을 다시 확인
+        sim.registers.on_cpsr_write = self._cpsr_written
+
+    def reset(self):
+        self.pending.clear()
+        self.asserted.clear()
+        self.timers.clear()
+        self.taken.clear()
+        self.vector_base = 0
+        self.sim.next_event = NO_EVENT
+
+    # --- 인터럽트 소스 ---
+    def add_timer(self, period, line="irq"):
+        if period <= 0:
+            raise Exception(f"Invalid timer period: {period}")
+        if line not in ("irq", "fiq"):
+            raise Exception(f"Invalid interrupt line: {line}")
+        timer = PeriodicTimer(self.next_id, period, line, self.sim.steps)
+        self.next_id += 1
+        self.timers.append(timer)
+        self.schedule()
+        return timer
+
+    def remove_timer(self, id=None):
+        """id 타이머를 (None이면 전부) 지웁니다."""
+        if id is None:
+            self.timers.clear()
+        else:
+            for timer in self.timers:
+                if timer.id == id:
+                    self.timers.remove(timer)
+                    break
+            else:
+                raise Exception(f"No timer {id}")
+        self.schedule()
+
+    def raise_line(self, line):
+        """line을 대기 상태로 올립니다. 마스크가 풀려 있으면 다음 명령어 경계에서 진입합니다."""
+        if line not in ("irq", "fiq"):
+            raise Exception(f"Invalid interrupt line: {line}")
+        self.pending.add(line)
+        self.schedule()
+
+    def set_level(self, line, level):
+        """장치가 line을 올리거나 내린다 (level-sensitive: 올라가 있는 동안 마스크가 풀리면 매번 진입)"""
+        if level:
+            self.asserted.add(line)
+        else:
+            self.asserted.discard(line)
+        self.schedule()
+
+    # --- run()/step()에서 호출 ---
+    def service(self):
+        """sim.steps가 sim.next_event에 닿았을 때: 타이머를 진행시키고 마스크되지 않은 대기 라인으로 진입"""
+        steps = self.sim.steps
+        for timer in self.timers:
+            if timer.enabled and timer.next_fire <= steps:
+                self.pending.add(timer.line)
+                timer.fired += 1
+                timer.reschedule(steps)
+        for source in self.sources:
+            if source.next_fire <= steps:
+                source.expire(steps)
+        lines = self.pending | self.asserted
+        if lines:
+            cpsr = self.sim.registers.read(CPSR)
+            if "fiq" in lines and not cpsr & CPSR_F:
+                self.pending.discard("fiq")
+                enter_exception(self.sim, "fiq")
+            elif "irq" in lines and not cpsr & CPSR_I:
+                self.pending.discard("irq")
+                enter_exception(self.sim, "irq")
+        self.schedule()
+
+    def reschedule(self):
+        """sim.steps가 뒤로 갔을 때 (step back) 타이머 시점을 다시 맞춘다"""
+        for timer in self.timers:
+            timer.reschedule(self.sim.steps)
+        self.schedule()
+
+    def schedule(self):
+        next_event = NO_EVENT
+        for timer in self.timers:
+            if timer.enabled and timer.next_fire < next_event:
+                next_event = timer.next_fire
+        for source in self.sources:
+            if source.next_fire < next_event:
+                next_event = source.next_fire
+        if (self.pending or self.asserted) and self._deliverable():
+            next_event = self.sim.steps
+        self.sim.next_event = next_event
+
+    def _deliverable(self):
+        """대기 라인 중 지금 마스크되지 않은 것이 있는지"""
+        cpsr = self.sim.registers.read(CPSR)
+        lines = self.pending | self.asserted
+        return ("fiq" in lines and not cpsr & CPSR_F) or ("irq" in lines and not cpsr & CPSR_I)
+
+    def _cpsr_written(self):
+        if (self.pending or self.asserted) and self._deliverable():
+            self.sim.next_event = self.sim.steps
+
+    # --- 체크포인트 ---
+    def capture(self):
+        return (set(self.pending), [(t.next_fire, t.fired) for t in self.timers], dict(self.taken))
+
+    def restore(self, state):
+        pending, timers, taken = state
+        self.pending = set(pending)
+        for timer, (next_fire, fired) in zip(self.timers, timers):
+            timer.next_fire = next_fire
+            timer.fired = fired
+        self.taken = dict(taken)
+        self.schedule()
+
+    # --- 스냅샷 파일 (JSON으로 저장할 수 있는 형태) ---
+    def dump(self):
+        return {
+            "pending": sorted(self.pending),
+            "timers": [[t.id, t.period, t.line, t.start, t.next_fire, t.fired, t.enabled] for t in self.timers],
+            "vector_base": self.vector_base,
+            "taken": self.taken,
+            "next_id": self.next_id,
+        }
+
+    def load(self, state):
+        self.pending = set(state["pending"])
+        self.timers = []
+        for id, period, line, start, next_fire, fired, enabled in state["timers"]:
+            timer = PeriodicTimer(id, period, line, start)
+            timer.next_fire = next_fire
+            timer.fired = fired
+            timer.enabled = enabled
+            self.timers.append(timer)
+        self.vector_base = state["vector_base"]
+        self.taken = dict(state["taken"])
+        self.next_id = state["next_id"]
+        self.schedule()
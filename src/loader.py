@@ -0,0 +1,168 @@
+"""
+ELF32 / raw 바이너리 이미지 로더 (기계어 모드).
+
+- ELF: PT_LOAD 세그먼트를 p_vaddr에 올리고 (p_memsz까지 0으로 채움) 실행 가능한(PF_X) 세그먼트를 코드 영역으로,
+  .symtab의 함수/객체 심볼을 label로 쓴다. 진입점은 e_entry.
+- raw .bin: 파일 전체를 base에 올리고 전체를 코드 영역으로 본다. 진입점은 base.
+
+코드는 미리 해석하지 않는다. ImageCode가 pc로 처음 fetch할 때 메모리에서 워드를 읽어 armdecode로 해석하고
+주소별로 기억한다. 해석해 둔 명령어 위치에 쓰기가 일어나면 그 명령어만 버린다 (자체 수정 코드).
+"""
+import struct
+import zlib
+from armdecode import decode_word
+from memory import PAGE_SHIFT, PAGE_SIZE
+
+ELF_MAGIC = b"\x7fELF"
+EM_ARM = 40
+PT_LOAD = 1
+PF_X = 1
+SHT_SYMTAB = 2
+SHN_UNDEF = 0
+STT_TYPES = (0, 1, 2)  # NOTYPE, OBJECT, FUNC
+IMAGE_SUFFIXES = (".bin", ".elf", ".axf")
+
+_ELF_HEADER = struct.Struct("<16sHHIIIIIHHHHHH")
+_PHDR = struct.Struct("<IIIIIIII")
+_SHDR = struct.Struct("<IIIIIIIIII")
+_SYM = struct.Struct("<IIIBBH")
+
+
+class Image:
+    """
+    읽어 들인 이미지 (시뮬레이터와 독립).
+    data: [(주소, bytes)], ranges: [(시작, 끝)] 코드 영역, symbols: 이름 -> 주소, entry: 시작 주소
+    """
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.data = []
+        self.ranges = []
+        self.symbols = {}
+
+
+class ImageCode(dict):
+    """
+    주소 -> DecodedInstruction. 시뮬레이터의 code dict 자리에 들어간다.
+    아직 없는 주소는 (in, get, [] 모두) 코드 영역 안이면 메모리에서 fetch해 해석하고 기억한다.
+    """
+
+    def __init__(self, memory, ranges):
+        super().__init__()
+        self.memory = memory
+        self.ranges = ranges
+        self.watches = {}  # 페이지 번호 -> 쓰기 감시 Region
+
+    def fetch(self, addr):
+        """addr의 명령어를 해석해 기억하고 반환 (코드 영역 밖이면 None)"""
+        if addr & 3:
+            return None
+        for start, end in self.ranges:
+            if start <= addr < end:
+                break
+        else:
+            return None
+        word = int.from_bytes(self.memory.read_block(addr, 4), "little")  # 훅(MMIO, watchpoint)을 거치지 않는다
+        decoded = decode_word(word, addr)
+        dict.__setitem__(self, addr, decoded)
+        pn = addr >> PAGE_SHIFT
+        if pn not in self.watches:
+            self.watches[pn] = self.memory.watch_writes(pn << PAGE_SHIFT, PAGE_SIZE, self._on_write)
+        return decoded
+
+    def __missing__(self, addr):
+        decoded = self.fetch(addr)
+        if decoded is None:
+            raise KeyError(addr)
+        return decoded
+
+    def __contains__(self, addr):
+        return dict.__contains__(self, addr) or self.fetch(addr) is not None
+
+    def get(self, addr, default=None):
+        decoded = dict.get(self, addr)
+        if decoded is None:
+            decoded = self.fetch(addr)
+        return default if decoded is None else decoded
+
+    def _on_write(self, addr, size, value):
+        self.invalidate_range(addr, size)
+
+    def invalidate_range(self, addr, size):
+        """[addr, addr+size)에서 해석해 둔 명령어를 버린다 (훅을 거치지 않은 쓰기, 되돌리기)"""
+        for word_addr in range(addr & ~3, addr + size, 4):
+            dict.pop(self, word_addr, None)
+
+    def invalidate(self):
+        """메모리 내용을 통째로 바꿨을 때 (스냅샷 불러오기) 해석해 둔 명령어를 모두 버린다"""
+        dict.clear(self)
+        for region in self.watches.values():
+            self.memory.unwatch(region)
+        self.watches.clear()
+
+    def checksum(self):
+        """코드 영역의 crc32 (해석해 둔 명령어와 상관없이 같은 이미지면 같다)"""
+        return zlib.crc32(repr(self.ranges).encode())
+
+
+def is_image(path):
+    """어셈블리 소스가 아니라 ELF/raw 바이너리 이미지인지 (확장자 또는 ELF 매직으로 판단)"""
+    if path.lower().endswith(IMAGE_SUFFIXES):
+        return True
+    with open(path, "rb") as f:
+        return f.read(4) == ELF_MAGIC
+
+
+def read_image(path, base):
+    """ELF32 또는 raw 바이너리 파일을 Image로 읽는다 (raw는 base에 올린다)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] == ELF_MAGIC:
+        return read_elf(data)
+    image = Image(base)
+    image.data.append((base, data))
+    image.ranges.append((base, base + len(data)))
+    return image
+
+
+def read_elf(data):
+    (ident, _, machine, _, entry, phoff, shoff, _, _, phentsize, phnum, shentsize, shnum,
+     _) = _ELF_HEADER.unpack_from(data)
+    if ident[4] != 1 or ident[5] != 1:
+        raise Exception("Only little-endian ELF32 images are supported")
+    if machine != EM_ARM:
+        raise Exception(f"Not an ARM ELF image (e_machine {machine})")
+    if entry & 1:
+        raise Exception(f"Thumb entry point is not supported (0x{entry:08X})")
+    image = Image(entry)
+    loaded = []
+    for i in range(phnum):
+        p_type, offset, vaddr, _, filesz, memsz, flags, _ = _PHDR.unpack_from(data, phoff + i * phentsize)
+        if p_type != PT_LOAD or not memsz:
+            continue
+        image.data.append((vaddr, data[offset:offset + filesz] + bytes(memsz - filesz)))
+        loaded.append((vaddr, vaddr + memsz, flags))
+    image.ranges = [(start, end) for start, end, flags in loaded if flags & PF_X]
+    if not image.ranges:
+        image.ranges = [(start, end) for start, end, _ in loaded]
+    image.symbols = _elf_symbols(data, shoff, shentsize, shnum)
+    return image
+
+
+def _elf_symbols(data, shoff, shentsize, shnum):
+    symbols = {}
+    for i in range(shnum):
+        _, sh_type, _, _, offset, size, link, _, _, _ = _SHDR.unpack_from(data, shoff + i * shentsize)
+        if sh_type != SHT_SYMTAB:
+            continue
+        strtab = _SHDR.unpack_from(data, shoff + link * shentsize)[4]
+        for pos in range(offset, offset + size - _SYM.size + 1, _SYM.size):
+            st_name, value, _, info, _, shndx = _SYM.unpack_from(data, pos)
+            if not st_name or shndx == SHN_UNDEF or info & 0xF not in STT_TYPES:
+                continue
+            start = strtab + st_name
+            name = data[start:data.index(b"\0", start)].decode(errors="replace")
+            if name.startswith("$"):
+                continue  # 매핑 심볼 ($a, $d, $t)
+            symbols[name] = value & ~1
+    return symbols
@@ -0,0 +1,204 @@
+"""
+참조 트레이스와 나란히 실행하는 차등(lockstep) 검사.
+
+참조 트레이스는 tracefile.py의 바이너리 형식(ARMT)이다. 레코드 하나가 명령어 하나이며,
+pc(실행 후 pc), 바뀐 레지스터 슬롯 (이전 값, 새 값), 메모리 쓰기 (주소, 이전 bytes, 새 bytes)를 담는다.
+신뢰하는 에뮬레이터에서 같은 형식으로 내보내거나, 'record'로 이 시뮬레이터(예: 검증된 버전)에서 만든다.
+
+비교는 전체 상태가 아니라 ChangeSet으로 한다. 명령어마다 ChangeSet을 기록하며 한 스텝 실행하고,
+시뮬레이터가 바꾼 곳과 참조가 바꾼 곳만 비교해 처음 어긋난 명령어에서 멈춘다.
+(구간 단위로 최종 상태만 비교하면 중간에 덮어써진 차이를 놓쳐 첫 번째 차이를 찾을 수 없다.)
+참조 파일은 READ_SIZE 단위로 압축을 풀며 스트리밍으로 읽으므로 트레이스 길이와 상관없이 메모리 사용량이 일정하다.
+
+    python src/lockstep.py record program.s ref.bin [--max-steps N] [--compression zlib]
+    python src/lockstep.py run program.s ref.bin [--max-steps N]
+"""
+import argparse
+import sys
+from assembler import CODE_BASE, assemble_file
+from loader import is_image
+from memory import PAGE_MASK, PAGE_SHIFT
+from registers import PC, SLOT_NAMES
+from simulator import ARMv7Simulator
+from tracefile import TraceWriter, read_trace
+
+READ_SIZE = 64 << 10  # 참조 파일을 읽는 단위 (압축된 크기)
+
+
+class Divergence:
+    """
+    첫 번째로 어긋난 명령어.
+    index: 0부터 센 명령어 번호, pc: 그 명령어 주소, text: 시뮬레이터의 명령어 소스, reference: 참조 레코드의 소스
+    mismatches: [(위치, 기대값, 실제값)] — 위치는 "r0 <com>", "mem 0x00001000", "pc" 또는 "error"
+    """
+
+    def __init__(self, index, pc, text, reference, mismatches):
+        self.index = index
+        self.pc = pc
+        self.text = text
+        self.reference = reference
+        self.mismatches = mismatches
+
+    def report(self):
+        lines = [f"diverged at instruction {self.index} (pc 0x{self.pc:08X}: {self.text})"]
+        for where, expected, actual in self.mismatches:
+            lines.append(f"  {where}: expected {expected}, got {actual}")
+        lines.append(f"  reference: {self.reference}")
+        return lines
+
+
+def _diff(sim, changes, record):
+    """
+    changes로 기록한 명령어 하나와 참조 레코드의 차이 [(위치, 기대값, 실제값)].
+    한쪽만 바꾼 곳은 다른 쪽에서 명령어 실행 전 값 그대로여야 한다.
+    """
+    slots = sim.registers.slots
+    pc_slot = sim.registers.bank[PC]
+    out = []
+    expected_registers = {slot: new for slot, _, new in record.registers}
+    for slot in sorted(expected_registers.keys() | changes.registers.keys()):
+        if slot == pc_slot:
+            continue
+        actual = slots[slot]
+        expected = expected_registers.get(slot)
+        if expected is None:
+            expected = changes.registers[slot]
+        if expected != actual:
+            mode, name = SLOT_NAMES[slot]
+            out.append((f"{name} <{mode}>", f"0x{expected:08X}", f"0x{actual:08X}"))
+    if record.memory or changes.memory:
+        expected_memory = {}
+        for addr, _, new in record.memory:
+            for i, byte in enumerate(new):
+                expected_memory[addr + i] = byte
+        original = {}  # 시뮬레이터가 쓴 바이트의 실행 전 값
+        for addr, old in reversed(changes.memory):
+            for i, byte in enumerate(old):
+                original[addr + i] = byte
+        pages = sim.memory.pages  # 기록된 쓰기는 RAM 페이지에만 있다 (MMIO는 ChangeSet에 남지 않음)
+        for addr in sorted(expected_memory.keys() | original.keys()):
+            page = pages.get(addr >> PAGE_SHIFT)
+            actual = page[addr & PAGE_MASK] if page is not None else 0
+            expected = expected_memory.get(addr)
+            if expected is None:
+                expected = original[addr]
+            if expected != actual:
+                out.append((f"mem 0x{addr:08X}", f"{expected:02X}", f"{actual:02X}"))
+    actual_pc = slots[pc_slot]
+    if actual_pc != record.pc:
+        out.append(("pc", f"0x{record.pc:08X}", f"0x{actual_pc:08X}"))
+    return out
+
+
+def lockstep(sim, records, max_steps=None):
+    """
+    올려 둔 프로그램을 참조 레코드 스트림(records, TraceRecord iterator)과 한 명령어씩 비교하며 실행합니다.
+    (같았던 명령어 수, Divergence 또는 None)을 반환합니다. 어긋나면 sim은 그 명령어를 실행한 직후 상태입니다.
+    참조가 끝나면 (시뮬레이터에 실행할 명령어가 남아 있어도) 같은 것으로 봅니다.
+    """
+    sim.debugger.clear_breakpoints()
+    registers = sim.registers
+    pc_slot = registers.bank[PC]
+    slots = registers.slots
+    code = sim.code
+    index = 0
+    for record in records:
+        if max_steps is not None and index >= max_steps:
+            break
+        pc = slots[pc_slot]
+        decoded = code.get(pc)
+        if decoded is None:
+            return index, Divergence(index, pc, "(no instruction)", record.text, [("error", "an instruction", "none")])
+        changes = sim.begin_changes()
+        try:
+            sim.step()
+        except Exception as e:
+            return index, Divergence(index, pc, decoded.text, record.text, [("error", "no fault", str(e))])
+        finally:
+            sim.end_changes()
+        # 빠른 확인: 참조가 바꾼 레지스터와 pc만 보고, 다르거나 시뮬레이터가 더 바꿨거나 메모리 쓰기가 있으면 자세히 비교
+        same = slots[pc_slot] == record.pc and not record.memory and not changes.memory \
+            and len(changes.registers) <= len(record.registers)
+        if same:
+            for slot, _, new in record.registers:
+                if slots[slot] != new or (slot not in changes.registers and slot != pc_slot):
+                    same = False
+                    break
+        if not same:
+            mismatches = _diff(sim, changes, record)
+            if mismatches:
+                return index, Divergence(index, pc, decoded.text, record.text, mismatches)
+        index += 1
+    return index, None
+
+
+def record_trace(sim, path, max_steps=None, compression="zlib"):
+    """
+    올려 둔 프로그램을 한 명령어씩 실행하며 참조 트레이스를 path에 씁니다.
+    (기록한 명령어 수, fault 메시지 또는 None)을 반환합니다. fault 난 명령어는 기록하지 않습니다.
+    """
+    sim.debugger.clear_breakpoints()
+    writer = TraceWriter(path, compression)
+    count = 0
+    try:
+        while max_steps is None or count < max_steps:
+            pc = sim.registers.read(PC)
+            decoded = sim.code.get(pc)
+            if decoded is None:
+                break
+            changes = sim.begin_changes()
+            try:
+                sim.step()
+            except Exception as e:
+                return count, f"{e} (pc 0x{pc:08X}: {decoded.text})"
+            finally:
+                sim.end_changes()
+            writer.record(sim, sim.registers.read(PC), decoded.op, decoded.text, changes)
+            count += 1
+    finally:
+        writer.close()
+    return count, None
+
+
+def _load(sim, path, base):
+    if is_image(path):
+        sim.load_image(path, base)
+    else:
+        sim.load_program(assemble_file(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run a program in lockstep with a reference trace")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="write a reference trace from this simulator")
+    rec.add_argument("program")
+    rec.add_argument("trace")
+    rec.add_argument("--max-steps", type=int)
+    rec.add_argument("--compression", choices=["none", "zlib", "lzma"], default="zlib")
+    rec.add_argument("--base", type=lambda s: int(s, 0), default=CODE_BASE, help="load address of a raw binary")
+    run = sub.add_parser("run", help="compare execution with a reference trace")
+    run.add_argument("program")
+    run.add_argument("trace")
+    run.add_argument("--max-steps", type=int)
+    run.add_argument("--base", type=lambda s: int(s, 0), default=CODE_BASE, help="load address of a raw binary")
+    args = parser.parse_args(argv)
+
+    sim = ARMv7Simulator()
+    _load(sim, args.program, args.base)
+    if args.command == "record":
+        count, error = record_trace(sim, args.trace, args.max_steps, args.compression)
+        if error is not None:
+            print(f"recorded {count} instructions (stopped: {error})")
+            return 1
+        print(f"recorded {count} instructions")
+        return 0
+    count, divergence = lockstep(sim, read_trace(args.trace, READ_SIZE), args.max_steps)
+    if divergence is None:
+        print(f"matched {count} instructions")
+        return 0
+    print("\n".join(divergence.report()))
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
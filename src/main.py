@@ -1,43 +1,87 @@
 from simulator import ARMv7Simulator
-from tui import TUI
+from batch import batch_main
+from assembler import CODE_BASE, assemble_file
+from loader import is_image
+from history import History
+import argparse
+import os
 import sys
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="ARMv7 simulator")
+    parser.add_argument("file", nargs="?", help="assembly file (.s), ELF32 executable or raw binary (.bin)")
+    parser.add_argument("--base", type=lambda s: int(s, 0), default=CODE_BASE,
+                        help=f"load address and entry point of a raw binary (default 0x{CODE_BASE:X})")
+    parser.add_argument("--commands", metavar="FILE",
+                        help="queue the lines of FILE as reserved commands for the TUI (read lazily, one per ENTER after the program ends)")
+    parser.add_argument("--history", metavar="FILE", default="~/.armv7sim_history",
+                        help="TUI command history file, appended to and reloaded next session (default: ~/.armv7sim_history)")
+    parser.add_argument("--history-size", type=int, default=1000, help="commands kept in memory for UP/DOWN and Ctrl-R (default 1000)")
+    parser.add_argument("--no-history", action="store_true", help="keep the TUI history in memory only")
+    parser.add_argument("--devices", action="store_true",
+                        help="map the MMIO devices: interrupt controller (0x10140000), timer (0x101E2000) and UART (0x101F1000)")
+    parser.add_argument("--uart", metavar="FILE",
+                        help="UART output file with --devices, '-' for stdout (default: stdout in batch mode, uart.log in the TUI)")
+    parser.add_argument("--batch", action="store_true", help="run headless (no curses) and dump final state as JSON")
+    parser.add_argument("--max-steps", type=int, default=None, help="instruction budget in batch mode")
+    parser.add_argument("--no-break", action="store_true", help="ignore '@@ break' and run the whole file in batch mode")
+    parser.add_argument("--no-blocks", action="store_true", help="disable the block translation cache in batch mode (interpret one instruction at a time)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the batch run: write collapsed stacks (for flamegraph tools) to FILE and a report to stderr")
+    parser.add_argument("--stats", action="store_true",
+                        help="measure the simulator itself in batch mode: MIPS, host time per phase and per handler")
+    parser.add_argument("-o", "--output", help="write the batch JSON result to this file instead of stdout")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="more output (-vv prints every instruction)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the JSON result")
+    parser.add_argument("--trace-compression", choices=["none", "zlib", "lzma"], default="zlib",
+                        help="compression of the TUI binary trace file (default: zlib)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     simulator = ARMv7Simulator()
-    commands = []
-    reserved_commands = []
 
-    if len(sys.argv) > 1:
-        with open(sys.argv[1], "r") as f:
-            break_found = False
-            for line in f:
-                cmd = line.strip()
-                if not cmd or cmd.startswith("#"):
-                    continue
-                if cmd.startswith("@@ break"):
-                    break_found = True
-                    print("Breakpoint encountered. Switching to interactive mode.")
-                    continue
-                if not break_found:
-                    commands.append(cmd)
-                else:
-                    reserved_commands.append(cmd)
+    if args.devices:
+        uart = args.uart or ("-" if args.batch else "uart.log")
+        simulator.bus.attach_defaults(sys.stdout.buffer if uart == "-" else open(uart, "wb"))
+
+    if args.batch:
+        if not args.file:
+            print("--batch requires an assembly file or image", file=sys.stderr)
+            return 2
+        verbose = 0 if args.quiet else max(args.verbose, 1)  # 기본은 요약 (1), -vv부터 명령어마다 출력
+        return batch_main(simulator, args.file, args.max_steps, not args.no_break, verbose, args.output, not args.no_blocks, args.profile, args.stats,
+                          args.base)
+
+    from tui import TUI
+    if args.file:
+        try:
+            if is_image(args.file):
+                simulator.load_image(args.file, args.base)
+            else:
+                simulator.load_program(assemble_file(args.file))
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
         # break 전까지 일괄 실행
-        for cmd in commands:
-            try:
-                simulator.parse_and_execute(cmd)
-                print(f"Executed: {cmd}")
-            except Exception as e:
-                print(f"Error: {e} (cmd: {cmd})")
-        # break 이후 명령어 reserved에 추가
-        for cmd in reserved_commands:
-            simulator.add_reserved(cmd)
-        # break 이후부터는 TUI로
-        tui = TUI(simulator)
-        tui.run()
-    else:
-        tui = TUI(simulator)
+        try:
+            steps = simulator.run()
+            print(f"Executed {steps} instructions.")
+        except Exception as e:
+            print(f"Error: {e}")
+        if simulator.halt is not None:
+            print(f"{simulator.halt} hit. Switching to interactive mode.")
+    if args.commands:
+        simulator.stream_reserved(args.commands)
+    simulator.history = History(args.history_size, None if args.no_history else os.path.expanduser(args.history))
+    # break 이후부터는 TUI로
+    tui = TUI(simulator, args.trace_compression)
+    try:
         tui.run()
+    finally:
+        simulator.history.close()
+        simulator.bus.flush()
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import struct
+
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT  # 4 KiB
+PAGE_MASK = PAGE_SIZE - 1
+ADDR_MASK = 0xFFFFFFFF
+
+RAM = "ram"
+ROM = "rom"
+MMIO = "mmio"
+WATCH = "watch"  # RAM이지만 읽기/쓰기를 콜백으로 알려줌 (코드 페이지 무효화, watchpoint 등)
+
+_WORD = struct.Struct("<I")
+_HALF = struct.Struct("<H")
+_WORDS = {}  # 워드 개수 -> struct.Struct("<nI") (LDM/STM 일괄 전송용)
+
+
+def _words_struct(count):
+    st = _WORDS.get(count)
+    if st is None:
+        st = _WORDS[count] = struct.Struct(f"<{count}I")
+    return st
+
+
+class Region:
+    """주소 구간 [start, end) 과 그 종류(RAM/ROM/MMIO). MMIO는 read(addr, size)/write(addr, size, value) 콜백을 가진다."""
+    __slots__ = ("start", "end", "kind", "name", "read", "write")
+
+    def __init__(self, start, size, kind, name="", read=None, write=None):
+        self.start = start
+        self.end = start + size
+        self.kind = kind
+        self.name = name
+        self.read = read
+        self.write = write
+
+    def __contains__(self, addr):
+        return self.start <= addr < self.end
+
+    def __repr__(self):
+        return f"<{self.kind} {self.name} 0x{self.start:08X}-0x{self.end:08X}>"
+
+
+class Memory:
+    """
+    4 KiB 페이지 단위의 희소 바이트 메모리 (little-endian).
+    페이지는 처음 쓰일 때 bytearray로 할당되고, 매핑되지 않은 영역은 RAM으로 취급한다.
+    ROM/MMIO가 걸친 페이지만 느린 경로를 거치므로 일반 RAM 접근은 추가 비용이 없다.
+    """
+
+    def __init__(self):
+        self.pages = {}  # 페이지 번호 -> bytearray(PAGE_SIZE)
+        self.regions = []
+        self.read_hooks = {}  # 페이지 번호 -> [Region] (MMIO)
+        self.write_hooks = {}  # 페이지 번호 -> [Region] (ROM, MMIO)
+        self.changes = None  # ChangeSet (기록 중일 때만)
+
+    # --- 영역 매핑 ---
+    def map_region(self, start, size, kind=RAM, name="", read=None, write=None, data=None):
+        region = Region(start, size, kind, name, read, write)
+        self.regions.append(region)
+        self.regions.sort(key=lambda r: r.start)
+        if kind != RAM:
+            for pn in range(start >> PAGE_SHIFT, ((start + size - 1) >> PAGE_SHIFT) + 1):
+                self.write_hooks.setdefault(pn, []).append(region)
+                if kind == MMIO:
+                    self.read_hooks.setdefault(pn, []).append(region)
+        if data:
+            self.load(start, data)
+        return region
+
+    def watch_writes(self, start, size, callback):
+        """[start, start+size) 에 대한 쓰기마다 callback(addr, size, value)를 호출 (쓰기 자체는 그대로 진행)"""
+        region = Region(start, size, WATCH, "watch", write=callback)
+        for pn in range(start >> PAGE_SHIFT, ((start + size - 1) >> PAGE_SHIFT) + 1):
+            self.write_hooks.setdefault(pn, []).append(region)
+        return region
+
+    def watch_reads(self, start, size, callback):
+        """[start, start+size) 에 대한 읽기마다 callback(addr, size)를 호출 (읽기 자체는 그대로 진행)"""
+        region = Region(start, size, WATCH, "watch", read=callback)
+        for pn in range(start >> PAGE_SHIFT, ((start + size - 1) >> PAGE_SHIFT) + 1):
+            self.read_hooks.setdefault(pn, []).append(region)
+        return region
+
+    def unwatch(self, region):
+        for table in (self.read_hooks, self.write_hooks):
+            for pn in range(region.start >> PAGE_SHIFT, ((region.end - 1) >> PAGE_SHIFT) + 1):
+                hooks = table.get(pn)
+                if hooks and region in hooks:
+                    hooks.remove(region)
+                    if not hooks:
+                        del table[pn]
+
+    def find_region(self, addr):
+        for region in self.regions:
+            if addr in region:
+                return region
+        return None
+
+    def _page(self, pn):
+        page = self.pages.get(pn)
+        if page is None:
+            page = self.pages[pn] = bytearray(PAGE_SIZE)
+        return page
+
+    # --- 느린 경로 (ROM/MMIO 페이지) ---
+    def _hooked_read(self, addr, size):
+        """훅 처리. MMIO가 읽기를 가져갔으면 그 값, 일반 읽기를 계속해야 하면 None"""
+        for region in list(self.read_hooks[addr >> PAGE_SHIFT]):
+            if addr in region:
+                if region.kind == WATCH:
+                    region.read(addr, size)
+                    continue
+                return region.read(addr, size) & ((1 << (size * 8)) - 1)
+        return None
+
+    def _hooked_write(self, addr, size, value):
+        """훅 처리. MMIO가 쓰기를 가져갔으면 True, 일반 쓰기를 계속해야 하면 False"""
+        for region in list(self.write_hooks[addr >> PAGE_SHIFT]):
+            if addr in region:
+                if region.kind == WATCH:
+                    region.write(addr, size, value)
+                    continue
+                if region.kind == ROM:
+                    raise Exception(f"Write to ROM at 0x{addr:08X}")
+                region.write(addr, size, value)
+                return True
+        return False
+
+    # --- 워드/하프워드/바이트 접근 ---
+    def read_word(self, addr):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.read_hooks:
+            value = self._hooked_read(addr, 4)
+            if value is not None:
+                return value
+        off = addr & PAGE_MASK
+        page = self.pages.get(pn)
+        if off <= PAGE_SIZE - 4:
+            return _WORD.unpack_from(page, off)[0] if page is not None else 0
+        return int.from_bytes(self.read_block(addr, 4), "little")
+
+    def write_word(self, addr, value):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.write_hooks and self._hooked_write(addr, 4, value):
+            return
+        off = addr & PAGE_MASK
+        if off <= PAGE_SIZE - 4:
+            if self.changes is not None:
+                self.changes.memory.append((addr, self.read_block(addr, 4)))
+            _WORD.pack_into(self._page(pn), off, value & ADDR_MASK)
+        else:
+            self.write_block(addr, (value & ADDR_MASK).to_bytes(4, "little"))
+
+    def read_half(self, addr):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.read_hooks:
+            value = self._hooked_read(addr, 2)
+            if value is not None:
+                return value
+        off = addr & PAGE_MASK
+        page = self.pages.get(pn)
+        if off <= PAGE_SIZE - 2:
+            return _HALF.unpack_from(page, off)[0] if page is not None else 0
+        return int.from_bytes(self.read_block(addr, 2), "little")
+
+    def write_half(self, addr, value):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.write_hooks and self._hooked_write(addr, 2, value):
+            return
+        off = addr & PAGE_MASK
+        if off <= PAGE_SIZE - 2:
+            if self.changes is not None:
+                self.changes.memory.append((addr, self.read_block(addr, 2)))
+            _HALF.pack_into(self._page(pn), off, value & 0xFFFF)
+        else:
+            self.write_block(addr, (value & 0xFFFF).to_bytes(2, "little"))
+
+    def read_byte(self, addr):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.read_hooks:
+            value = self._hooked_read(addr, 1)
+            if value is not None:
+                return value
+        page = self.pages.get(pn)
+        return page[addr & PAGE_MASK] if page is not None else 0
+
+    def write_byte(self, addr, value):
+        pn = addr >> PAGE_SHIFT
+        if pn in self.write_hooks and self._hooked_write(addr, 1, value):
+            return
+        if self.changes is not None:
+            self.changes.memory.append((addr, self.read_block(addr, 1)))
+        self._page(pn)[addr & PAGE_MASK] = value & 0xFF
+
+    # --- 여러 워드 일괄 접근 (LDM/STM/PUSH/POP) ---
+    def read_words(self, addr, count):
+        """addr부터 count개의 워드를 튜플로. 한 페이지 안이고 훅이 없으면 unpack 한 번으로 읽는다."""
+        pn = addr >> PAGE_SHIFT
+        off = addr & PAGE_MASK
+        if off + 4 * count <= PAGE_SIZE and pn not in self.read_hooks:
+            page = self.pages.get(pn)
+            if page is None:
+                return (0,) * count
+            return _words_struct(count).unpack_from(page, off)
+        return tuple(self.read_word(addr + 4 * i) for i in range(count))
+
+    def write_words(self, addr, values):
+        """addr부터 values를 연속으로 쓴다. 한 페이지 안이고 훅이 없으면 pack 한 번으로 쓴다."""
+        count = len(values)
+        pn = addr >> PAGE_SHIFT
+        off = addr & PAGE_MASK
+        if off + 4 * count <= PAGE_SIZE and pn not in self.write_hooks:
+            page = self._page(pn)
+            if self.changes is not None:
+                self.changes.memory.append((addr, bytes(page[off:off + 4 * count])))
+            _words_struct(count).pack_into(page, off, *values)
+            return
+        for i, value in enumerate(values):
+            self.write_word(addr + 4 * i, value)
+
+    # --- 블록 접근 (페이지 경계를 넘을 수 있음, 훅은 거치지 않음) ---
+    def read_block(self, addr, size):
+        out = bytearray(size)
+        pos = 0
+        while pos < size:
+            pn = (addr + pos) >> PAGE_SHIFT
+            off = (addr + pos) & PAGE_MASK
+            n = min(size - pos, PAGE_SIZE - off)
+            page = self.pages.get(pn)
+            if page is not None:
+                out[pos:pos + n] = memoryview(page)[off:off + n]
+            pos += n
+        return bytes(out)
+
+    def write_block(self, addr, data):
+        data = memoryview(data).cast("B")
+        if self.changes is not None:
+            self.changes.memory.append((addr, self.read_block(addr, len(data))))
+        pos = 0
+        size = len(data)
+        while pos < size:
+            pn = (addr + pos) >> PAGE_SHIFT
+            off = (addr + pos) & PAGE_MASK
+            n = min(size - pos, PAGE_SIZE - off)
+            memoryview(self._page(pn))[off:off + n] = data[pos:pos + n]
+            pos += n
+
+    def load(self, addr, data):
+        """이미지 로드용: ROM 보호를 무시하고 그대로 기록"""
+        self.write_block(addr, data)
+
+    # --- 조회 ---
+    def used_bytes(self):
+        return len(self.pages) * PAGE_SIZE
+
+    def items(self):
+        """0이 아닌 워드들을 (주소, 값) 으로 주소 순서대로 반환"""
+        for pn in sorted(self.pages):
+            base = pn << PAGE_SHIFT
+            words = memoryview(self.pages[pn]).cast("I")
+            for i, value in enumerate(words):
+                if value:
+                    yield base + i * 4, value
+
+    def clear(self):
+        self.pages.clear()
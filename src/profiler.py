@@ -0,0 +1,250 @@
+"""
+게스트 코드 프로파일러.
+
+켜면(enable) 시뮬레이터의 실행 경로 세 곳을 계측된 것으로 바꿔 끼우고, 끄면(disable) 원래대로 돌려놓는다.
+꺼져 있을 때는 run()/step()/메모리 접근 어디에도 검사 코드가 남지 않으므로 비용이 없다.
+
+- sim.blocks.get: 블록 실행을 감싸 (시작 주소, 실행한 명령어 수)별 횟수를 센다.
+  주소별 횟수(array)와 명령어 종류별 횟수는 보고서를 만들 때 이 값에서 펼친다.
+- sim.step: 한 명령어씩 실행할 때 같은 방식으로 센다.
+- memory.read_hooks/write_hooks: 모든 페이지가 훅이 걸린 것처럼 보이는 테이블로 바꿔 페이지별 읽기/쓰기 횟수를 센다.
+
+호출 스택은 BL로 들어갈 때 (함수 label, 복귀 주소)를 쌓고, pc가 스택에 있는 복귀 주소로 돌아오면 거기까지 꺼낸다.
+블록은 pc를 바꾸는 명령어에서 끝나므로 블록 경계에서만 확인하면 충분하다.
+벡터 테이블로 뛰어든 경우(예외 진입)는 예외 이름으로 프레임을 쌓는다.
+"""
+import bisect
+from array import array
+from collections import Counter
+from blocks import Block
+from decoder import Op
+from interrupts import EXCEPTIONS
+from memory import PAGE_SHIFT, WATCH, Region
+from registers import LR, PC
+
+# 벡터 오프셋 -> 예외 이름
+_VECTORS = {offset: kind for kind, (_, offset, _, _) in EXCEPTIONS.items()}
+
+
+class _AllPages(dict):
+    """모든 페이지에 region 훅이 걸린 것처럼 보이는 훅 테이블 (실제 훅은 그대로 dict에 들어 있다)"""
+
+    def __init__(self, hooks, region):
+        super().__init__(hooks)
+        self.region = region
+
+    def __contains__(self, pn):
+        return True
+
+    def __getitem__(self, pn):
+        return [self.region] + dict.get(self, pn, [])
+
+
+class Profiler:
+    def __init__(self, sim):
+        self.sim = sim
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.block_runs = Counter()  # (시작 주소, 명령어 수) -> 실행 횟수
+        self.stacks = Counter()  # 호출 스택 (label 튜플) -> 명령어 수
+        self.page_reads = Counter()  # 페이지 번호 -> 읽기 횟수
+        self.page_writes = Counter()
+        self.frames = []  # [(label, 복귀 주소)]
+        self.stack_key = ()
+        self.expected = None  # 직전에 센 명령어 다음의 pc (다르면 밖에서 pc가 바뀐 것)
+        self.wrapped = {}  # 시작 주소 -> (원래 Block, 계측 Block)
+        self.names = {}  # 주소 -> 함수 이름 (symbol 캐시)
+
+    # --- 켜기/끄기 ---
+    def enable(self):
+        if self.enabled:
+            return
+        sim = self.sim
+        memory = sim.memory
+        self.get_block = sim.blocks.get
+        sim.blocks.get = self._get_block
+        sim.step = self._step
+        self.read_region = Region(0, 1 << 32, WATCH, "profile", read=self._on_read)
+        self.write_region = Region(0, 1 << 32, WATCH, "profile", write=self._on_write)
+        memory.read_hooks = _AllPages(memory.read_hooks, self.read_region)
+        memory.write_hooks = _AllPages(memory.write_hooks, self.write_region)
+        self.expected = None
+        self.names.clear()
+        self.enabled = True
+
+    def disable(self):
+        if not self.enabled:
+            return
+        sim = self.sim
+        del sim.blocks.get
+        del sim.step
+        sim.memory.read_hooks = dict(sim.memory.read_hooks)
+        sim.memory.write_hooks = dict(sim.memory.write_hooks)
+        self.wrapped.clear()
+        self.enabled = False
+
+    # --- 계측 ---
+    def _get_block(self, addr):
+        block = self.get_block(addr)
+        if block is None:
+            return None
+        entry = self.wrapped.get(addr)
+        if entry is None or entry[0] is not block:
+            inner = block.run
+
+            def run(sim):
+                self._enter(addr)
+                count = inner(sim)
+                self._account(addr, count)
+                return count
+            entry = self.wrapped[addr] = (block, Block(block.start, block.end, block.count, run))
+        return entry[1]
+
+    def _step(self):
+        sim = self.sim
+        pc = sim.registers.slots[PC]
+        self._enter(pc)
+        type(sim).step(sim)
+        self._account(pc, 1)
+
+    def _on_read(self, addr, size):
+        self.page_reads[addr >> PAGE_SHIFT] += 1
+
+    def _on_write(self, addr, size, value):
+        self.page_writes[addr >> PAGE_SHIFT] += 1
+
+    def _enter(self, pc):
+        # 계측 밖에서 pc가 바뀜 (인터럽트 진입, TUI 명령어 등)
+        if pc != self.expected:
+            self._exception_entry(pc)
+
+    def _exception_entry(self, pc):
+        """pc가 벡터 테이블이면 예외 프레임을 쌓고 True"""
+        kind = _VECTORS.get(pc - self.sim.interrupts.vector_base)
+        if kind is None:
+            return False
+        self._push(kind, self.sim.registers.read(LR) - EXCEPTIONS[kind][2])
+        return True
+
+    def _account(self, start, count):
+        self.block_runs[(start, count)] += 1
+        self.stacks[self.stack_key] += count
+        pc = self.sim.registers.slots[PC]
+        self.expected = pc
+        last = start + 4 * (count - 1)
+        if pc == last + 4:
+            return
+        decoded = self.sim.code.get(last)
+        if decoded is not None and decoded.op == Op.BL:
+            self._push(self.symbol(pc), last + 4)
+            return
+        if self._exception_entry(pc):
+            return
+        for i in range(len(self.frames) - 1, -1, -1):
+            if self.frames[i][1] == pc:
+                del self.frames[i:]
+                self.stack_key = tuple(name for name, _ in self.frames)
+                return
+
+    def _push(self, name, return_addr):
+        self.frames.append((name, return_addr))
+        self.stack_key = self.stack_key + (name,)
+
+    # --- 보고서 ---
+    def symbol(self, addr):
+        """addr를 포함하는 함수 이름: addr 이하에서 가장 가까운 label (없으면 16진수 주소)"""
+        name = self.names.get(addr)
+        if name is None:
+            labels = sorted((a, name) for name, a in self.sim.labels.items() if a in self.sim.code)
+            i = bisect.bisect_right([a for a, _ in labels], addr)
+            name = self.names[addr] = labels[i - 1][1] if i else f"0x{addr:08X}"
+        return name
+
+    def pc_counts(self):
+        """(주소 리스트, 주소별 실행 횟수 array('Q')) — 코드 이미지의 명령어 순서대로, 주소 사이 빈틈 없이"""
+        addrs = sorted(self.sim.code)
+        index = {addr: i for i, addr in enumerate(addrs)}
+        counts = array('Q', bytes(8 * len(addrs)))
+        for (start, count), runs in self.block_runs.items():
+            i = index.get(start)
+            if i is None:
+                continue  # 그 뒤에 다른 프로그램을 올림
+            for j in range(i, min(i + count, len(addrs))):
+                counts[j] += runs
+        return addrs, counts
+
+    def hot_pcs(self, n=10):
+        """[(주소, 실행 횟수)] 많이 실행된 순"""
+        addrs, counts = self.pc_counts()
+        hot = sorted(((c, i) for i, c in enumerate(counts) if c), reverse=True)[:n]
+        return [(addrs[i], c) for c, i in hot]
+
+    def op_counts(self):
+        """명령어 종류(Op 이름)별 실행 횟수"""
+        addrs, counts = self.pc_counts()
+        code = self.sim.code
+        out = Counter()
+        for addr, c in zip(addrs, counts):
+            if c:
+                out[code[addr].op.name] += c
+        return out
+
+    def hot_blocks(self, n=10):
+        """[(시작 주소, 실행한 명령어 수 합)] 많이 실행된 순"""
+        out = Counter()
+        for (start, count), runs in self.block_runs.items():
+            out[start] += count * runs
+        return out.most_common(n)
+
+    def functions(self):
+        """함수 label -> (inclusive, exclusive) 명령어 수. 최상위(호출 밖)는 '<top>'"""
+        out = {}
+        for stack, count in self.stacks.items():
+            names = ("<top>",) + stack
+            for name in set(names):
+                inclusive, exclusive = out.get(name, (0, 0))
+                out[name] = (inclusive + count, exclusive + (count if names[-1] == name else 0))
+        return out
+
+    def total(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        """flamegraph.pl / speedscope 용 collapsed stack 줄들 ('a;b;c 123')"""
+        return [f"{';'.join(('<top>',) + stack)} {count}" for stack, count in sorted(self.stacks.items()) if count]
+
+    def save_collapsed(self, path):
+        with open(path, "w") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
+
+    def report(self, n=10):
+        """상위 n개 보고서 (텍스트 줄 리스트)"""
+        total = self.total()
+        if not total:
+            return ["No samples"]
+        lines = [f"{total} instructions"]
+        lines.append("Hot instructions:")
+        code = self.sim.code
+        for addr, c in self.hot_pcs(n):
+            text = code[addr].text.strip() if addr in code else ""
+            lines.append(f"  0x{addr:08X} {c:10} {100 * c / total:5.1f}%  {text}")
+        lines.append("Hot blocks:")
+        for start, c in self.hot_blocks(n):
+            lines.append(f"  0x{start:08X} {c:10} {100 * c / total:5.1f}%  {self.symbol(start)}")
+        lines.append("Functions (inclusive / exclusive):")
+        funcs = sorted(self.functions().items(), key=lambda item: -item[1][0])[:n]
+        for name, (inclusive, exclusive) in funcs:
+            lines.append(f"  {name:20} {inclusive:10} {exclusive:10}")
+        lines.append("Opcodes:")
+        for name, c in self.op_counts().most_common(n):
+            lines.append(f"  {name:8} {c:10} {100 * c / total:5.1f}%")
+        pages = sorted(set(self.page_reads) | set(self.page_writes),
+                       key=lambda pn: -(self.page_reads[pn] + self.page_writes[pn]))[:n]
+        if pages:
+            lines.append("Memory pages (reads / writes):")
+            for pn in pages:
+                lines.append(f"  0x{pn << PAGE_SHIFT:08X} {self.page_reads[pn]:10} {self.page_writes[pn]:10}")
+        return lines
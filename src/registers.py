@@ -0,0 +1,253 @@
+from array import array
+
+# 논리 레지스터 번호 (r0~r15, cpsr, spsr)
+SP = 13
+LR = 14
+PC = 15
+CPSR = 16
+SPSR = 17
+
+REG_INDEX = {f"r{i}": i for i in range(16)}
+REG_INDEX.update({"sl": 10, "fp": 11, "ip": 12, "sp": SP, "lr": LR, "pc": PC, "cpsr": CPSR, "spsr": SPSR})
+
+# CPSR 모드 비트 -> 모드 이름 (usr와 sys는 같은 뱅크를 쓴다)
+MODE_BITS = {
+    0x10: "usr/sys",
+    0x11: "fiq",
+    0x12: "irq",
+    0x13: "svc",
+    0x16: "mon",
+    0x17: "abt",
+    0x1B: "und",
+    0x1F: "usr/sys",
+}
+MODE_SYS = 0x1F
+
+# CPSR 조건 플래그 비트
+FLAG_N = 1 << 31
+FLAG_Z = 1 << 30
+FLAG_C = 1 << 29
+FLAG_V = 1 << 28
+NZCV_MASK = 0xF0000000
+
+# 지연 플래그 종류: 마지막 플래그 설정 명령어의 결과/오퍼랜드만 저장해 두고 필요할 때 NZCV를 계산
+FLAGS_LOGIC = 1  # N, Z = 결과, C = shifter carry (None이면 유지), V 유지
+FLAGS_ARITH = 2  # 결과 = a + b + carry_in (32비트 넘는 값 그대로): N, Z, C, V 모두
+
+# 조건 코드 (ARM 인코딩 순서)
+COND_CODES = ["eq", "ne", "cs", "cc", "mi", "pl", "vs", "vc", "hi", "ls", "ge", "lt", "gt", "le", "al"]
+COND_INDEX = {name: i for i, name in enumerate(COND_CODES)}
+COND_INDEX.update({"hs": 2, "lo": 3})
+COND_AL = 14
+
+
+def _cond_holds(cond, nzcv):
+    n, z, c, v = (nzcv >> 3) & 1, (nzcv >> 2) & 1, (nzcv >> 1) & 1, nzcv & 1
+    return [z, not z, c, not c, n, not n, v, not v, c and not z, not c or z,
+            n == v, n != v, not z and n == v, z or n != v, True][cond]
+
+
+# COND_TABLE[cond][nzcv]: 조건 통과 여부
+COND_TABLE = [[bool(_cond_holds(cond, nzcv)) for nzcv in range(16)] for cond in range(15)]
+
+
+def _build_layout():
+    """
+    물리 슬롯 배치와 모드별 뱅크 테이블을 만든다.
+    뱅크는 논리 번호(0~17) -> 물리 슬롯 번호 리스트이며, 모드 전환은 뱅크 리스트 교체로 끝난다.
+    """
+    groups = []
+    # com: r0~r12, pc, cpsr / usr/sys: sp, lr, spsr
+    com = [(f"r{i}", i) for i in range(13)] + [("pc", 15), ("cpsr", 16)]
+    groups.append(("com", com))
+    groups.append(("usr/sys", [("sp", 13), ("lr", 14), ("spsr", 17)]))
+    base = list(range(18))
+    banks = {"usr/sys": base}
+    slot = 18
+    for mode in ["svc", "abt", "und", "irq", "mon", "fiq"]:
+        bank = list(base)
+        names = ["r8", "r9", "r10", "r11", "r12"] if mode == "fiq" else []
+        names += ["sp", "lr", "spsr"]
+        entries = []
+        for name in names:
+            bank[REG_INDEX[name]] = slot
+            entries.append((name, slot))
+            slot += 1
+        banks[mode] = bank
+        groups.append((mode, entries))
+    return groups, banks, slot
+
+
+GROUPS, BANKS, NUM_SLOTS = _build_layout()
+SLOT_NAMES = {slot: (mode, name) for mode, entries in GROUPS for name, slot in entries}
+
+
+def register_index(name):
+    """레지스터 이름(r0, sp, cpsr ...)을 논리 번호로 변환"""
+    index = REG_INDEX.get(name.lower())
+    if index is None:
+        raise Exception(f"Register {name} not found")
+    return index
+
+
+class RegisterFile:
+    """
+    array('I') 하나에 모든 뱅크 레지스터를 담은 레지스터 파일.
+    read/write는 현재 모드의 뱅크 테이블을 통해 O(1)로 물리 슬롯에 접근한다.
+    """
+
+    def __init__(self):
+        self.slots = array('I', bytes(4 * NUM_SLOTS))
+        self.changes = None  # ChangeSet (기록 중일 때만)
+        self.on_cpsr_write = None  # CPSR을 쓴 뒤 호출 (인터럽트 마스크 변경 확인)
+        self.mode = "usr/sys"
+        self.bank = BANKS[self.mode]
+        self.slots[CPSR] = MODE_SYS
+        # 지연 플래그: flag_kind가 None이 아니면 CPSR의 NZCV는 아직 반영되지 않은 상태
+        self.lazy_flags = True  # False이면 플래그를 설정할 때마다 바로 계산 (벤치마크 비교용)
+        self.flag_kind = None
+        self.flag_a = 0
+        self.flag_b = 0
+        self.flag_res = 0
+
+    def reset(self):
+        self.slots[:] = array('I', bytes(4 * NUM_SLOTS))
+        self.mode = "usr/sys"
+        self.bank = BANKS[self.mode]
+        self.slots[CPSR] = MODE_SYS
+        self.flag_kind = None
+
+    def read(self, index):
+        if index == CPSR and self.flag_kind is not None:
+            self.flush_flags()
+        return self.slots[self.bank[index]]
+
+    def write(self, index, value):
+        if index == CPSR:
+            self.write_cpsr(value)
+            return
+        slot = self.bank[index]
+        changes = self.changes
+        if changes is not None and slot not in changes.registers:
+            changes.registers[slot] = self.slots[slot]
+        self.slots[slot] = value & 0xFFFFFFFF
+
+    def read_user(self, index):
+        """현재 모드와 상관없이 사용자 모드 뱅크의 레지스터 읽기 (LDM/STM '^', r0~r15만)"""
+        return self.slots[BANKS["usr/sys"][index]]
+
+    def write_user(self, index, value):
+        slot = BANKS["usr/sys"][index]
+        changes = self.changes
+        if changes is not None and slot not in changes.registers:
+            changes.registers[slot] = self.slots[slot]
+        self.slots[slot] = value & 0xFFFFFFFF
+
+    def write_cpsr(self, value):
+        """CPSR 전체를 쓰고 모드 비트에 맞는 뱅크로 전환 (대기 중인 지연 플래그는 버린다)"""
+        self.flush_flags()
+        changes = self.changes
+        if changes is not None and CPSR not in changes.registers:
+            changes.registers[CPSR] = self.slots[CPSR]
+        self.slots[CPSR] = value & 0xFFFFFFFF
+        self.switch_mode(value & 0x1F)
+        if self.on_cpsr_write is not None:
+            self.on_cpsr_write()
+
+    # --- 조건 플래그 ---
+    def set_logic_flags(self, res, carry):
+        """논리 연산의 S 접미사: N, Z = res, C = carry (None이면 유지)"""
+        changes = self.changes
+        if changes is not None and CPSR not in changes.registers:
+            self._track_flags()
+        elif self.flag_kind is not None:
+            # 이전 C, V가 필요하므로 먼저 반영
+            self.flush_flags()
+        self.flag_kind = FLAGS_LOGIC
+        self.flag_a = carry
+        self.flag_res = res
+        if not self.lazy_flags:
+            self.flush_flags()
+
+    def set_arith_flags(self, a, b, res):
+        """산술 연산의 S 접미사: res = a + b + carry_in (마스크하지 않은 값)"""
+        changes = self.changes
+        if changes is not None and CPSR not in changes.registers:
+            self._track_flags()
+        self.flag_kind = FLAGS_ARITH
+        self.flag_a = a
+        self.flag_b = b
+        self.flag_res = res
+        if not self.lazy_flags:
+            self.flush_flags()
+
+    def _track_flags(self):
+        # 기록 중 처음 플래그를 바꿀 때만 반영해 바뀌기 전 CPSR을 ChangeSet에 남긴다 (이후는 계속 지연, end_changes에서 반영)
+        self.flush_flags()
+        self.changes.registers[CPSR] = self.slots[CPSR]
+
+    def flush_flags(self):
+        """지연된 플래그를 CPSR의 NZCV 비트에 반영"""
+        kind = self.flag_kind
+        if kind is None:
+            return
+        self.flag_kind = None
+        cpsr = self.slots[CPSR]
+        res = self.flag_res
+        value = res & 0xFFFFFFFF
+        nzcv = (value & FLAG_N) | (FLAG_Z if value == 0 else 0)
+        if kind == FLAGS_ARITH:
+            if res >> 32:
+                nzcv |= FLAG_C
+            a = self.flag_a
+            if ~(a ^ self.flag_b) & (a ^ value) & 0x80000000:
+                nzcv |= FLAG_V
+        else:
+            carry = self.flag_a
+            if carry is None:
+                nzcv |= cpsr & (FLAG_C | FLAG_V)
+            else:
+                nzcv |= (FLAG_C if carry else 0) | (cpsr & FLAG_V)
+        self.slots[CPSR] = (cpsr & ~NZCV_MASK & 0xFFFFFFFF) | nzcv
+
+    def carry(self):
+        """C 플래그 (ADC/SBC/RRX 입력)"""
+        kind = self.flag_kind
+        if kind == FLAGS_ARITH:
+            return self.flag_res >> 32
+        if kind is not None:
+            self.flush_flags()
+        return (self.slots[CPSR] >> 29) & 1
+
+    def condition_passed(self, cond):
+        """조건 코드 검사. EQ/NE/MI/PL(및 산술 결과의 CS/CC)은 NZCV를 만들지 않고 결과에서 바로 판단"""
+        kind = self.flag_kind
+        if kind is not None:
+            if cond < 2:
+                return ((self.flag_res & 0xFFFFFFFF) == 0) != cond
+            if 4 <= cond < 6:
+                return bool(self.flag_res & 0x80000000) != (cond == 5)
+            if kind == FLAGS_ARITH and cond < 4:
+                return bool(self.flag_res >> 32) != (cond == 3)
+            self.flush_flags()
+        return COND_TABLE[cond][self.slots[CPSR] >> 28]
+
+    def switch_mode(self, mode_bits):
+        """CPSR 모드 비트에 맞는 뱅크로 교체"""
+        mode = MODE_BITS.get(mode_bits)
+        if mode is None:
+            raise Exception(f"Invalid CPSR mode: 0x{mode_bits:02X}")
+        self.mode = mode
+        self.bank = BANKS[mode]
+
+    def __getitem__(self, name):
+        return self.read(register_index(name))
+
+    def __setitem__(self, name, value):
+        self.write(register_index(name), value)
+
+    def grouped(self):
+        """TUI용 모드별 읽기 전용 뷰: {mode: {name: value}}"""
+        self.flush_flags()
+        slots = self.slots
+        return {mode: {name: slots[slot] for name, slot in entries} for mode, entries in GROUPS}
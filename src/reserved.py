@@ -0,0 +1,97 @@
+"""
+reserved 명령어 큐.
+
+코드가 끝난 뒤 TUI에서 ENTER마다 하나씩 실행할 명령어들. 앞에서 꺼내고(popleft) step back 때 앞에 되돌려 넣으므로
+deque로 두 끝 모두 O(1)이다. 파일을 큐에 걸면(stream) 미리 읽지 않고 필요할 때 한 줄씩 읽어 버퍼에 채우며,
+화면에 보여 줄 때(peek)도 최대 lookahead줄까지만 읽으므로 파일 크기와 상관없이 메모리 사용량이 일정하다.
+스트리밍 중에 뒤에 추가한 명령어는 tail에 두었다가 파일을 다 읽으면 버퍼로 옮긴다.
+"""
+from collections import deque
+from itertools import islice
+from assembler import strip_comment
+
+
+class ReservedQueue:
+    def __init__(self, lookahead=256):
+        self.lookahead = lookahead  # peek()이 미리 읽는 최대 줄 수
+        self.buffer = deque()
+        self.tail = deque()  # 스트리밍 중에 append한 명령어 (파일의 남은 줄 뒤)
+        self.source = None  # 남은 줄을 내주는 iterator (stream한 파일)
+        self.file = None
+
+    def append(self, command):
+        """뒤에 추가. 스트리밍 중이면 파일의 남은 줄 뒤에 오도록 tail에 둔다 (파일은 읽지 않는다)."""
+        if self.source is not None:
+            self.tail.append(command)
+        else:
+            self.buffer.append(command)
+
+    def appendleft(self, command):
+        self.buffer.appendleft(command)
+
+    def popleft(self):
+        """가장 앞의 명령어 (없으면 None)"""
+        if not self.buffer and not self._fill(1):
+            return None
+        return self.buffer.popleft()
+
+    def peek(self, count):
+        """앞에서 count개 (최대 lookahead개)를 꺼내지 않고 리스트로"""
+        count = min(count, self.lookahead)
+        self._fill(count)
+        return list(islice(self.buffer, count))
+
+    def stream(self, path):
+        """path의 명령어 줄(빈 줄, 주석 제외)을 뒤에 이어 붙인다. 실제로는 필요할 때 읽는다."""
+        self._drain()
+        self.file = open(path, "r")
+        self.source = (line for line in map(strip_comment, self.file) if line)
+
+    def reset(self, commands=()):
+        """큐를 commands로 바꾼다 (스트리밍 중인 파일은 닫는다)"""
+        self._close()
+        self.tail.clear()
+        self.buffer = deque(commands)
+
+    def clear(self):
+        self.reset()
+
+    def _fill(self, count):
+        """버퍼에 count개가 있도록 source에서 읽는다. 채웠으면 True"""
+        source = self.source
+        while len(self.buffer) < count and source is not None:
+            line = next(source, None)
+            if line is None:
+                self._close()
+                self._take_tail()
+                break
+            self.buffer.append(line)
+        return len(self.buffer) >= count
+
+    def _drain(self):
+        """스트리밍 중인 파일의 남은 줄과 tail을 모두 버퍼로 옮긴다"""
+        if self.source is not None:
+            self.buffer.extend(self.source)
+            self._close()
+        self._take_tail()
+
+    def _take_tail(self):
+        self.buffer.extend(self.tail)
+        self.tail.clear()
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = self.source = None
+
+    def __bool__(self):
+        return bool(self.buffer) or self._fill(1)
+
+    def __len__(self):
+        """버퍼와 tail에 있는 개수 (스트리밍 중인 파일의 남은 줄은 세지 않는다)"""
+        return len(self.buffer) + len(self.tail)
+
+    def __iter__(self):
+        """남은 명령어 전부 (스트리밍 중이면 파일 끝까지 읽는다)"""
+        self._drain()
+        return iter(self.buffer)
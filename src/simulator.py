@@ -1,22 +1,22 @@
-import re
-from instructions.mov import handle_mov
-from instructions.add import handle_add
-from instructions.ldr import handle_ldr
-from instructions.push import handle_push
+from decoder import decode_instruction
+from assembler import CODE_BASE, assemble
+from registers import CPSR, PC, RegisterFile
+from memory import Memory
+from changes import ChangeSet
+from blocks import BlockCache
+from debugger import Debugger
+from interrupts import NO_EVENT, Interrupts
+from devices import Bus
+from profiler import Profiler
+from hoststats import HostStats
+from loader import ImageCode, read_image
+from reserved import ReservedQueue
+from history import History
+import snapshot
 
 class ARMv7Simulator:
     def __init__(self):
-        self.registers = {
-            "com": {"r0": 0, "r1": 0, "r2": 0, "r3": 0, "r4": 0, "r5": 0, "r6": 0, "r7": 0,
-                    "r8": 0, "r9": 0, "r10": 0, "r11": 0, "r12": 0, "pc": 0, "cpsr": 0},
-            "usr/sys": {"sp": 0, "lr": 0, "spsr": 0},
-            "svc": {"sp": 0, "lr": 0, "spsr": 0},
-            "abt": {"sp": 0, "lr": 0, "spsr": 0},
-            "und": {"sp": 0, "lr": 0, "spsr": 0},
-            "irq": {"sp": 0, "lr": 0, "spsr": 0},
-            "mon": {"sp": 0, "lr": 0, "spsr": 0},
-            "fiq": {"r8": 0, "r9": 0, "r10": 0, "r11": 0, "r12": 0, "sp": 0, "lr": 0, "spsr": 0}
-        }
+        self.registers = RegisterFile()
         self.stack = {
             "com": [],
             "usr/sys": [],
@@ -27,22 +27,78 @@ class ARMv7Simulator:
             "mon": [],
             "fiq": []
         }
-        self.memory = {}  # 리스트에서 dict로 변경
+        self.memory = Memory()  # 4 KiB 페이지 단위 바이트 메모리
         self.command_list = [
             "ADD",
             "B",
             "BL",
+            "BX",
+            "CMP",
             "LDR",
             "MOV",
             "NOP",
             "STR",
             "SUB",
             "PUSH",
+            "POP",
+            "MRS",
+            "MSR",
+            "CPS",
+            "SVC",
+            "run",
+            "break",
+            "watch",
+            "delete",
+            "profile",
+            "stats",
+            "save",
+            "load",
+            "devices",
+            "uart",
+            "timer",
+            "irq",
+            "fiq",
+            "back",
+            "rback",
             "q",
         ]
-        self.history = []  # 명령어 히스토리 추가
-        self.reserved = []  # break 이후 명령어 저장
+        self.history = History()  # TUI 입력 히스토리 (메모리 링 버퍼, main에서 파일에 연결)
+        self.reserved = ReservedQueue()  # 코드가 끝난 뒤 실행할 명령어 (deque, 파일은 필요할 때 읽는다)
         self.labels = {}  # label 주소
+        self.decode_cache = {}  # 소스 줄 -> DecodedInstruction
+        self.changes = None  # 기록 중인 ChangeSet
+        self.code = {}  # 주소 -> DecodedInstruction (pc로 fetch)
+        self.blocks = BlockCache(self)
+        self.steps = 0  # step()/run()으로 실행한 명령어 수
+        self.block_start = None  # 실행 중인 블록의 시작 주소 (블록 안에서는 steps가 블록 끝에 갱신된다, Bus.now)
+        self.breakpoints = set()  # run()이 멈출 주소 (Debugger가 관리)
+        self.debugger = Debugger(self)  # breakpoint / watchpoint
+        self.halt = None  # run()을 멈추게 한 Breakpoint/Watchpoint
+        self.next_event = NO_EVENT  # 이 명령어 수에 닿으면 interrupts.service() 호출
+        self.interrupts = Interrupts(self)  # IRQ/FIQ 라인, 주기 타이머
+        self.bus = Bus(self)  # MMIO 장치 (bus.attach_defaults()로 타이머/인터럽트 컨트롤러/UART)
+        self.profiler = Profiler(self)  # enable()하기 전에는 실행 경로에 끼어들지 않는다
+        self.hoststats = HostStats(self)  # 시뮬레이터 자체의 호스트 CPU 사용 계측
+
+    def reset(self):
+        """
+        새 인스턴스를 만들지 않고 초기 상태로 되돌립니다 (회귀 테스트에서 재사용).
+        해석 캐시와, 같은 Program을 다시 올릴 때 쓸 수 있는 블록 캐시는 유지합니다.
+        """
+        self.registers.reset()
+        self.memory.clear()
+        for entries in self.stack.values():
+            entries.clear()
+        self.history.clear()
+        self.reserved.clear()
+        self.labels.clear()
+        self.changes = None
+        self.steps = 0
+        self.debugger.clear()
+        self.interrupts.reset()
+        self.bus.reset()
+        self.profiler.reset()
+        self.halt = None
 
     def add_reserved(self, instruction):
         self.reserved.append(instruction)
@@ -50,52 +106,210 @@ class ARMv7Simulator:
     def get_reserved(self):
         return self.reserved
 
+    def stream_reserved(self, path):
+        """path의 명령어 줄들을 reserved 큐 뒤에 건다. 파일은 한꺼번에 읽지 않고 실행/표시할 만큼만 읽는다."""
+        self.reserved.stream(path)
+
     def pop_reserved(self):
         """
-        reserved 리스트에서 가장 앞의 명령어를 꺼내 반환합니다.
+        reserved 큐에서 가장 앞의 명령어를 꺼내 반환합니다 (O(1)).
         명령어가 없으면 None을 반환합니다.
         """
-        if self.reserved:
-            return self.reserved.pop(0)
-        return None
+        return self.reserved.popleft()
+
+    def begin_changes(self):
+        """이후의 레지스터/메모리/스택 쓰기를 새 ChangeSet에 기록하기 시작합니다."""
+        changes = ChangeSet()
+        self.changes = self.registers.changes = self.memory.changes = changes
+        return changes
+
+    def end_changes(self):
+        """기록을 멈추고 모은 ChangeSet을 반환합니다. 지연된 플래그는 여기서 CPSR에 반영합니다."""
+        self.registers.flush_flags()
+        changes = self.changes
+        self.changes = self.registers.changes = self.memory.changes = None
+        return changes
 
     def add_label(self, name, addr):
         """label 변수 등록 (예: add_labels('curr_pcb', 0x1000))"""
+        if self.changes is not None and name not in self.changes.labels:
+            self.changes.labels[name] = self.labels.get(name)
         self.labels[name] = addr
 
+    def invalidate_code(self, addr, size):
+        """훅을 거치지 않고 [addr, addr+size)를 바꿨을 때 (되돌리기) 그 범위에서 해석해 둔 명령어와 블록을 버립니다."""
+        if isinstance(self.code, ImageCode):
+            self.code.invalidate_range(addr, size)
+        self.blocks.invalidate_range(addr, size)
+
+    def capture_state(self):
+        """레지스터/메모리 페이지/스택/라벨 전체를 복사해 반환 (체크포인트용)"""
+        self.registers.flush_flags()
+        return {
+            "registers": self.registers.slots[:],
+            "pages": {pn: bytes(page) for pn, page in self.memory.pages.items()},
+            "stack": {mode: list(entries) for mode, entries in self.stack.items()},
+            "labels": dict(self.labels),
+            "steps": self.steps,
+            "interrupts": self.interrupts.capture(),
+            "devices": self.bus.dump(),
+        }
+
+    def restore_state(self, state):
+        """capture_state()로 만든 상태로 되돌립니다."""
+        registers = self.registers
+        registers.slots[:] = state["registers"]
+        registers.flag_kind = None
+        registers.switch_mode(registers.read(CPSR) & 0x1F)
+        self.memory.pages = {pn: bytearray(page) for pn, page in state["pages"].items()}
+        if isinstance(self.code, ImageCode):
+            self.code.invalidate()  # 메모리에서 해석한 명령어는 복원한 페이지에서 다시 해석한다
+            self.blocks.clear()
+        for mode, entries in state["stack"].items():
+            self.stack[mode][:] = entries
+        self.labels = dict(state["labels"])
+        self.steps = state["steps"]
+        self.interrupts.restore(state["interrupts"])
+        self.bus.load(state["devices"])
+
+    def save_state(self, path, compression=None):
+        """
+        레지스터 파일/메모리 페이지/스택/라벨/reserved 명령어/인터럽트/장치 상태를 바이너리 스냅샷 파일로 저장합니다.
+        compression: None, "zlib", "lzma". 저장한 페이지 수를 반환합니다.
+        """
+        return snapshot.save(self, path, compression)
+
+    def load_state(self, path):
+        """
+        save_state()로 저장한 파일을 불러옵니다. 코드 이미지는 저장되지 않으므로 같은 프로그램이 올라와 있어야 합니다.
+        압축하지 않은 파일은 mmap으로 열어 페이지를 복사하지 않습니다. 불러온 페이지 수를 반환합니다.
+        """
+        return snapshot.load(self, path)
+
     def get_label(self, name):
         """label 변수 주소 반환"""
         return self.labels.get(name)
 
+    def decode(self, instruction):
+        """소스 한 줄을 해석합니다. 같은 줄은 한 번만 해석하고 캐시를 재사용합니다."""
+        decoded = self.decode_cache.get(instruction)
+        if decoded is None:
+            decoded = decode_instruction(self, instruction)
+            if decoded is not None:
+                self.decode_cache[instruction] = decoded
+        return decoded
+
+    def execute(self, decoded):
+        decoded.handler(self, *decoded.args)
+
     def parse_and_execute(self, instruction):
-        self.history.append(instruction)
-        tokens = instruction.strip().replace(',', '').split()
-        if not tokens:
+        decoded = self.decode(instruction)
+        if decoded is None:
             return
+        decoded.handler(self, *decoded.args)
 
-        if tokens[0].lower() == ".extern":
-            # extern 라벨 선언 처리 (.extern label @@ 0xADDR)
-            name = tokens[1]
-            addr = 0
-            for i, t in enumerate(tokens):
-                if t == "@@":
-                    # 다음 토큰이 주소임
-                    if i + 1 < len(tokens) and tokens[i + 1].startswith("0x"):
-                        addr = int(tokens[i + 1], 16)
-            self.add_label(name, addr)
-            return
+    def load_program(self, program):
+        """어셈블된 Program을 올립니다: 코드 이미지, 데이터, 심볼, '@@ break' 주소, pc=entry"""
+        if program.code is not self.code:
+            self.code = program.code
+            self.blocks.clear()
+        for addr, data in program.data:
+            self.memory.load(addr, data)
+        self.labels.update(program.symbols)
+        self.debugger.clear_breakpoints()
+        for addr in program.breakpoints:
+            self.debugger.add_breakpoint(addr)
+        self.registers.write(PC, program.entry)
+
+    def load_image(self, path, base=CODE_BASE):
+        """
+        ELF32 실행 파일이나 raw 바이너리(.bin)를 올립니다 (기계어 모드): 세그먼트, 심볼, pc=진입점.
+        raw 이미지는 base에 올리고 base부터 실행합니다. 명령어는 pc로 처음 fetch할 때 해석합니다 (loader.py).
+        """
+        image = read_image(path, base)
+        for addr, data in image.data:
+            self.memory.load(addr, data)
+        self.code = ImageCode(self.memory, image.ranges)
+        self.blocks.clear()
+        self.labels.update(image.symbols)
+        self.debugger.clear_breakpoints()
+        self.registers.write(PC, image.entry)
+
+    def load_code(self, lines, base=CODE_BASE):
+        """소스 줄들을 어셈블해서 base부터 올립니다."""
+        self.load_program(assemble(lines, base))
+
+    def has_pending(self):
+        """다음에 실행할 명령어(pc 위치의 코드 또는 reserved 명령어)가 있는지"""
+        return self.registers.read(PC) in self.code or bool(self.reserved)
+
+    def upcoming(self, count):
+        """pc부터 순서대로 count개의 명령어 소스 (코드가 끝나면 reserved 명령어)"""
+        out = []
+        pc = self.registers.read(PC)
+        while pc in self.code and len(out) < count:
+            out.append(self.code[pc].text)
+            pc += 4
+        if len(out) < count:
+            out.extend(self.reserved.peek(count - len(out)))  # lookahead 창만 읽는다
+        return out
 
-        op = tokens[0].upper()
-        if op == "MOV":
-            handle_mov(self, tokens)
-        elif op == "ADD":
-            handle_add(self, tokens)
-        elif op == "LDR" and len(tokens) == 3 and tokens[2].startswith('='):
-            handle_ldr(self, tokens)
-        elif op == "PUSH":
-            handle_push(self, tokens)
-        else:
-            raise Exception(f"Unsupported instruction: {instruction}")
+    def step(self):
+        """pc 위치의 명령어 하나를 실행합니다."""
+        pc = self.registers.read(PC)
+        decoded = self.code.get(pc)
+        if decoded is None:
+            raise Exception(f"No instruction at 0x{pc:08X}")
+        self.registers.write(PC, pc + 4)
+        decoded.handler(self, *decoded.args)
+        self.steps += 1
+        if self.steps >= self.next_event:
+            self.interrupts.service()
+
+    def run(self, max_steps=None, blocks=True):
+        """
+        pc가 코드 밖으로 나가거나, breakpoint/watchpoint에 걸리거나, max_steps개를 실행할 때까지 실행하고 실행한 명령어 수를 반환합니다.
+        breakpoint/watchpoint에 걸려 멈췄으면 self.halt에 그 객체가 남습니다.
+        blocks=False이면 블록 캐시 없이 한 명령어씩 실행합니다 (디버깅용).
+        블록은 다음 인터럽트 이벤트(next_event)를 넘지 않을 때만 통째로 실행하고, 넘으면 한 명령어씩 실행합니다.
+        """
+        code = self.code
+        slots = self.registers.slots
+        get_block = self.blocks.get
+        breakpoints = self.breakpoints
+        check = self.debugger.check
+        start_steps = self.steps
+        self.halt = None
+        while self.halt is None:
+            if self.steps >= self.next_event:
+                self.interrupts.service()
+            budget = self.next_event - self.steps
+            if max_steps is not None:
+                remaining = max_steps - (self.steps - start_steps)
+                if remaining <= 0:
+                    break
+                budget = min(budget, remaining)
+            pc = slots[PC]
+            if pc not in code:
+                break
+            # breakpoint에서 시작했으면 그 명령어부터 이어서 실행
+            if pc in breakpoints and self.steps != start_steps and check(pc):
+                break
+            if blocks:
+                block = get_block(pc)
+                if block.count <= budget:
+                    self.block_start = pc
+                    try:
+                        self.steps += block.run(self)
+                    except Exception:
+                        # 블록 중간에서 실패: pc는 실패한 명령어 다음 주소
+                        self.steps += (slots[PC] - pc) // 4 - 1
+                        raise
+                    finally:
+                        self.block_start = None
+                    continue
+            self.step()
+        return self.steps - start_steps
 
     def get_registers(self):
         return self.registers
@@ -111,6 +325,5 @@ class ARMv7Simulator:
 
     def visualize(self):
         # 메모리의 전체 주소를 정렬해서 반환
-        mem_keys = sorted(self.memory.keys())
-        mem_view = [self.memory.get(addr, 0) for addr in mem_keys]
+        mem_view = [value for _, value in self.memory.items()]
         return self.get_registers(), mem_view
\ No newline at end of file
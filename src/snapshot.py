@@ -0,0 +1,188 @@
+"""
+머신 상태 스냅샷 파일 (save_state / load_state).
+
+파일 구조 (little-endian):
+    header : b"ARMS" + version(u8) + compression(u8) + reserved(u16) + nslots(u32) + meta_len(u32) + npages(u32)
+    slots  : nslots x u32 (레지스터 파일 array 그대로, CPSR/SPSR/뱅크 포함)
+    meta   : JSON (utf-8) — 스택 뷰, 라벨, reserved 명령어 (스트리밍 중인 파일의 남은 줄 포함), steps, 인터럽트, 장치, 코드 체크섬
+    index  : npages x [pn(u32) offset(u64) length(u32)]
+    pages  : 쓰인 적 있는(0이 아닌) 페이지만. 압축하지 않으면 PAGE_SIZE 정렬된 원본 블록,
+             압축하면 페이지마다 따로 압축한 블록
+
+압축하지 않은 파일은 mmap(ACCESS_COPY)으로 열고 페이지를 그 위의 memoryview로 만들기 때문에
+읽어 들일 때 페이지 내용을 복사하지 않는다 (쓰는 페이지만 OS가 copy-on-write로 복사).
+코드 이미지는 저장하지 않는다. 같은 프로그램을 올린 뒤에 불러와야 하며, 체크섬이 다르면 거부한다.
+(기계어 이미지는 코드가 메모리에 있으므로 페이지와 함께 저장된다.)
+
+    python src/snapshot.py info state.bin
+"""
+import argparse
+import json
+import lzma
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from loader import ImageCode
+from memory import PAGE_SHIFT, PAGE_SIZE
+from registers import CPSR
+
+MAGIC = b"ARMS"
+VERSION = 1
+COMPRESSION = {None: 0, "none": 0, "zlib": 1, "lzma": 2}
+
+_HEADER = struct.Struct("<4sBBHIII")
+_INDEX = struct.Struct("<IQI")
+_ZERO_PAGE = bytes(PAGE_SIZE)
+
+
+def _compress(kind, data):
+    if kind == 1:
+        return zlib.compress(data)
+    if kind == 2:
+        return lzma.compress(data)
+    return data
+
+
+def _decompress(kind, data):
+    if kind == 1:
+        return zlib.decompress(data)
+    return lzma.decompress(data)
+
+
+def code_checksum(code):
+    """코드 이미지(주소 -> 명령어 소스)의 crc32. 기계어 이미지는 코드가 메모리 페이지에 같이 저장되므로 코드 영역만 비교한다"""
+    if isinstance(code, ImageCode):
+        return code.checksum()
+    crc = 0
+    for addr in sorted(code):
+        crc = zlib.crc32(f"{addr:X}:{code[addr].text}\n".encode(), crc)
+    return crc
+
+
+def save(sim, path, compression=None):
+    """sim 상태를 path에 저장하고 기록한 페이지 수를 반환. 임시 파일에 쓴 뒤 교체한다."""
+    if compression not in COMPRESSION:
+        raise Exception(f"Unknown snapshot compression: {compression}")
+    kind = COMPRESSION[compression]
+    sim.registers.flush_flags()
+    slots = sim.registers.slots
+    meta = json.dumps({
+        "stack": {mode: entries for mode, entries in sim.stack.items()},
+        "labels": sim.labels,
+        "reserved": list(sim.reserved),
+        "steps": sim.steps,
+        "interrupts": sim.interrupts.dump(),
+        "devices": sim.bus.dump(),
+        "code": code_checksum(sim.code),
+    }).encode()
+    meta = _compress(kind, meta)
+
+    pages = [(pn, page) for pn, page in sorted(sim.memory.pages.items()) if page != _ZERO_PAGE]
+    if kind:
+        pages = [(pn, _compress(kind, page)) for pn, page in pages]
+    offset = _HEADER.size + 4 * len(slots) + len(meta) + _INDEX.size * len(pages)
+    if not kind:
+        offset = (offset + PAGE_SIZE - 1) & ~(PAGE_SIZE - 1)  # 원본 페이지는 mmap 페이지 경계에 맞춘다
+    index = bytearray()
+    for pn, data in pages:
+        index += _INDEX.pack(pn, offset, len(data))
+        offset += len(data)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, kind, 0, len(slots), len(meta), len(pages)))
+        f.write(struct.pack(f"<{len(slots)}I", *slots))
+        f.write(meta)
+        f.write(index)
+        if pages and not kind:
+            f.seek(_INDEX.unpack_from(index, 0)[1])
+        for _, data in pages:
+            f.write(data)
+    # 불러온 스냅샷 파일 위에 다시 저장해도 기존 mmap 페이지가 깨지지 않도록 이름만 바꿔 끼운다
+    os.replace(tmp, path)
+    return len(pages)
+
+
+def read_header(buf):
+    magic, version, kind, _, nslots, meta_len, npages = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise Exception("Not a snapshot file")
+    if version != VERSION:
+        raise Exception(f"Unsupported snapshot version: {version}")
+    return kind, nslots, meta_len, npages
+
+
+def load(sim, path):
+    """path의 스냅샷으로 sim 상태를 바꾼다. 불러온 페이지 수를 반환"""
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(buf)
+    kind, nslots, meta_len, npages = read_header(view)
+    registers = sim.registers
+    if nslots != len(registers.slots):
+        raise Exception(f"Snapshot has {nslots} register slots, expected {len(registers.slots)}")
+    pos = _HEADER.size
+    slots = struct.unpack_from(f"<{nslots}I", view, pos)
+    pos += 4 * nslots
+    meta = view[pos:pos + meta_len]
+    meta = json.loads(bytes(meta) if not kind else _decompress(kind, meta))
+    pos += meta_len
+    if meta["code"] != code_checksum(sim.code):
+        raise Exception("Snapshot was saved with a different program loaded")
+
+    pages = {}
+    for pn, offset, length in _INDEX.iter_unpack(view[pos:pos + _INDEX.size * npages]):
+        data = view[offset:offset + length]
+        pages[pn] = data if not kind else bytearray(_decompress(kind, data))
+
+    registers.slots[:] = array('I', slots)
+    registers.flag_kind = None
+    registers.switch_mode(registers.read(CPSR) & 0x1F)
+    sim.memory.pages = pages
+    if isinstance(sim.code, ImageCode):
+        sim.code.invalidate()  # 메모리에서 해석한 명령어는 새 페이지에서 다시 해석한다
+        sim.blocks.clear()
+    for mode, entries in sim.stack.items():
+        entries[:] = [tuple(entry) for entry in meta["stack"].get(mode, [])]
+    sim.labels = meta["labels"]
+    sim.reserved.reset(meta["reserved"])
+    sim.steps = meta["steps"]
+    sim.changes = registers.changes = sim.memory.changes = None
+    sim.halt = None
+    sim.interrupts.load(meta["interrupts"])
+    sim.bus.load(meta.get("devices", {}))
+    return npages
+
+
+def info(path):
+    """헤더와 페이지 목록 요약 (텍스트 줄 리스트)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    kind, nslots, meta_len, npages = read_header(data)
+    name = {v: k for k, v in COMPRESSION.items() if k}[kind] if kind else "none"
+    pos = _HEADER.size + 4 * nslots
+    meta = data[pos:pos + meta_len]
+    meta = json.loads(meta if not kind else _decompress(kind, meta))
+    pos += meta_len
+    lines = [f"version {VERSION}, compression {name}, {nslots} register slots, {meta['steps']} steps",
+             f"{len(meta['labels'])} labels, {len(meta['reserved'])} reserved, {npages} pages ({npages * PAGE_SIZE} bytes)"]
+    for pn, offset, length in _INDEX.iter_unpack(data[pos:pos + _INDEX.size * npages]):
+        lines.append(f"  0x{pn << PAGE_SHIFT:08X} @{offset} {length} bytes")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="inspect a machine state snapshot")
+    parser.add_argument("command", choices=["info"])
+    parser.add_argument("path")
+    args = parser.parse_args(argv)
+    for line in info(args.path):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+from collections import deque
+from registers import PC
+
+
+class StepRecord:
+    """
+    실행 기록 하나: 소스, 되돌리기용 ChangeSet, reserved 큐에서 꺼냈는지 여부,
+    pc 위치의 코드를 fetch해서 실행했는지 여부.
+    free-run(run)은 체크포인트 사이를 넘지 않도록 나눈 기록들로 남고, count에 실행한 명령어 수, faulted에 예외로 끝났는지를 둔다.
+    steps는 실행 전의 sim.steps (되돌릴 때 타이머 시점을 맞추는 데 쓴다).
+    """
+    __slots__ = ("command", "changes", "from_reserved", "fetched", "count", "faulted", "steps")
+
+    def __init__(self, command, changes, from_reserved, fetched=False, steps=0):
+        self.command = command
+        self.changes = changes
+        self.from_reserved = from_reserved
+        self.fetched = fetched
+        self.count = None
+        self.faulted = False
+        self.steps = steps
+
+    def instructions(self):
+        return 1 if self.count is None else self.count
+
+
+class TimeMachine:
+    """
+    역방향 실행 (step back / run back).
+
+    interval 명령어마다 전체 상태 체크포인트를 찍고, 그 사이에는 기록별 ChangeSet(undo delta)만 남긴다.
+    체크포인트는 최대 max_checkpoints개까지 링으로 보관하며, 가장 오래된 체크포인트 이전의 기록은 버린다.
+    free-run 기록은 다음 체크포인트에서 끊기므로 기록 하나가 interval개를 넘지 않는다.
+    기록 경계까지 interval개 이하로 되돌릴 때는 delta를 역순으로 적용하고, 더 멀리 또는 기록 중간까지 되돌릴 때는
+    target 직전 체크포인트를 복원한 뒤 최대 interval개만 다시 실행하므로 비용이 거리와 무관하게 제한된다.
+    """
+
+    def __init__(self, sim, interval=1000, max_checkpoints=16):
+        self.sim = sim
+        self.interval = interval
+        self.checkpoints = deque(maxlen=max_checkpoints)  # (step, state)
+        self.log = deque()  # StepRecord, log[0]은 log_base 번째 명령어부터
+        self.log_base = 0
+        self.step = 0  # 지금까지 실행한 명령어 수
+
+    def execute(self, command, from_reserved=False):
+        """명령어를 실행하고 ChangeSet을 반환합니다. 실행 중 예외는 기록 후 그대로 전달합니다."""
+        return self._record(lambda: self.sim.parse_and_execute(command), command, from_reserved, False).changes
+
+    def step_forward(self):
+        """pc 위치의 명령어 하나를 실행 (sim.step)하고 ChangeSet을 반환합니다."""
+        sim = self.sim
+        decoded = sim.code.get(sim.registers.read(PC))
+        command = decoded.text if decoded is not None else None
+        return self._record(sim.step, command, False, True).changes
+
+    def run(self, max_steps=None, blocks=True, resume=True, on_record=None):
+        """
+        sim.run()을 실행하며 기록하고 실행한 명령어 수를 반환합니다.
+        기록은 다음 체크포인트까지만 이어지도록 나누므로, 되돌릴 때 한 번에 되돌리는 양과 다시 실행하는 양이 제한된다.
+        resume=False이면 시작 pc의 breakpoint에서도 멈춥니다 (덩어리로 나눠 이어 실행할 때).
+        on_record(record)는 기록이 하나 끝날 때마다 (예외로 끝나도) 호출됩니다.
+        """
+        sim = self.sim
+        registers = sim.registers
+        if not resume and registers.read(PC) in sim.breakpoints and sim.debugger.check(registers.read(PC)):
+            return 0
+        executed = 0
+        while True:
+            self._maybe_checkpoint()
+            budget = self.interval - (self.step - self.checkpoints[-1][0])
+            if max_steps is not None:
+                budget = min(budget, max_steps - executed)
+            try:
+                record = self._record(lambda: self._run(budget, blocks), None, False, True, True)
+            finally:
+                if on_record is not None:
+                    on_record(self.log[-1])
+            executed += record.count
+            if sim.halt is not None or record.count < budget or (max_steps is not None and executed >= max_steps):
+                break
+            pc = registers.read(PC)
+            if pc not in sim.code:
+                break
+            # 기록 경계에 걸린 breakpoint (sim.run은 시작 pc의 breakpoint를 건너뛴다)
+            if pc in sim.breakpoints and sim.debugger.check(pc):
+                break
+        return executed
+
+    def _run(self, count, blocks=True):
+        sim = self.sim
+        registers = sim.registers
+        # 블록은 pc를 슬롯에 직접 쓰므로 시작 pc를 먼저 ChangeSet에 남긴다
+        registers.write(PC, registers.read(PC))
+        sim.run(count, blocks)
+
+    def _record(self, run, command, from_reserved, fetched, counted=False):
+        sim = self.sim
+        self._maybe_checkpoint()
+        steps = sim.steps
+        record = StepRecord(command, sim.begin_changes(), from_reserved, fetched, steps)
+        try:
+            run()
+        except Exception:
+            record.faulted = True
+            raise
+        finally:
+            sim.end_changes()
+            if counted:
+                record.count = sim.steps - steps
+                record.command = f"run {record.count}"
+            self.log.append(record)
+            self.step += record.instructions()
+        return record
+
+    def _maybe_checkpoint(self):
+        if not self.checkpoints or self.step - self.checkpoints[-1][0] >= self.interval:
+            self._checkpoint()
+
+    def _checkpoint(self):
+        if self.checkpoints and self.checkpoints[-1][0] == self.step:
+            return
+        self.checkpoints.append((self.step, self.sim.capture_state()))
+        # 가장 오래된 체크포인트 이전 기록은 더 이상 되돌릴 수 없으므로 버린다 (기록은 체크포인트에 걸치지 않는다)
+        oldest = self.checkpoints[0][0]
+        while self.log and self.log_base < oldest:
+            self.log_base += self.log.popleft().instructions()
+
+    def oldest_step(self):
+        return self.checkpoints[0][0] if self.checkpoints else self.step
+
+    def step_back(self, count=1):
+        """
+        명령어 count개만큼 되돌리고 되돌린 (StepRecord) 리스트를 반환합니다.
+        free-run 기록의 중간까지 되돌리면 그 기록의 앞부분은 다시 실행해 새 기록으로 남기고,
+        리스트에는 되돌린 뒷부분만큼 count를 줄인 기록을 넣습니다.
+        reserved 큐에서 나온 명령어는 다시 reserved 큐 앞에 넣습니다.
+        """
+        target = max(self.step - count, self.oldest_step())
+        if target >= self.step:
+            return []
+        return self._back(target)
+
+    def _back(self, target, records=0):
+        """target 번째 명령어 직후 상태로 되돌린다 (적어도 records개의 기록은 되돌린다)"""
+        sim = self.sim
+        log = self.log
+        undone = []
+        start = self.step
+        i = len(log)
+        while start > target or len(undone) < records:
+            i -= 1
+            record = log[i]
+            start -= record.instructions()
+            undone.append(record)
+        undone.reverse()
+        prefix = target - start  # 남겨야 하는 undone[0]의 앞부분 명령어 수
+
+        kept = None
+        if not prefix and self.step - target <= self.interval:
+            for record in reversed(undone):
+                record.changes.revert(sim)
+            sim.steps = undone[0].steps
+            sim.interrupts.reschedule()
+        else:
+            # 체크포인트 복원 후 target까지 다시 실행 (기록은 체크포인트에 걸치지 않으므로 start 이전 체크포인트)
+            for base_step, state in reversed(self.checkpoints):
+                if base_step <= start:
+                    break
+            sim.restore_state(state)
+            replay = []
+            while start > base_step:
+                i -= 1
+                start -= log[i].instructions()
+                replay.append(log[i])
+            for record in reversed(replay):
+                self._replay(record, record.instructions())
+            if prefix:
+                first = undone[0]
+                kept = StepRecord(None, sim.begin_changes(), False, True, first.steps)
+                try:
+                    self._replay(first, prefix)
+                finally:
+                    sim.end_changes()
+                kept.count = prefix
+                kept.command = f"run {prefix}"
+                # 되돌린 뒷부분 (ChangeSet은 하이라이트용으로 원래 기록의 것을 쓴다)
+                tail = StepRecord(f"run {first.count - prefix}", first.changes, False, True, sim.steps)
+                tail.count = first.count - prefix
+                tail.faulted = first.faulted
+                undone[0] = tail
+
+        for _ in undone:
+            log.pop()
+        if kept is not None:
+            log.append(kept)
+        while self.checkpoints and self.checkpoints[-1][0] > target:
+            self.checkpoints.pop()
+        self.step = target
+        for record in reversed(undone):
+            if record.from_reserved:
+                sim.reserved.appendleft(record.command)
+        return undone
+
+    def _replay(self, record, count):
+        """기록의 처음 count개 명령어를 다시 실행합니다. 원래 실행에서도 났던 예외는 무시합니다."""
+        sim = self.sim
+        try:
+            if record.count is not None:
+                if count == record.count:
+                    count += record.faulted
+                registers = sim.registers
+                registers.write(PC, registers.read(PC))  # 기록 중이면 시작 pc를 남긴다 (_run)
+                # breakpoint/watchpoint에 멈춰도 이어서 실행
+                while count > 0:
+                    done = sim.run(count)
+                    if not done:
+                        break
+                    count -= done
+            elif record.fetched:
+                sim.step()
+            else:
+                sim.execute(sim.decode(record.command))
+        except Exception:
+            pass  # 원래 실행에서도 같은 예외가 났던 명령어
+
+    def run_back(self, stop):
+        """stop(record)가 참인 기록 직전 상태까지 (또는 기록의 처음까지) 되돌립니다."""
+        undone = []
+        while self.step > self.oldest_step():
+            record = self.log[-1]
+            undone.extend(self._back(self.step - record.instructions(), 1))
+            if stop(record):
+                break
+        return undone
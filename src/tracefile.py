@@ -0,0 +1,232 @@
+"""
+바이너리 실행 트레이스 (TUI 디버그 로그 대체).
+
+파일 구조:
+    header  : b"ARMT" + version(u8) + compression(u8)
+    records : (압축된) 레코드 스트림
+
+레코드 구조 (little-endian):
+    pc(u32) opcode(u8) nregs(u16) nmem(u16) text_len(u16) text
+    nregs x [slot(u8) old(u32) new(u32)]
+    nmem  x [addr(u32) size(u16) old bytes new bytes]
+
+TUI 로그의 pc는 실행한 명령어의 주소(free-run 기록은 시작 pc, opcode 0xFF)이고,
+lockstep 참조('record')의 pc는 실행 후 pc다.
+
+파일이 max_bytes를 넘으면 path.1, path.2 ... 로 이어서 기록합니다.
+
+    python src/tracefile.py dump trace_XXXX.bin
+"""
+import argparse
+import lzma
+import os
+import struct
+import sys
+import zlib
+from registers import SLOT_NAMES
+
+MAGIC = b"ARMT"
+VERSION = 1
+COMPRESSION = {None: 0, "none": 0, "zlib": 1, "lzma": 2}
+
+_FILE_HEADER = struct.Struct("<4sBB")
+_RECORD = struct.Struct("<IBHHH")
+_REG = struct.Struct("<BII")
+_MEM = struct.Struct("<IH")
+
+
+def _compressor(kind):
+    if kind == 1:
+        return zlib.compressobj()
+    if kind == 2:
+        return lzma.LZMACompressor()
+    return None
+
+
+def _decompressor(kind):
+    if kind == 1:
+        return zlib.decompressobj()
+    if kind == 2:
+        return lzma.LZMADecompressor()
+    return None
+
+
+def segment_path(path, index):
+    return path if index == 0 else f"{path}.{index}"
+
+
+class TraceWriter:
+    """
+    레코드를 메모리 버퍼에 모았다가 buffer_size마다 한 번에 씁니다.
+    max_bytes(압축 전 기준)를 넘으면 다음 세그먼트 파일로 넘어갑니다.
+    """
+
+    def __init__(self, path, compression=None, max_bytes=64 << 20, buffer_size=64 << 10):
+        if compression not in COMPRESSION:
+            raise Exception(f"Unknown trace compression: {compression}")
+        self.path = path
+        self.compression = COMPRESSION[compression]
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.segment = 0
+        self.file = None
+        self.compressor = None
+        self.segment_bytes = 0
+        self._open_segment()
+
+    def _open_segment(self):
+        self.file = open(segment_path(self.path, self.segment), "wb")
+        self.file.write(_FILE_HEADER.pack(MAGIC, VERSION, self.compression))
+        self.compressor = _compressor(self.compression)
+        self.segment_bytes = 0
+
+    def _close_segment(self):
+        self._flush_buffer()
+        if self.compressor is not None:
+            self.file.write(self.compressor.flush())
+        self.file.close()
+        self.file = None
+
+    def _flush_buffer(self):
+        if not self.buffer:
+            return
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        self.file.write(data)
+
+    def record(self, sim, pc, opcode, text, changes):
+        """ChangeSet 하나를 레코드로 추가. 이후 값은 현재 시뮬레이터 상태에서 읽는다."""
+        text_bytes = text.encode("utf-8")[:0xFFFF]
+        slots = sim.registers.slots
+        buf = self.buffer
+        start = len(buf)
+        buf += _RECORD.pack(pc, opcode, len(changes.registers), len(changes.memory), len(text_bytes))
+        buf += text_bytes
+        for slot, old in changes.registers.items():
+            buf += _REG.pack(slot, old, slots[slot])
+        read_block = sim.memory.read_block
+        for addr, old in changes.memory:
+            buf += _MEM.pack(addr, len(old))
+            buf += old
+            buf += read_block(addr, len(old))
+        self.segment_bytes += len(buf) - start
+        if len(buf) >= self.buffer_size:
+            self._flush_buffer()
+        if self.segment_bytes >= self.max_bytes:
+            self._close_segment()
+            self.segment += 1
+            self._open_segment()
+
+    def flush(self):
+        self._flush_buffer()
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self._close_segment()
+
+
+class TraceRecord:
+    __slots__ = ("pc", "opcode", "text", "registers", "memory")
+
+    def __init__(self, pc, opcode, text, registers, memory):
+        self.pc = pc
+        self.opcode = opcode
+        self.text = text
+        self.registers = registers  # [(slot, old, new)]
+        self.memory = memory  # [(addr, old bytes, new bytes)]
+
+
+def _read_segment(path, chunk_size=1 << 20):
+    """세그먼트 파일 하나를 압축 해제하면서 바이트 청크 단위로 돌려준다."""
+    with open(path, "rb") as f:
+        magic, version, compression = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f"Not a trace file: {path}")
+        decompressor = _decompressor(compression)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield decompressor.decompress(chunk) if decompressor is not None else chunk
+
+
+def read_trace(path, chunk_size=1 << 20):
+    """
+    path, path.1, ... 세그먼트를 순서대로 읽어 TraceRecord를 하나씩 돌려준다.
+    파일을 chunk_size(압축된 크기) 단위로 읽으므로 압축을 푼 버퍼는 그 수십 배까지 커질 수 있다.
+    """
+    index = 0
+    while os.path.exists(segment_path(path, index)):
+        data = bytearray()
+        pos = 0
+        for chunk in _read_segment(segment_path(path, index), chunk_size):
+            data += chunk
+            while True:
+                record, end = _parse_record(data, pos)
+                if record is None:
+                    break
+                yield record
+                pos = end
+            del data[:pos]
+            pos = 0
+        index += 1
+
+
+def _parse_record(data, pos):
+    """data[pos:]에서 레코드 하나를 파싱. 데이터가 모자라면 (None, pos)"""
+    if len(data) - pos < _RECORD.size:
+        return None, pos
+    pc, opcode, nregs, nmem, text_len = _RECORD.unpack_from(data, pos)
+    p = pos + _RECORD.size
+    if len(data) - p < text_len + nregs * _REG.size:
+        return None, pos
+    text = bytes(data[p:p + text_len]).decode("utf-8")
+    p += text_len
+    registers = []
+    for _ in range(nregs):
+        registers.append(_REG.unpack_from(data, p))
+        p += _REG.size
+    memory = []
+    for _ in range(nmem):
+        if len(data) - p < _MEM.size:
+            return None, pos
+        addr, size = _MEM.unpack_from(data, p)
+        p += _MEM.size
+        if len(data) - p < size * 2:
+            return None, pos
+        memory.append((addr, bytes(data[p:p + size]), bytes(data[p + size:p + size * 2])))
+        p += size * 2
+    return TraceRecord(pc, opcode, text, registers, memory), p
+
+
+def format_record(record, out):
+    """예전 debug_log 텍스트와 같은 형태로 레코드를 출력"""
+    out.write(f"\n=== Command: {record.text} (pc=0x{record.pc:08X}) ===\n")
+    out.write("Registers:\n")
+    for slot, old, new in record.registers:
+        mode, name = SLOT_NAMES[slot]
+        out.write(f"  <{mode}> {name}: 0x{old:08X} -> 0x{new:08X}\n")
+    out.write("Memory:\n")
+    for addr, old, new in record.memory:
+        out.write(f"  {addr:08X}: {old[::-1].hex().upper()} -> {new[::-1].hex().upper()}\n")
+    out.write("="*40 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ARMv7 simulator trace tool")
+    sub = parser.add_subparsers(dest="command", required=True)
+    dump = sub.add_parser("dump", help="render a binary trace as text")
+    dump.add_argument("path")
+    args = parser.parse_args()
+    if args.command == "dump":
+        for record in read_trace(args.path):
+            format_record(record, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
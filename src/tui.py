@@ -1,8 +1,18 @@
+import bisect
 import curses
 import datetime
+import time
+from registers import PC, REG_INDEX, SLOT_NAMES
+from tracefile import TraceWriter
+from timetravel import TimeMachine
+
+PANES = ("registers", "stack", "memory", "commands", "reserved")
+# 'stats on'일 때 시간을 재는 TUI 메서드
+TIMED_METHODS = ("render", "draw_registers", "draw_stack", "draw_memory", "draw_commands", "draw_reserved", "log_debug_info")
+
 
 class TUI:
-    def __init__(self, simulator):
+    def __init__(self, simulator, trace_compression="zlib"):
         self.simulator = simulator
         self.last_message = ""
         self.exit = False
@@ -12,125 +22,416 @@ class TUI:
         self.highlight_stack = set()
         self.highlight_color_pair = 2  # 항상 초록색 사용
         self.mem_scroll = 0  # 메모리 스크롤 오프셋(라인 단위)
-        # --- 디버깅 로그 파일 열기 ---
-        self.debug_log = open(f"debug_log_{now}.txt", "w", encoding="utf-8")
-
-    def log_debug_info(self, command, before_regs, after_regs, before_mem, after_mem, before_stack, after_stack):
-        self.debug_log.write(f"\n=== Command: {command} ===\n")
-        self.debug_log.write("Registers (before):\n")
-        for mode, regs in before_regs.items():
-            self.debug_log.write(f"  <{mode}> {regs}\n")
-        self.debug_log.write("Registers (after):\n")
-        for mode, regs in after_regs.items():
-            self.debug_log.write(f"  <{mode}> {regs}\n")
-        self.debug_log.write("Memory (before):\n")
-        for addr in sorted(before_mem.keys()):
-            self.debug_log.write(f"  {addr:08X}: {before_mem[addr]:08X}\n")
-        self.debug_log.write("Memory (after):\n")
-        for addr in sorted(after_mem.keys()):
-            self.debug_log.write(f"  {addr:08X}: {after_mem[addr]:08X}\n")
-        self.debug_log.write("Stack (before):\n")
-        for mode, stack in before_stack.items():
-            self.debug_log.write(f"  <{mode}> {stack}\n")
-        self.debug_log.write("Stack (after):\n")
-        for mode, stack in after_stack.items():
-            self.debug_log.write(f"  <{mode}> {stack}\n")
-        self.debug_log.write("="*40 + "\n")
-        self.debug_log.flush()
-
-    def set_highlight(self, before, after, kind):
-        changed = set()
-        if kind == "registers":
-            for mode in after:
-                for reg in after[mode]:
-                    if mode not in before or reg not in before[mode] or before[mode][reg] != after[mode][reg]:
-                        changed.add((mode, reg))
-            self.highlight_registers = changed
-        elif kind == "memory":
-            for i, (b, a) in enumerate(zip(before, after)):
-                if b != a:
-                    self.highlight_memory.add(i)
-        elif kind == "stack":
-            for mode in after:
-                if mode not in before or before[mode] != after[mode]:
-                    self.highlight_stack.add(mode)
+        self.mem_index = None  # 메모리 pane에 보여줄 워드 주소 (정렬 유지)
+        self.mem_index_set = set()
+        self.windows = None  # create_windows()에서 한 번 만들고 재사용
+        self.mem_win_rect = (0, 0, 0, 0)
+        self.dirty = set(PANES)  # 다시 그려야 할 pane
+        self.fps = 20  # free-run 중 화면 갱신 상한 (Hz)
+        self.show_stats = False  # command list 자리에 호스트 계측 결과를 보여준다
+        # --- 디버깅 트레이스 파일 열기 (python src/tracefile.py dump 로 확인) ---
+        now = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.debug_log = TraceWriter(f"trace_{now}.bin", trace_compression)
+        self.timemachine = TimeMachine(simulator)  # back / rback 용 체크포인트 + undo 기록
+
+    def log_debug_info(self, pc, opcode, command, changes):
+        """ChangeSet을 바이너리 트레이스 레코드로 남긴다. pc는 실행한 명령어의 주소."""
+        self.debug_log.record(self.simulator, pc, opcode, command, changes)
+
+    def set_highlight(self, changes):
+        self.highlight_registers = {SLOT_NAMES[slot] for slot in changes.registers}
+        self.highlight_memory = changes.memory_words()
+        self.highlight_stack = set(changes.stack)
         self.highlight_color_pair = 2  # 항상 초록색
 
+    def execute_tracked(self, command, from_reserved=False):
+        """명령어를 실행하면서 ChangeSet을 모아 하이라이트/디버그 로그에 반영한다. 예외는 그대로 전달."""
+        sim = self.simulator
+        pc = sim.registers.read(PC)
+        try:
+            self.timemachine.execute(command, from_reserved)
+        finally:
+            decoded = sim.decode_cache.get(command)
+            self._after_execute(pc, decoded.op if decoded is not None else 0xFF)
+
+    def execute_next(self):
+        """pc 위치의 코드(없으면 reserved 큐의 첫 명령어)를 실행하고 그 소스를 반환한다. 예외는 그대로 전달."""
+        sim = self.simulator
+        if sim.registers.read(PC) not in sim.code:
+            command = sim.pop_reserved()
+            self.execute_tracked(command, True)
+            return command
+        sim.halt = None
+        # pc로 가져온 명령어는 decode_cache가 아니라 sim.code에 있고, 실행 뒤에는 pc가 바뀐다
+        pc = sim.registers.read(PC)
+        opcode = sim.code[pc].op
+        try:
+            self.timemachine.step_forward()
+        finally:
+            self._after_execute(pc, opcode)
+        return self.timemachine.log[-1].command
+
+    def _after_execute(self, pc, opcode):
+        record = self.timemachine.log[-1]
+        self.clear_highlight()
+        self.set_highlight(record.changes)
+        self.mark_dirty(record.changes)
+        self.log_debug_info(pc, opcode, record.command or "", record.changes)
+        self.simulator.bus.flush()
+
+    def step_back(self, count=1):
+        """count개 명령어를 되돌리고, 되돌린 명령어들이 바꿨던 곳을 하이라이트한다."""
+        undone = self.timemachine.step_back(count)
+        self.highlight_undone(undone)
+        self.last_message = f"Stepped back {sum(r.instructions() for r in undone)} instruction(s)"
+
+    def run_back(self):
+        """기록이 남아 있는 처음 상태까지 되돌린다."""
+        undone = self.timemachine.run_back(lambda record: False)
+        self.highlight_undone(undone)
+        self.last_message = f"Ran back {sum(r.instructions() for r in undone)} instruction(s)"
+
+    def highlight_undone(self, undone):
+        self.mark_dirty()
+        self.clear_highlight()
+        for record in undone[-1:]:
+            self.set_highlight(record.changes)
+
+    def run_tui_command(self, command):
+        """시뮬레이터 명령어가 아닌 TUI 명령어(back [N], rback, run [N], break/watch/delete, timer/irq/fiq, profile, stats, save/load, devices/uart)를 처리. 처리했으면 True"""
+        parts = command.split()
+        if parts[0].lower() == "back" and len(parts) <= 2:
+            self.step_back(int(parts[1], 0) if len(parts) == 2 else 1)
+            return True
+        if parts[0].lower() == "rback" and len(parts) == 1:
+            self.run_back()
+            return True
+        if parts[0].lower() == "run" and len(parts) <= 2:
+            self.free_run(int(parts[1], 0) if len(parts) == 2 else None)
+            return True
+        if parts[0].lower() in ("break", "watch", "delete"):
+            self.breakpoint_command(parts)
+            return True
+        if parts[0].lower() in ("timer", "irq", "fiq"):
+            self.interrupt_command(parts)
+            return True
+        if parts[0].lower() == "profile":
+            self.profile_command(parts)
+            return True
+        if parts[0].lower() == "stats":
+            self.stats_command(parts)
+            return True
+        if parts[0].lower() in ("save", "load"):
+            self.state_command(parts)
+            return True
+        if parts[0].lower() in ("devices", "uart"):
+            self.device_command(command, parts)
+            return True
+        return False
+
+    def state_command(self, parts):
+        """
+        save <file> [zlib|lzma] : 머신 상태를 스냅샷 파일로 저장
+        load <file>             : 스냅샷 파일에서 머신 상태를 불러온다 (back/rback 기록은 지워진다)
+        """
+        name = parts[0].lower()
+        if name == "save":
+            if not 2 <= len(parts) <= 3:
+                raise Exception("Usage: save <file> [zlib|lzma]")
+            count = self.simulator.save_state(parts[1], parts[2].lower() if len(parts) == 3 else None)
+            self.last_message = f"Saved {count} pages to {parts[1]}"
+            return
+        if len(parts) != 2:
+            raise Exception("Usage: load <file>")
+        count = self.simulator.load_state(parts[1])
+        self.timemachine = TimeMachine(self.simulator)  # 불러오기 이전 기록으로는 되돌릴 수 없다
+        self.mem_index = None
+        self.clear_highlight()
+        self.mark_dirty()
+        self.last_message = f"Loaded {count} pages from {parts[1]}"
+
+    def stats_command(self, parts):
+        """
+        stats              : MIPS 요약
+        stats on|off|reset : 호스트 계측 켜기(stats pane 표시)/끄기/초기화
+        stats report <file>: 보고서를 파일로
+        """
+        stats = self.simulator.hoststats
+        action = parts[1].lower() if len(parts) > 1 else ""
+        if action == "on" and len(parts) == 2:
+            if not stats.enabled:
+                stats.enable()
+                stats.instrument(self, TIMED_METHODS)
+            self.show_stats = True
+            self.last_message = "Host stats on"
+        elif action == "off" and len(parts) == 2:
+            stats.disable()
+            self.show_stats = False
+            self.last_message = "Host stats off"
+        elif action == "reset" and len(parts) == 2:
+            stats.reset()
+            self.last_message = "Host stats cleared"
+        elif action == "report" and len(parts) == 3:
+            with open(parts[2], "w") as f:
+                f.write("\n".join(stats.report()) + "\n")
+            self.last_message = f"Host stats written to {parts[2]}"
+        elif not action:
+            self.last_message = stats.report()[0]
+        else:
+            raise Exception("Usage: stats [on|off|reset|report <file>]")
+        self.dirty.add("commands")
+
+    def profile_command(self, parts):
+        """
+        profile                : 요약 (실행한 명령어 수, 가장 많이 실행된 주소)
+        profile on|off|reset   : 켜기/끄기/집계 초기화
+        profile report <file>  : 상위 N 보고서를 파일로
+        profile save <file>    : collapsed stack (flamegraph용)을 파일로
+        """
+        profiler = self.simulator.profiler
+        action = parts[1].lower() if len(parts) > 1 else ""
+        if action == "on" and len(parts) == 2:
+            profiler.enable()
+            self.last_message = "Profiling on"
+        elif action == "off" and len(parts) == 2:
+            profiler.disable()
+            self.last_message = "Profiling off"
+        elif action == "reset" and len(parts) == 2:
+            profiler.reset()
+            self.last_message = "Profile cleared"
+        elif action in ("report", "save") and len(parts) == 3:
+            if action == "report":
+                with open(parts[2], "w") as f:
+                    f.write("\n".join(profiler.report()) + "\n")
+            else:
+                profiler.save_collapsed(parts[2])
+            self.last_message = f"Profile written to {parts[2]}"
+        elif not action:
+            hot = ", ".join(f"0x{addr:08X} x{count}" for addr, count in profiler.hot_pcs(3))
+            state = "on" if profiler.enabled else "off"
+            self.last_message = f"Profiling {state}: {profiler.total()} instructions" + (f"; hot: {hot}" if hot else "")
+        else:
+            raise Exception("Usage: profile [on|off|reset|report <file>|save <file>]")
+
+    def interrupt_command(self, parts):
+        """
+        timer                     : 목록
+        timer <period> [irq|fiq] : period 명령어마다 인터럽트를 올리는 타이머 (기본 irq)
+        timer off [id]            : 타이머 삭제 (id가 없으면 전부)
+        irq / fiq                 : 라인을 올린다 (마스크가 풀려 있으면 다음 명령어 경계에서 진입)
+        """
+        interrupts = self.simulator.interrupts
+        name = parts[0].lower()
+        if name in ("irq", "fiq"):
+            if len(parts) != 1:
+                raise Exception(f"Usage: {name}")
+            interrupts.raise_line(name)
+            self.last_message = f"{name.upper()} pending"
+        elif len(parts) == 1:
+            timers = interrupts.timers
+            self.last_message = "; ".join(f"{t} (fired {t.fired})" for t in timers) if timers else "No timers"
+        elif parts[1].lower() == "off":
+            if len(parts) > 3:
+                raise Exception("Usage: timer off [id]")
+            interrupts.remove_timer(int(parts[2], 0) if len(parts) == 3 else None)
+            self.last_message = "Timer removed" if len(parts) == 3 else "All timers removed"
+        else:
+            if len(parts) > 3:
+                raise Exception("Usage: timer <period> [irq|fiq]")
+            line = parts[2].lower() if len(parts) == 3 else "irq"
+            self.last_message = str(interrupts.add_timer(int(parts[1], 0), line))
+
+    def device_command(self, command, parts):
+        """
+        devices      : 붙어 있는 MMIO 장치와 레지스터 상태
+        uart <text>  : text와 줄바꿈을 UART 수신 데이터로 넣는다 (게스트가 DR에서 읽는다)
+        """
+        bus = self.simulator.bus
+        if parts[0].lower() == "devices":
+            if not bus.devices:
+                self.last_message = "No devices (start with --devices)"
+                return
+            self.last_message = "; ".join(f"{device} {device.dump()}" for device in bus.devices.values())
+            return
+        uart = bus.devices.get("uart")
+        if uart is None:
+            raise Exception("No UART (start with --devices)")
+        text = command.split(None, 1)[1] if len(parts) > 1 else ""
+        uart.send(text.encode() + b"\n")
+        self.last_message = f"UART received {len(text) + 1} bytes"
+
+    def breakpoint_command(self, parts):
+        """
+        break                          : 목록
+        break <addr|label> [if <cond>] : breakpoint (예: break loop if r0 == 0x1000)
+        watch <addr|label> [size] [r|w|rw] : watchpoint (기본 4바이트 쓰기)
+        delete [id]                    : 삭제 (id가 없으면 전부)
+        """
+        debugger = self.simulator.debugger
+        name = parts[0].lower()
+        if name == "break" and len(parts) == 1:
+            items = debugger.items()
+            self.last_message = "; ".join(f"{item} (hits {item.hits})" for item in items) if items else "No breakpoints"
+        elif name == "break":
+            condition = None
+            if len(parts) > 2:
+                if parts[2] != "if" or len(parts) == 3:
+                    raise Exception("Usage: break <addr|label> [if <condition>]")
+                condition = " ".join(parts[3:])
+            self.last_message = str(debugger.add_breakpoint(parts[1], condition))
+        elif name == "watch":
+            if not 2 <= len(parts) <= 4:
+                raise Exception("Usage: watch <addr|label> [size] [r|w|rw]")
+            access = "w"
+            size = 4
+            for token in parts[2:]:
+                if token in ("r", "w", "rw"):
+                    access = token
+                else:
+                    size = int(token, 0)
+            self.last_message = str(debugger.add_watchpoint(parts[1], size, access))
+        elif len(parts) == 1:
+            debugger.clear()
+            self.last_message = "Deleted all breakpoints and watchpoints"
+        else:
+            self.last_message = f"Deleted {debugger.remove(int(parts[1], 0))}"
+
+    def free_run(self, max_steps=None):
+        """
+        pc 위치의 코드를 breakpoint/코드 끝/max_steps/키 입력까지 최고 속도로 실행한다.
+        실행은 덩어리(chunk) 단위로 하고, 화면은 최대 fps번/초만 다시 그리며 그때 키 입력을 확인한다.
+        덩어리 크기는 한 덩어리가 프레임 간격의 1/4 정도 걸리도록 조절한다.
+        """
+        sim = self.simulator
+        if sim.registers.read(PC) not in sim.code:
+            self.last_message = "Nothing to run: no code at pc"
+            return
+        frame_interval = 1.0 / self.fps
+        input_win = self.windows["input"]
+        input_win.nodelay(True)
+        chunk = 256
+        executed = 0
+        reason = "end of code"
+        started = last_frame = time.perf_counter()
+        self.clear_highlight()
+        try:
+            while True:
+                budget = chunk if max_steps is None else min(chunk, max_steps - executed)
+                if budget <= 0:
+                    reason = "step budget"
+                    break
+                chunk_start = time.perf_counter()
+                # 덩어리 경계의 breakpoint에서도 멈추도록 첫 덩어리만 시작 pc의 breakpoint를 건너뛴다
+                executed += self.timemachine.run(budget, resume=executed == 0, on_record=self._log_run_record)
+                if sim.halt is not None:
+                    reason = str(sim.halt)
+                    break
+                if sim.registers.read(PC) not in sim.code:
+                    break
+                now = time.perf_counter()
+                if now - chunk_start < frame_interval / 4 and chunk < (1 << 16):
+                    chunk *= 2
+                if now - last_frame >= frame_interval:
+                    last_frame = now
+                    self.mark_dirty()
+                    self.render()
+                    self.draw_message(f"Running... {executed} instructions, {executed / (now - started):,.0f} instr/s (press any key to stop)")
+                    curses.doupdate()
+                    if input_win.getch() != -1:
+                        reason = "interrupted"
+                        break
+        finally:
+            input_win.nodelay(False)
+            self.mark_dirty()
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.last_message = f"Ran {executed} instructions ({executed / elapsed:,.0f} instr/s), stopped: {reason}"
+
+    def _log_run_record(self, record):
+        self.mark_dirty(record.changes)
+        # 여러 명령어를 묶은 기록: 시작 pc (_run이 먼저 남긴 이전 값)와 opcode 없음(0xFF)
+        pc = record.changes.registers.get(PC, self.simulator.registers.read(PC))
+        self.log_debug_info(pc, 0xFF, record.command, record.changes)
+
     def clear_highlight(self):
+        # 하이라이트가 있던 pane은 원래 색으로 다시 그려야 함
+        if self.highlight_registers:
+            self.dirty.add("registers")
+        if self.highlight_memory:
+            self.dirty.add("memory")
+        if self.highlight_stack:
+            self.dirty.add("stack")
         self.highlight_registers = set()
         self.highlight_memory = set()
         self.highlight_stack = set()
         self.highlight_color_pair = 2
 
     def draw_registers(self, win):
-        win.clear()
+        win.erase()
         win.box()
         win.addstr(0, 2, "[Registers]")
         row = 1
         max_y, max_x = win.getmaxyx()
-        # 공통 레지스터(com)
-        if "com" in self.simulator.registers:
+        # 모드별로 묶은 읽기 전용 뷰 (com, usr/sys, svc, ...)
+        for mode, regs in self.simulator.registers.grouped().items():
             if row < max_y - 1:
-                win.addstr(row, 1, "<com>"[:max_x-2])
+                win.addstr(row, 1, f"<{mode}>"[:max_x-2])
                 row += 1
-            for name, value in self.simulator.registers["com"].items():
+            for rname, rval in regs.items():
                 if row < max_y - 1:
-                    line = f"{name:>4}: 0x{value:08X}"
+                    line = f"{rname:>4}: 0x{rval:08X}"
                     attr = 0
-                    if ("com", name) in self.highlight_registers and curses.has_colors():
+                    if (mode, rname) in self.highlight_registers and curses.has_colors():
                         attr = curses.color_pair(self.highlight_color_pair) | curses.A_BOLD
                     win.addstr(row, 3, line[:max_x-4], attr)
                     row += 1
-        # 각 모드별 레지스터
-        for mode in ["usr/sys", "svc", "mon", "abt", "und", "irq", "fiq"]:
-            if mode in self.simulator.registers:
-                if row < max_y - 1:
-                    win.addstr(row, 1, f"<{mode}>"[:max_x-2])
-                    row += 1
-                for rname, rval in self.simulator.registers[mode].items():
-                    if row < max_y - 1:
-                        line = f"{rname:>4}: 0x{rval:08X}"
-                        attr = 0
-                        if (mode, rname) in self.highlight_registers and curses.has_colors():
-                            attr = curses.color_pair(self.highlight_color_pair) | curses.A_BOLD
-                        win.addstr(row, 3, line[:max_x-4], attr)
-                        row += 1
 
     def draw_memory(self, win):
-        win.clear()
+        win.erase()
         win.box()
-        # 총 메모리 사용량 계산 (4바이트 단위)
+        # 총 메모리 사용량 계산 (할당된 페이지 기준)
         memory = self.simulator.memory
-        used_bytes = len(memory) * 4
+        used_bytes = memory.used_bytes()
         win.addstr(0, 2, f"[Memory Map]  Used: {used_bytes} bytes")
-        addresses = sorted(memory.keys())
+        if self.mem_index is None:
+            self.mem_index = [addr for addr, _ in memory.items()]
+            self.mem_index_set = set(self.mem_index)
         max_y, max_x = win.getmaxyx()
         visible_lines = max_y - 2
-        total_lines = len(addresses)
+        total_lines = len(self.mem_index)
         # 스크롤 오프셋 보정
         if self.mem_scroll > total_lines - visible_lines:
             self.mem_scroll = max(0, total_lines - visible_lines)
         if self.mem_scroll < 0:
             self.mem_scroll = 0
-        # 스크롤된 위치부터 출력
-        for line_idx in range(visible_lines):
-            addr_idx = self.mem_scroll + line_idx
-            if addr_idx >= total_lines:
-                break
-            addr = addresses[addr_idx]
-            val = memory.get(addr, 0)
+        # 스크롤된 위치부터 보이는 줄만 출력
+        for line_idx, addr in enumerate(self.mem_index[self.mem_scroll:self.mem_scroll + visible_lines]):
+            val = int.from_bytes(memory.read_block(addr, 4), "little")  # watchpoint 훅을 거치지 않음
             out_str = f"{addr:08X}: {val:08X}"
-            win.addstr(1 + line_idx, 1, out_str[:max_x])
+            attr = 0
+            if addr in self.highlight_memory and curses.has_colors():
+                attr = curses.color_pair(self.highlight_color_pair) | curses.A_BOLD
+            win.addstr(1 + line_idx, 1, out_str[:max_x-2], attr)
 
     def draw_commands(self, win):
-        win.clear()
+        win.erase()
         win.box()
+        if self.show_stats:
+            self.draw_stats(win)
+            return
         win.addstr(0, 2, "[Command List]")
         for idx, cmd in enumerate(self.simulator.command_list, start=1):
             win.addstr(idx, 1, cmd)
 
+    def draw_stats(self, win):
+        height, width = win.getmaxyx()
+        win.addstr(0, 2, "[Host Stats]"[:width - 3])
+        for idx, line in enumerate(self.simulator.hoststats.report(), start=1):
+            if idx >= height - 1:
+                break
+            win.addstr(idx, 1, line[:width - 2])
+
     def draw_stack(self, win):
-        win.clear()
+        win.erase()
         win.box()
         win.addstr(0, 2, "[Stack]")
         row = 1
@@ -139,12 +440,13 @@ class TUI:
             if row < max_y - 1:
                 win.addstr(row, 1, f"<{mode}>")
                 row += 1
-            stack_entries = list(reversed(self.simulator.stack[mode]))
-            if not stack_entries:
+            if not self.simulator.stack[mode]:
                 if row < max_y - 1:
                     win.addstr(row, 3, "(empty)")
                     row += 1
-            for idx, entry in enumerate(stack_entries):
+            for idx, entry in enumerate(reversed(self.simulator.stack[mode])):
+                if row >= max_y - 1:
+                    break
                 if isinstance(entry, tuple) and len(entry) == 2:
                     addr, val = entry
                     line = f"{idx:02d}: [0x{addr:02X}] 0x{val:08X}"
@@ -158,18 +460,18 @@ class TUI:
                     row += 1
 
     def draw_reserved(self, win, scroll_offset=0):
-        win.clear()
+        win.erase()
         win.box()
         win.addstr(0, 2, "[Reserved Commands]")
-        reserved = self.simulator.get_reserved() if hasattr(self.simulator, "get_reserved") else []
         max_y, max_x = win.getmaxyx()
-        for idx, cmd in enumerate(reserved[:max_y-2], start=1):
+        reserved = self.simulator.upcoming(max_y - 2)
+        for idx, cmd in enumerate(reserved, start=1):
             if idx < max_y - 1:
                 win.addstr(idx, 1, cmd[:max_x-3])
 
     def get_user_input(self, input_win, input_str):
         prompt = "> "
-        input_win.clear()
+        input_win.erase()
         input_win.box()
         input_win.addstr(1, 2, "Enter ARMv7 instruction (or 'q' to quit):")
         history = self.simulator.get_history() if hasattr(self.simulator, "get_history") else []
@@ -177,10 +479,7 @@ class TUI:
         max_x = input_win.getmaxyx()[1]
         command_list = self.simulator.command_list
 
-        reg_names = []
-        for mode in self.simulator.registers:
-            reg_names.extend(self.simulator.registers[mode].keys())
-        reg_names = list(set(reg_names))
+        reg_names = list(REG_INDEX)
 
         cursor_pos = len(input_str)
         prev_input_str = input_str
@@ -206,7 +505,13 @@ class TUI:
             input_win.refresh()
             key = input_win.getch()
             prev_input_str = input_str
-            if key in (curses.KEY_ENTER, 10, 13):
+            if key == curses.KEY_RESIZE:
+                return None
+            elif key == curses.KEY_MOUSE:
+                self.handle_mouse()
+                self.render()
+                curses.doupdate()
+            elif key in (curses.KEY_ENTER, 10, 13):
                 return input_str
             elif key in (curses.KEY_BACKSPACE, 127, 8):
                 if cursor_pos > 0:
@@ -232,6 +537,12 @@ class TUI:
                     input_str = ""
                     hist_idx = len(history)
                     cursor_pos = 0
+            elif key == 18:  # Ctrl-R
+                found = self.reverse_search(input_win, history)
+                if found is not None:
+                    hist_idx = found
+                    input_str = history[found]
+                    cursor_pos = len(input_str)
             elif key == 9:
                 parts = input_str.strip().split()
                 if parts:
@@ -249,6 +560,43 @@ class TUI:
                 input_str = input_str[:cursor_pos] + chr(key) + input_str[cursor_pos:]
                 cursor_pos += 1
 
+    def reverse_search(self, input_win, history):
+        """
+        Ctrl-R 역방향 검색. 입력한 글자를 포함하는 가장 최근 히스토리를 보여주고, Ctrl-R을 다시 누르면 더 이전 것을 찾는다.
+        ENTER나 방향키로 고른 항목의 인덱스를, ESC/Ctrl-G/Ctrl-C면 None을 반환한다.
+        """
+        query = ""
+        found = None
+        failed = False
+        max_x = input_win.getmaxyx()[1]
+        while True:
+            match = history[found] if found is not None else ""
+            label = "failed reverse-i-search" if failed else "reverse-i-search"
+            line = f"({label})`{query}': {match}"
+            input_win.move(2, 2)
+            input_win.clrtoeol()
+            input_win.addstr(2, 2, line[:max_x - 4])
+            input_win.box()
+            input_win.move(2, 2 + min(len(label) + 4 + len(query), max_x - 5))
+            input_win.refresh()
+            key = input_win.getch()
+            if key in (27, 7, 3, curses.KEY_RESIZE):
+                return None
+            if key == 18:
+                more = history.search(query, found) if found is not None else None
+                failed = more is None
+                found = more if more is not None else found
+                continue
+            if key in (curses.KEY_BACKSPACE, 127, 8):
+                query = query[:-1]
+            elif 32 <= key <= 126:
+                query += chr(key)
+            else:
+                return found
+            result = history.search(query)
+            failed = result is None and bool(query)
+            found = result if result is not None or not query else found
+
     def run(self):
         while self.exit is False:
             try:
@@ -256,198 +604,231 @@ class TUI:
             except KeyboardInterrupt:
                 pass
 
+    def create_windows(self, stdscr):
+        """터미널 크기에 맞춰 창들을 한 번 만든다 (KEY_RESIZE 때만 다시 호출). 너무 작으면 False"""
+        height, width = stdscr.getmaxyx()
+        min_width = 60
+        min_height = 20
+        if width < min_width or height < min_height:
+            return False
+
+        usable_height = height - 6
+        reg_win_width = max(18, width // 4)
+        stack_win_width = max(18, width // 4)
+        mem_win_width = max(24, width // 4)
+        cmd_win_width = max(16, width // 4)
+        reserved_win_width = max(18, width // 4)
+
+        reg_win_height = min(50 + 3, usable_height)
+        stack_win_height = usable_height
+        mem_win_height = usable_height
+        cmd_win_height = min(len(self.simulator.command_list) + 3, usable_height)
+        reserved_win_height = usable_height - cmd_win_height
+        reserved_win_y = cmd_win_height
+
+        reg_win_x = 0
+        stack_win_x = reg_win_x + reg_win_width
+        mem_win_x = stack_win_x + stack_win_width
+        cmd_win_x = mem_win_x + mem_win_width
+
+        input_win_height = 5
+        input_win = curses.newwin(input_win_height, width, height - input_win_height, 0)
+        input_win.keypad(True)
+        self.windows = {
+            "registers": curses.newwin(reg_win_height, reg_win_width, 0, reg_win_x),
+            "stack": curses.newwin(stack_win_height, stack_win_width, 0, stack_win_x),
+            "memory": curses.newwin(mem_win_height, mem_win_width, 0, mem_win_x),
+            "commands": curses.newwin(cmd_win_height, cmd_win_width, 0, cmd_win_x),
+            "reserved": curses.newwin(reserved_win_height, reserved_win_width, reserved_win_y, cmd_win_x),
+            "input": input_win,
+            "message": curses.newwin(1, width, height - input_win_height - 1, 0),
+        }
+        self.mem_win_rect = (0, mem_win_x, mem_win_height, mem_win_width)
+        stdscr.erase()
+        stdscr.noutrefresh()
+        self.mark_dirty()
+        return True
+
+    def mark_dirty(self, changes=None):
+        """ChangeSet이 건드린 pane만 다시 그리도록 표시 (None이면 전부)"""
+        if changes is None:
+            self.dirty.update(PANES)
+            return
+        if changes.registers:
+            self.dirty.add("registers")
+        if changes.stack:
+            self.dirty.add("stack")
+        if changes.memory:
+            self.dirty.add("memory")
+            self.index_memory(changes.memory_words())
+        self.dirty.add("reserved")  # pc가 움직였으므로 다음 명령어 목록 갱신
+
+    def index_memory(self, addresses):
+        """메모리 pane용 정렬된 주소 인덱스에 새 주소만 끼워 넣는다."""
+        if self.mem_index is None:
+            return
+        for addr in addresses:
+            if addr not in self.mem_index_set:
+                self.mem_index_set.add(addr)
+                bisect.insort(self.mem_index, addr)
+
+    def render(self):
+        """dirty 표시된 pane만 다시 그리고 doupdate()로 한 번에 내보낸다."""
+        if self.show_stats:
+            self.dirty.add("commands")  # 계측 값은 매 프레임 바뀐다
+        draw = {
+            "registers": self.draw_registers,
+            "stack": self.draw_stack,
+            "memory": self.draw_memory,
+            "commands": self.draw_commands,
+            "reserved": self.draw_reserved,
+        }
+        for name in PANES:
+            if name in self.dirty:
+                win = self.windows[name]
+                draw[name](win)
+                win.noutrefresh()
+        self.dirty.clear()
+
+    def draw_message(self, text):
+        win = self.windows["message"]
+        width = win.getmaxyx()[1]
+        win.erase()
+        win.addstr(0, 0, text[:width-1])
+        win.noutrefresh()
+
+    def draw_input(self, input_str):
+        input_win = self.windows["input"]
+        width = input_win.getmaxyx()[1]
+        input_win.erase()
+        input_win.box()
+        input_win.addstr(1, 2, "Enter ARMv7 instruction (or 'q' to quit):")
+        # --- 다음 reserved 명령어를 입력창에 미리 보여줌 ---
+        next_reserved = ""
+        reserved_list = self.simulator.upcoming(1)
+        if reserved_list:
+            next_reserved = reserved_list[0]
+        # 하이라이트: 입력이 없고 reserved 명령어가 있으면 초록색 bold로 표시
+        if not input_str and next_reserved:
+            if curses.has_colors():
+                input_win.addstr(2, 2, "> ")
+                input_win.addstr(2, 4, next_reserved[:width-6], curses.color_pair(2) | curses.A_BOLD)
+            else:
+                input_win.addstr(2, 2, ("> " + next_reserved)[:width-4])
+        else:
+            input_win.addstr(2, 2, ("> " + input_str)[:width-4])
+        if self.input_exception_log:
+            input_win.addstr(3, 2, f"Error: {self.input_exception_log}"[:width-4], curses.color_pair(1) if curses.has_colors() else 0)
+        input_win.noutrefresh()
+
+    def handle_mouse(self):
+        try:
+            _, mx, my, _, mouse_state = curses.getmouse()
+        except curses.error:
+            return
+        # 메모리 윈도우 영역에서만 스크롤 처리
+        mem_win_y, mem_win_x, mem_win_height, mem_win_width = self.mem_win_rect
+        if mem_win_y <= my < (mem_win_y + mem_win_height) and (mem_win_x <= mx < mem_win_x + mem_win_width):
+            if mouse_state & curses.BUTTON4_PRESSED:  # wheel up
+                self.mem_scroll = max(0, self.mem_scroll - 1)
+            elif mouse_state & curses.BUTTON5_PRESSED:  # wheel down
+                self.mem_scroll += 1
+            self.dirty.add("memory")
+
     def _main(self, stdscr):
         curses.curs_set(1)
         curses.noecho()
         input_str = ""
         if curses.has_colors():
             curses.start_color()
+            curses.init_pair(1, curses.COLOR_RED, curses.COLOR_BLACK)  # 에러
             curses.init_pair(2, curses.COLOR_GREEN, curses.COLOR_BLACK)  # 초록색
         stdscr.keypad(True)
         curses.mousemask(curses.ALL_MOUSE_EVENTS)
+        self.windows = None
         while True:
-            stdscr.clear()
-            height, width = stdscr.getmaxyx()
-            
-            min_width = 60
-            min_height = 20
-            if width < min_width or height < min_height:
-                stdscr.addstr(0, 0, f"터미널 크기를 최소 {min_width}x{min_height} 이상으로 늘려주세요.")
+            if self.windows is None and not self.create_windows(stdscr):
+                stdscr.erase()
+                stdscr.addstr(0, 0, "터미널 크기를 최소 60x20 이상으로 늘려주세요.")
                 stdscr.refresh()
                 stdscr.getch()
                 continue
+            self.render()
+            input_win = self.windows["input"]
 
-            usable_height = height - 6
-            reg_win_width = max(18, width // 4)
-            stack_win_width = max(18, width // 4)
-            mem_win_width = max(24, width // 4)
-            cmd_win_width = max(16, width // 4)
-            reserved_win_width = max(18, width // 4)
-
-            reg_win_height = min(50 + 3, usable_height)
-            stack_win_height = usable_height
-            mem_win_height = usable_height
-            cmd_win_height = min(len(self.simulator.command_list) + 3, usable_height)
-            reserved_win_height = usable_height - cmd_win_height
-            reserved_win_y = cmd_win_height
-            reserved_win_x = reg_win_width + stack_win_width + mem_win_width
-
-            reg_win_x = 0
-            stack_win_x = reg_win_x + reg_win_width
-            mem_win_x = stack_win_x + stack_win_width
-            cmd_win_x = mem_win_x + mem_win_width
-
-            reg_win = curses.newwin(reg_win_height, reg_win_width, 0, reg_win_x)
-            stack_win = curses.newwin(stack_win_height, stack_win_width, 0, stack_win_x)
-            mem_win = curses.newwin(mem_win_height, mem_win_width, 0, mem_win_x)
-            cmd_win = curses.newwin(cmd_win_height, cmd_win_width, 0, cmd_win_x)
-            reserved_win = curses.newwin(reserved_win_height, reserved_win_width, reserved_win_y, cmd_win_x)
-
-            # --- 추가: 항상 화면을 그려줌 ---
-            self.draw_registers(reg_win)
-            reg_win.refresh()
-            self.draw_stack(stack_win)
-            stack_win.refresh()
-            self.draw_memory(mem_win)
-            mem_win.refresh()
-            self.draw_commands(cmd_win)
-            cmd_win.refresh()
-            self.draw_reserved(reserved_win)
-            reserved_win.refresh()
-            # --- 여기까지 ---
-
-            input_win_height = 5
-            input_win = curses.newwin(input_win_height, width, height - input_win_height, 0)
-            input_win.keypad(True)
-            input_win.clear()
-            input_win.box()
-            input_win.addstr(1, 2, "Enter ARMv7 instruction (or 'q' to quit):")
-            # --- 다음 reserved 명령어를 입력창에 미리 보여줌 ---
-            next_reserved = ""
-            reserved_list = self.simulator.get_reserved() if hasattr(self.simulator, "get_reserved") else []
-            if reserved_list:
-                next_reserved = reserved_list[0]
-            input_prompt_str = input_str
-            # 하이라이트: 입력이 없고 reserved 명령어가 있으면 초록색 bold로 표시
-            if not input_str and next_reserved:
-                if curses.has_colors():
-                    input_win.addstr(2, 2, "> ")
-                    input_win.addstr(2, 4, next_reserved, curses.color_pair(2) | curses.A_BOLD)
-                    input_win.addstr(2, 4 + len(next_reserved), " " * (width - len(next_reserved) - 4))
-                else:
-                    input_win.addstr(2, 2, "> " + next_reserved + " " * (width - len(next_reserved) - 4))
-            else:
-                input_win.addstr(2, 2, "> " + input_str + " " * (width - len(input_str) - 4))
-            # -------------------------------------------------
-            if hasattr(self, "input_exception_log") and self.input_exception_log:
-                input_win.addstr(3, 2, f"Error: {self.input_exception_log}"[:width-4], curses.color_pair(1) if curses.has_colors() else 0)
-            else:
-                input_win.addstr(3, 2, " " * (width-4))
-            input_win.refresh()
-
-            msg_y = height - input_win_height - 1
-            msg_win = curses.newwin(1, width, msg_y, 0)
-            msg_win.addstr(0, 0, self.last_message[:width-1] + " " * (width - len(self.last_message) - 1))
-            msg_win.refresh()
-
-            if self.simulator.get_reserved():
-                self.input_exception_log = ""
-                msg_win.clear()
-                msg_win.addstr(0, 0, "Press ENTER to execute next reserved command, or 'q' to quit.")
-                msg_win.refresh()
+            if self.simulator.has_pending():
+                self.draw_input(input_str)
+                hint = "ENTER: next, 'r': run, 'b': step back, ':': command, 'q': quit"
+                self.draw_message(f"{self.last_message}  |  {hint}" if self.last_message else hint)
+                curses.doupdate()
                 key = input_win.getch()
+                if key == curses.KEY_RESIZE:
+                    self.windows = None
+                    continue
+                if key == curses.KEY_MOUSE:
+                    self.handle_mouse()
+                    continue
                 if key in (curses.KEY_ENTER, 10, 13):
-                    before_regs = {k: v.copy() for k, v in self.simulator.registers.items()}
-                    before_mem = self.simulator.memory.copy()  # <-- 여기!
-                    before_stack = {k: v[:] for k, v in self.simulator.stack.items()}
-                    next_cmd = self.simulator.pop_reserved()
-                    if next_cmd:
-                        try:
-                            self.simulator.parse_and_execute(next_cmd)
-                            self.last_message = f"Executed: {next_cmd}"
-                            self.input_exception_log = ""
-                        except Exception as e:
-                            self.last_message = f"Error: {e}"
-                            self.input_exception_log = str(e)
-                            msg_win.clear()
-                            msg_win.addstr(0, 0, self.last_message[:width-1] + " " * (width - len(self.last_message) - 1))
-                            msg_win.refresh()
-                    self.clear_highlight()
-                    self.set_highlight(before_regs, self.simulator.registers, "registers")
-                    self.set_highlight(before_mem, self.simulator.memory, "memory")
-                    self.set_highlight(before_stack, self.simulator.stack, "stack")
-                    # --- 디버깅 정보 기록 ---
-                    after_regs = {k: v.copy() for k, v in self.simulator.registers.items()}
-                    after_mem = self.simulator.memory.copy()
-                    after_stack = {k: v[:] for k, v in self.simulator.stack.items()}
-                    self.log_debug_info(next_cmd, before_regs, after_regs, before_mem, after_mem, before_stack, after_stack)
-                    # ---------------------
+                    next_cmd = self.simulator.upcoming(1)[0]
+                    try:
+                        self.execute_next()
+                        self.last_message = f"Executed: {next_cmd}"
+                        if self.simulator.halt is not None:
+                            self.last_message += f" ({self.simulator.halt})"
+                        self.input_exception_log = ""
+                    except Exception as e:
+                        self.last_message = f"Error: {e}"
+                        self.input_exception_log = str(e)
                     input_str = ""
-                    self.draw_registers(reg_win)
-                    reg_win.refresh()
-                    self.draw_stack(stack_win)
-                    stack_win.refresh()
-                    self.draw_memory(mem_win)
-                    mem_win.refresh()
-                    continue
+                elif key in (ord('b'), ord('B')):
+                    self.step_back()
+                elif key in (ord('r'), ord('R')):
+                    try:
+                        self.free_run()
+                        self.input_exception_log = ""
+                    except Exception as e:
+                        self.last_message = f"Error: {e}"
+                        self.input_exception_log = str(e)
+                elif key == ord(':'):
+                    # 코드 실행 중에도 break/watch/back 등 명령어 입력
+                    command = self.get_user_input(input_win, "")
+                    if command is None:
+                        self.windows = None
+                    elif command.strip():
+                        self.run_command(command.strip())
                 elif key in (ord('q'), ord('Q')):
                     self.exit = True
                     break
-                else:
-                    continue
-            key = stdscr.getch()
-            if key == curses.KEY_MOUSE:
-                _, mx, my, _, mouse_state = curses.getmouse()
-                # 메모리 윈도우 영역에서만 스크롤 처리
-                if (mem_win_y := 0) <= my < (mem_win_y + mem_win_height) and (mem_win_x <= mx < mem_win_x + mem_win_width):
-                    if mouse_state & curses.BUTTON4_PRESSED:  # wheel up
-                        self.mem_scroll = max(0, self.mem_scroll - 1)
-                    elif mouse_state & curses.BUTTON5_PRESSED:  # wheel down
-                        self.mem_scroll += 1
+                continue
+
+            self.draw_input(input_str)
+            self.draw_message(self.last_message)
+            curses.doupdate()
             input_str = self.get_user_input(input_win, input_str)
+            if input_str is None:  # 터미널 크기 변경
+                self.windows = None
+                input_str = ""
+                continue
             command = input_str.strip()
             if command.lower() == 'q':
                 self.exit = True
                 break
             elif command:
-                before_regs = {k: v.copy() for k, v in self.simulator.registers.items()}
-                before_mem = self.simulator.memory.copy()  # <-- 여기!
-                before_stack = {k: v[:] for k, v in self.simulator.stack.items()}
-                try:
-                    self.simulator.parse_and_execute(command)
-                    self.last_message = f"Executed: {command}"
-                    self.input_exception_log = ""
-                except Exception as e:
-                    self.last_message = f"Error: {e}"
-                    self.input_exception_log = str(e)
-                    msg_win.clear()
-                    msg_win.addstr(0, 0, self.last_message[:width-1] + " " * (width - len(self.last_message) - 1))
-                    msg_win.refresh()
-                    input_win.clear()
-                    input_win.box()
-                    input_win.addstr(1, 2, "Enter ARMv7 instruction (or 'q' to quit):")
-                    input_win.addstr(2, 2, "> " + input_str + " " * (width - len(input_str) - 4))
-                    input_win.addstr(3, 2, f"Error: {self.input_exception_log}"[:width-4], curses.color_pair(1) if curses.has_colors() else 0)
-                    input_win.refresh()
-
-                self.clear_highlight()
-                self.set_highlight(before_regs, self.simulator.registers, "registers")
-                self.set_highlight(before_mem, self.simulator.memory, "memory")
-                self.set_highlight(before_stack, self.simulator.stack, "stack")
-                # --- 디버깅 정보 기록 ---
-                after_regs = {k: v.copy() for k, v in self.simulator.registers.items()}
-                after_mem = self.simulator.memory.copy()
-                after_stack = {k: v[:] for k, v in self.simulator.stack.items()}
-                self.log_debug_info(command, before_regs, after_regs, before_mem, after_mem, before_stack, after_stack)
-                # ---------------------
-                self.draw_registers(reg_win)
-                reg_win.refresh()
-                self.draw_stack(stack_win)
-                stack_win.refresh()
-                self.draw_memory(mem_win)
-                mem_win.refresh()
+                self.run_command(command)
             input_str = ""
 
+    def run_command(self, command):
+        """입력창에서 받은 한 줄(TUI 명령어 또는 ARMv7 명령어)을 실행하고 결과를 메시지로 남긴다."""
+        self.simulator.history.append(command)
+        try:
+            if not self.run_tui_command(command):
+                self.execute_tracked(command)
+                self.last_message = f"Executed: {command}"
+            self.input_exception_log = ""
+        except Exception as e:
+            self.last_message = f"Error: {e}"
+            self.input_exception_log = str(e)
+
     def __del__(self):
         # 프로그램 종료 시 파일 닫기
         if hasattr(self, "debug_log") and self.debug_log:
@@ -0,0 +1,17 @@
+import os
+import struct
+import sys
+import pytest
+
+# 저장소는 패키지가 아니라 src의 모듈을 평평하게 import한다
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+@pytest.fixture
+def load_words(tmp_path):
+    """기계어 워드 리스트를 raw 이미지(.bin)로 써서 sim에 올리는 함수"""
+    def load(sim, words, base=0x8000):
+        path = tmp_path / "image.bin"
+        path.write_bytes(struct.pack(f"<{len(words)}I", *words))
+        sim.load_image(str(path), base)
+    return load
@@ -0,0 +1,52 @@
+import pytest
+from armdecode import decode_word
+from batch import run_batch
+from decoder import Op
+from memory import MMIO
+from simulator import ARMv7Simulator
+
+
+@pytest.mark.parametrize("word, text, op", [
+    (0xE0810002, "add r0, r1, r2", Op.ADD),
+    (0xE3A00001, "mov r0, #1", Op.MOV),
+    (0x03A00001, "moveq r0, #1", Op.MOV),
+    (0xE0000291, "mul r0, r1, r2", Op.MUL),
+    (0xE12FFF1E, "bx lr", Op.BX),
+])
+def test_decode_table(word, text, op):
+    decoded = decode_word(word, 0x8000)
+    assert (decoded.text, decoded.op) == (text, op)
+
+
+def test_unknown_encoding_faults_when_executed(load_words):
+    sim = ARMv7Simulator()
+    load_words(sim, [0xE7F000F0])  # udf
+    result = run_batch(sim)
+    assert (result["status"], result["pc"]) == ("fault", 0x8000)
+
+
+def test_pc_reads_as_address_plus_8(load_words):
+    sim = ARMv7Simulator()
+    load_words(sim, [
+        0xE1A0000F,  # mov r0, pc
+        0xE28F1004,  # add r1, pc, #4
+        0xE59F2000,  # ldr r2, [pc, #0]
+        0xE1A00000,  # nop
+        0x12345678,
+    ])
+    sim.run(3)
+    regs = sim.registers
+    assert (regs["r0"], regs["r1"], regs["r2"]) == (0x8008, 0x8010, 0x12345678)
+    assert regs["pc"] == 0x800C
+
+
+def test_fault_in_pc_load_reports_the_instruction(load_words):
+    def boom(*args):
+        raise Exception("bus error")
+
+    sim = ARMv7Simulator()
+    sim.memory.map_region(0x10000, 0x1000, MMIO, "bad", boom, boom)
+    load_words(sim, [0xE79FF001])  # ldr pc, [pc, r1]
+    sim.registers["r1"] = 0x10000 - 0x8008
+    result = run_batch(sim)
+    assert (result["status"], result["pc"], result["error"]) == ("fault", 0x8000, "bus error")
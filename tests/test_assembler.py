@@ -0,0 +1,48 @@
+import pytest
+from assembler import CODE_BASE, assemble
+from simulator import ARMv7Simulator
+
+
+def run(lines):
+    sim = ARMv7Simulator()
+    sim.load_code(lines)
+    sim.run()
+    return sim
+
+
+def test_forward_label_resolved_in_second_pass():
+    program = assemble(["    ldr r0, =value", "    b done", "value: .word 7", "done:"])
+    assert program.symbols["value"] == CODE_BASE + 8
+    assert program.symbols["done"] == CODE_BASE + 12
+    assert (CODE_BASE + 8, (7).to_bytes(4, "little")) in program.data
+    sim = run(["    ldr r0, =value", "    ldr r1, [r0]", "    b done", "value: .word 7", "done:", "    mov r2, #1"])
+    assert (sim.registers["r1"], sim.registers["r2"]) == (7, 1)
+
+
+def test_local_labels_pick_nearest_in_direction():
+    sim = run([
+        "    mov r0, #0",
+        "1:  add r0, r0, #1",
+        "    cmp r0, #3",
+        "    bne 1b",
+        "    b 1f",
+        "    mov r0, #99",
+        "1:  mov r1, r0",
+    ])
+    assert (sim.registers["r0"], sim.registers["r1"]) == (3, 3)
+
+
+def test_break_marks_next_instruction():
+    program = assemble(["    mov r0, #1", "    @@ break", "    mov r0, #2"])
+    assert program.breakpoints == [CODE_BASE + 4]
+
+
+@pytest.mark.parametrize("source, message", [
+    (["    .word undefined_sym"], "line 1: Undefined symbol 'undefined_sym'"),
+    (["    mov r0, #1", "    .bogus 3"], "line 2: Unknown directive .bogus"),
+    (["name: @@"], "line 1: Missing address after '@@'"),
+    (["name: @@ 0xZZ"], "line 1: Invalid address '0xZZ'"),
+])
+def test_errors_name_the_line(source, message):
+    with pytest.raises(Exception, match=message.replace(".", r"\.")):
+        assemble(source)
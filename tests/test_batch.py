@@ -0,0 +1,41 @@
+import json
+import pytest
+from batch import batch_main
+from simulator import ARMv7Simulator
+
+
+def run_file(tmp_path, capsys, source):
+    path = tmp_path / "prog.s"
+    path.write_text(source)
+    code = batch_main(ARMv7Simulator(), str(path), verbose=0)
+    return code, json.loads(capsys.readouterr().out)
+
+
+def test_completed_program(tmp_path, capsys):
+    code, result = run_file(tmp_path, capsys, "    mov r0, #1\n    add r0, r0, #2\n")
+    assert (code, result["status"], result["steps"]) == (0, "completed", 2)
+    assert result["state"]["registers"]["com"]["r0"] == 3
+
+
+@pytest.mark.parametrize("source, error", [
+    ("    mov r0, #1\n    .word undefined_sym\n", "line 2: Undefined symbol 'undefined_sym'"),
+    ("    .bogus 3\n", "line 1: Unknown directive .bogus"),
+    ("name: @@\n", "line 1: Missing address after '@@'"),
+])
+def test_assembly_error_is_reported_as_json(tmp_path, capsys, source, error):
+    code, result = run_file(tmp_path, capsys, source)
+    assert code == 2
+    assert result == {"status": "error", "steps": 0, "error": error}
+
+
+def test_missing_file_is_reported_as_json(tmp_path, capsys):
+    code = batch_main(ARMv7Simulator(), str(tmp_path / "missing.s"), verbose=0)
+    result = json.loads(capsys.readouterr().out)
+    assert (code, result["status"]) == (2, "error")
+    assert "missing.s" in result["error"]
+
+
+def test_fault_sets_exit_code(tmp_path, capsys):
+    code, result = run_file(tmp_path, capsys, "    mov r0, #1\n    udf\n")
+    assert code == 1
+    assert (result["status"], result["pc"], result["instruction"]) == ("fault", 0x8004, "udf")
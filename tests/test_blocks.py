@@ -0,0 +1,53 @@
+from simulator import ARMv7Simulator
+
+LOOP = [
+    0xE3A00000,  # 0x8000 mov r0, #0
+    0xE2800001,  # 0x8004 add r0, r0, #1
+    0xE3500005,  # 0x8008 cmp r0, #5
+    0x1AFFFFFC,  # 0x800C bne 0x8004
+]
+
+
+def test_data_store_next_to_assembled_code_keeps_blocks():
+    sim = ARMv7Simulator()
+    sim.load_code([
+        "    ldr r1, =counter",
+        "    mov r0, #0",
+        "loop:",
+        "    add r0, r0, #1",
+        "    str r0, [r1]",
+        "    cmp r0, #100",
+        "    bne loop",
+        "counter: .word 0",
+    ])
+    sim.run()
+    loop = sim.blocks.blocks[sim.labels["loop"]]
+    assert sim.memory.read_word(sim.labels["counter"]) == 100
+    assert sim.blocks.watches == {}
+    sim.memory.write_word(sim.labels["counter"], 0)
+    assert sim.blocks.blocks[sim.labels["loop"]] is loop
+
+
+def test_image_store_drops_only_overlapping_blocks(load_words):
+    sim = ARMv7Simulator()
+    load_words(sim, LOOP)
+    sim.run()
+    assert sim.registers["r0"] == 5
+    assert set(sim.blocks.blocks) == {0x8000, 0x8004}
+    sim.memory.write_word(0x8800, 1)  # 같은 페이지지만 블록 밖
+    assert set(sim.blocks.blocks) == {0x8000, 0x8004}
+    sim.memory.write_word(0x8000, 0xE3A00002)  # mov r0, #2: 0x8000 블록만 덮는다
+    assert set(sim.blocks.blocks) == {0x8004}
+    sim.memory.write_word(0x8008, 0xE3500007)  # cmp r0, #7
+    assert sim.blocks.blocks == {}
+    assert sim.blocks.watches == {}
+
+
+def test_image_rewritten_code_runs_new_instructions(load_words):
+    sim = ARMv7Simulator()
+    load_words(sim, LOOP)
+    sim.run()
+    sim.memory.write_word(0x8008, 0xE3500007)  # cmp r0, #7
+    sim.registers["pc"] = 0x8000
+    sim.run()
+    assert sim.registers["r0"] == 7
@@ -0,0 +1,52 @@
+from registers import CPSR, FLAG_C, FLAG_N, FLAG_Z, RegisterFile
+from simulator import ARMv7Simulator
+
+
+def run(lines):
+    sim = ARMv7Simulator()
+    sim.load_code(lines)
+    sim.run()
+    return sim
+
+
+def test_lazy_flags_drive_condition_codes():
+    sim = run([
+        "    mov r0, #0",
+        "    cmp r0, #0",
+        "    moveq r1, #1",
+        "    movne r2, #1",
+        "    subs r3, r0, #1",
+        "    movmi r4, #1",
+        "    movcs r5, #1",
+        "    movlt r6, #1",
+    ])
+    regs = sim.registers
+    assert [regs[f"r{i}"] for i in range(1, 7)] == [1, 0, 0xFFFFFFFF, 1, 0, 1]
+    # 0 - 1: N=1, Z=0, C=0 (빌림), V=0
+    assert regs.read(CPSR) & 0xF0000000 == FLAG_N
+
+
+def test_flags_materialize_when_cpsr_is_read():
+    regs = RegisterFile()
+    regs.set_arith_flags(0xFFFFFFFF, 1, 0x100000000)
+    assert regs.flag_kind is not None
+    assert regs.read(CPSR) & 0xF0000000 == FLAG_Z | FLAG_C
+    assert regs.flag_kind is None
+
+
+def test_banked_registers_follow_mode():
+    regs = RegisterFile()
+    regs["sp"] = 0x1000
+    regs["r8"] = 8
+    regs.switch_mode(0x13)  # svc
+    assert regs["sp"] == 0
+    regs["sp"] = 0x2000
+    assert regs["r8"] == 8  # svc는 r8을 공유한다
+    regs.switch_mode(0x11)  # fiq
+    assert regs["r8"] == 0
+    regs["r8"] = 88
+    regs.switch_mode(0x13)
+    assert (regs["sp"], regs["r8"]) == (0x2000, 8)
+    regs.switch_mode(0x1F)
+    assert regs["sp"] == 0x1000
+    assert regs.grouped()["fiq"]["r8"] == 88
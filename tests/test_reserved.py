@@ -0,0 +1,37 @@
+from reserved import ReservedQueue
+
+
+def write_commands(tmp_path, count):
+    path = tmp_path / "commands.s"
+    path.write_text("@ 주석\n\n" + "".join(f"mov r0, #{i}\n" for i in range(count)))
+    return str(path)
+
+
+def test_stream_reads_lazily(tmp_path):
+    queue = ReservedQueue(lookahead=4)
+    queue.stream(write_commands(tmp_path, 100))
+    assert queue.peek(10) == [f"mov r0, #{i}" for i in range(4)]
+    assert len(queue.buffer) == 4
+    assert queue.popleft() == "mov r0, #0"
+
+
+def test_append_while_streaming_leaves_file_unread(tmp_path):
+    queue = ReservedQueue()
+    queue.stream(write_commands(tmp_path, 100))
+    queue.popleft()
+    queue.append("nop")
+    assert queue.file is not None
+    assert len(queue.buffer) == 0
+    rest = []
+    while queue:
+        rest.append(queue.popleft())
+    assert rest == [f"mov r0, #{i}" for i in range(1, 100)] + ["nop"]
+
+
+def test_appendleft_and_iter_keep_order(tmp_path):
+    queue = ReservedQueue()
+    queue.stream(write_commands(tmp_path, 3))
+    queue.append("nop")
+    queue.appendleft("first")
+    assert list(queue) == ["first", "mov r0, #0", "mov r0, #1", "mov r0, #2", "nop"]
+    assert len(queue) == 5
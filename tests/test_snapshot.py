@@ -0,0 +1,32 @@
+from simulator import ARMv7Simulator
+
+PROGRAM = [
+    "    mov sp, #0x100000",
+    "    ldr r0, =0x20000",
+    "    mov r1, #5",
+    "    str r1, [r0]",
+    "    push {r0, r1}",
+    "    cmp r1, #6",
+    "    @@ break",
+    "    mov r2, #1",
+]
+
+
+def test_snapshot_round_trip(tmp_path):
+    sim = ARMv7Simulator()
+    sim.load_code(PROGRAM)
+    sim.run()
+    sim.add_reserved("mov r3, #3")
+    path = str(tmp_path / "state.snap")
+    sim.save_state(path, compression="zlib")
+
+    restored = ARMv7Simulator()
+    restored.load_code(PROGRAM)
+    restored.load_state(path)
+    assert restored.registers.grouped() == sim.registers.grouped()
+    assert dict(restored.memory.items()) == dict(sim.memory.items())
+    assert restored.stack == sim.stack
+    assert restored.steps == sim.steps
+    assert list(restored.reserved) == ["mov r3, #3"]
+    restored.run()
+    assert restored.registers["r2"] == 1
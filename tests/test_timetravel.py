@@ -0,0 +1,82 @@
+import io
+import pytest
+from simulator import ARMv7Simulator
+from timetravel import TimeMachine
+
+PROGRAM = [
+    "    mov sp, #0x100000",
+    "    mov r0, #0",
+    "    ldr r1, =0x20000",
+    "loop:",
+    "    add r0, r0, #1",
+    "    push {r0}",
+    "    str r0, [r1]",
+    "    add r1, r1, #4",
+    "    pop {r2}",
+    "    cmp r0, #20",
+    "    bne loop",
+]
+
+
+def state(sim):
+    return sim.registers.grouped(), dict(sim.memory.items()), sim.steps
+
+
+def reference_states():
+    """한 명령어씩 실행하며 각 시점의 상태 (states[i]는 i개 실행 뒤)"""
+    sim = ARMv7Simulator()
+    sim.load_code(PROGRAM)
+    states = [state(sim)]
+    while sim.has_pending():
+        sim.step()
+        states.append(state(sim))
+    return states
+
+
+def test_step_back_undoes_each_step():
+    states = reference_states()
+    sim = ARMv7Simulator()
+    sim.load_code(PROGRAM)
+    tm = TimeMachine(sim)
+    for _ in range(len(states) - 1):
+        tm.step_forward()
+    for i in range(len(states) - 1, 0, -1):
+        assert state(sim) == states[i]
+        tm.step_back()
+    assert state(sim) == states[0]
+
+
+@pytest.mark.parametrize("count", [1, 6, 7, 30, 100])
+def test_step_back_after_run_crosses_checkpoints(count):
+    states = reference_states()
+    sim = ARMv7Simulator()
+    sim.load_code(PROGRAM)
+    tm = TimeMachine(sim, interval=7)
+    total = tm.run()
+    assert total == len(states) - 1
+    tm.step_back(count)
+    assert state(sim) == states[total - count]
+    tm.run()
+    assert state(sim) == states[total]
+
+
+def test_uart_output_is_not_repeated_on_replay():
+    out = io.BytesIO()
+    sim = ARMv7Simulator()
+    sim.bus.attach_defaults(out)
+    sim.load_code([
+        "    ldr r1, =0x101F1000",
+        "    mov r0, #65",
+        "    str r0, [r1]",
+        "    mov r0, #66",
+        "    str r0, [r1]",
+        "    mov r0, #67",
+        "    str r0, [r1]",
+    ])
+    tm = TimeMachine(sim, interval=2)
+    for _ in range(5):
+        tm.step_forward()
+    tm.step_back(3)
+    tm.run()
+    sim.bus.flush()
+    assert out.getvalue() == b"ABC"
@@ -0,0 +1,23 @@
+import glob
+from decoder import Op
+from simulator import ARMv7Simulator
+from tracefile import read_trace
+from tui import TUI
+
+
+def test_trace_records_executed_pc_and_opcode(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sim = ARMv7Simulator()
+    sim.load_code(["    mov r0, #1", "    add r0, r0, #2", "    str r0, [r0]"])
+    tui = TUI(sim)
+    for _ in range(3):
+        tui.execute_next()
+    tui.execute_tracked("mov r1, #4", True)
+    tui.debug_log.close()
+    records = list(read_trace(glob.glob(str(tmp_path / "trace_*.bin"))[0]))
+    assert [(r.pc, r.opcode, r.text) for r in records] == [
+        (0x8000, Op.MOV, "mov r0, #1"),
+        (0x8004, Op.ADD, "add r0, r0, #2"),
+        (0x8008, Op.STR, "str r0, [r0]"),
+        (0x800C, Op.MOV, "mov r1, #4"),
+    ]